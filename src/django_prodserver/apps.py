@@ -7,3 +7,7 @@ class ProdserverAppConfig(AppConfig):
 
     name = "django_prodserver"
     verbose_name = _("prodserver")
+    prodserver_warmup = (
+        "django_prodserver.warmup.compile_templates",
+        "django_prodserver.warmup.populate_url_resolver",
+    )
@@ -0,0 +1,13 @@
+"""
+ASGI entry point used when prodserver wraps the project's application.
+
+Loads ``ASGI_APPLICATION`` and applies the wrappers enabled for the current
+process, see ``django_prodserver.wrappers``.
+"""
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .wrappers import wrap_asgi_application
+
+application = wrap_asgi_application(import_string(settings.ASGI_APPLICATION))
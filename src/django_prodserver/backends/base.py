@@ -1,6 +1,26 @@
+import logging
 from collections.abc import Collection, Mapping
 from typing import Any
 
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.servers.basehttp import get_internal_wsgi_application
+
+from ..database import close_connections
+from ..gc_tuning import GCSettings
+from ..hooks import Hooks
+from ..metrics import Metrics
+from ..precompress import precompress
+from ..readiness import ReadinessProbe
+from ..request_profiling import RequestProfiler
+from ..utils import wsgi_healthcheck
+from ..warmup import run_warmups
+
+log = logging.getLogger(__name__)
+
+# names of the tuning profiles backends may implement, see ``get_profiles``
+PROFILES = ("io-bound", "cpu-bound", "low-memory", "container")
+
 
 class BaseServerBackend:
     """
@@ -8,14 +28,127 @@ class BaseServerBackend:
 
     You are required to override "start_server" in the subclass
 
+    ``PROFILE`` expands into a set of ARGS tuned for the workload, any ARGS
+    given explicitly take precedence over the profile's.
+
     {
         "BACKEND": "django_prodserver.backends.gunicorn.GunicornServer",
-        "ARGS": {"bind": "0.0.0.0:8111"}
+        "PROFILE": "io-bound",
+        "ARGS": {"bind": "0.0.0.0:8111"},
+        "WARMUP": {"HEALTHCHECK": "/health/"},
+        "READINESS": {"FILE": "/tmp/web.ready"},
+        "HOOKS": {"post_fork": "myproject.hooks.setup_worker"},
+        "GC": {"FREEZE": True},
     }
     """
 
+    # whether the worker hooks are run by the application wrapper when a
+    # worker imports the application, for servers without hooks of their own
+    hooks_in_application = False
+    # whether the server marks the readiness probe ready itself once it accepts
+    # connections, otherwise warmup does when it has completed
+    marks_ready_when_serving = False
+
     def __init__(self, **server_args: Any) -> None:
-        self.args = self._format_server_args_from_dict(server_args.get("ARGS", {}))
+        self.process_args = self.apply_profile(
+            server_args.get("PROFILE"), server_args.get("ARGS", {})
+        )
+        self.args = self._format_server_args_from_dict(self.process_args)
+        self.warmup_config: Mapping[str, Any] = server_args.get("WARMUP") or {}
+        self.readiness = ReadinessProbe.from_config(server_args.get("READINESS"))
+        self.static_config = server_args.get("STATIC")
+        self.hooks = Hooks.for_process(server_args)
+        self.gc = GCSettings.from_config(server_args.get("GC"))
+        self.metrics = Metrics.from_config(
+            server_args.get("METRICS"), self.hooks.server_name
+        )
+        if self.metrics is not None:
+            self.readiness.pages["/metrics"] = self.metrics.render
+        request_profiler = RequestProfiler.from_config(
+            server_args.get("REQUEST_PROFILING"), self.hooks.server_name
+        )
+        if request_profiler is not None and request_profiler.page:
+            self.readiness.pages["/profiles"] = request_profiler.render
+
+    def get_profiles(self) -> dict[str, dict[str, Any]]:
+        """
+        ARGS each named profile expands into for this backend.
+
+        Override in subclasses supporting ``PROFILE``, using the keys of
+        ``PROFILES``. Values may depend on the resources of the host.
+        """
+        return {}
+
+    def apply_profile(
+        self, profile: str | None, args: str | Mapping[str, Any]
+    ) -> str | Mapping[str, Any]:
+        """Merge the ARGS of ``profile`` under the explicitly configured ARGS."""
+        if not profile:
+            return args
+        profiles = self.get_profiles()
+        if profile not in profiles:
+            available = ", ".join(profiles) or "none"
+            raise ImproperlyConfigured(
+                f"Unknown PROFILE '{profile}' for {type(self).__name__}. "
+                f"Available profiles are: {available}."
+            )
+        if isinstance(args, str):
+            raise ImproperlyConfigured(
+                "PROFILE cannot be combined with ARGS given as a string."
+            )
+        # "max-requests" in ARGS overrides "max_requests" in a profile
+        explicit = {_normalise(name) for name in args}
+        merged = {
+            name: value
+            for name, value in profiles[profile].items()
+            if _normalise(name) not in explicit
+        }
+        merged.update(args)
+        return merged
+
+    def warmup(self) -> None:
+        """
+        Warm the application up before the server is started.
+
+        This is called before ``start_server``, so the public port is only bound
+        once warmup has succeeded. The ``pre_start`` hooks run first, then static
+        files are pre-compressed when ``STATIC`` sets ``PRECOMPRESS``, a root
+        which cannot be written to is logged and served uncompressed. Then the
+        ``prodserver_warmup`` steps of the installed apps run unless ``WARMUP``
+        sets ``APPS`` to False. The readiness probe is flipped to ready at the
+        end, unless the server does it once it accepts connections, a failing
+        step or healthcheck raises ``WarmupFailure`` and leaves it unready.
+
+        Database connections and cache clients opened while warming up are
+        closed, workers forked from this process must not share them. Finally
+        the heap is frozen when ``GC`` sets ``FREEZE``.
+        """
+        self.hooks.run("pre_start")
+        self.readiness.start()
+        if isinstance(self.static_config, Mapping) and self.static_config.get(
+            "PRECOMPRESS"
+        ):
+            root = self.static_config.get("ROOT", settings.STATIC_ROOT)
+            if root:
+                try:
+                    precompress(str(root))
+                except OSError as e:
+                    # the files are still served, only uncompressed
+                    log.warning("Cannot pre-compress static files in %s: %s", root, e)
+        if self.warmup_config.get("APPS", True):
+            run_warmups()
+        healthcheck = self.warmup_config.get("HEALTHCHECK")
+        if healthcheck:
+            wsgi_healthcheck(
+                get_internal_wsgi_application(),
+                healthcheck,
+                int(self.warmup_config.get("STATUS", 200)),
+            )
+        close_connections()
+        if self.gc is not None:
+            self.gc.freeze_heap()
+        if not self.marks_ready_when_serving:
+            self.readiness.mark_ready()
 
     def start_server(self, *args: str) -> None:
         """
@@ -53,10 +186,6 @@ class BaseServerBackend:
             return [args]
         return [f"--{arg_name}={arg_value}" for arg_name, arg_value in args.items()]
 
-    # def run_from_argv(self, argv):
-    # TODO: The below should be looked into and implemented
-    #     if getattr(settings, "WEBSERVER_WARMUP", True):
-    #         app = get_internal_wsgi_application()
-    #         if getattr(settings, "WEBSERVER_WARMUP_HEALTHCHECK", None):
-    #             wsgi_healthcheck(app, settings.WEBSERVER_WARMUP_HEALTHCHECK)
-    #     # self.start_server(*self.prep_server_args())
+
+def _normalise(name: str) -> str:
+    return name.replace("_", "-")
@@ -1,26 +1,115 @@
+import os
 from typing import Any
 
 from django.utils.module_loading import import_string
 
+from ..hooks import Hooks
+from ..resources import available_cpus
 from .base import BaseServerBackend
 
 
+def connect_hooks(hooks: Hooks) -> None:
+    """
+    Run the worker hooks from celery's worker signals.
+
+    Pool processes (prefork, and the solo pool's single process) start with
+    ``worker_process_init``. Pools without processes of their own (threads,
+    gevent, eventlet) run the hooks in the main worker once it is ready.
+    """
+    from celery import signals
+
+    started: set[int] = set()
+
+    def start(**kwargs: Any) -> None:
+        if os.getpid() not in started:
+            started.add(os.getpid())
+            hooks.start_worker()
+
+    def start_threaded(sender: Any, **kwargs: Any) -> None:
+        pool_cls = getattr(getattr(sender, "controller", None), "pool_cls", None)
+        if not getattr(pool_cls, "uses_semaphore", False):
+            start()
+
+    def exit(**kwargs: Any) -> None:
+        if os.getpid() in started:
+            started.discard(os.getpid())
+            hooks.run("worker_exit")
+
+    signals.worker_process_init.connect(start, weak=False)
+    signals.worker_ready.connect(start_threaded, weak=False)
+    signals.worker_process_shutdown.connect(exit, weak=False)
+    signals.worker_shutdown.connect(exit, weak=False)
+
+
 class CeleryWorker(BaseServerBackend):
     """Backend to start a celery worker."""
 
+    marks_ready_when_serving = True
+
     def __init__(self, **server_config: Any) -> None:
         celery_app_str = server_config.get("APP")
         self.app = import_string(celery_app_str)
         super().__init__(**server_config)
 
+    def get_profiles(self) -> dict[str, dict[str, Any]]:
+        """Celery worker ARGS for each ``PROFILE``."""
+        cpus = available_cpus()
+        return {
+            "io-bound": {
+                "pool": "threads",
+                "concurrency": str(cpus * 8),
+                "prefetch-multiplier": "4",
+            },
+            "cpu-bound": {
+                "pool": "prefork",
+                "concurrency": str(cpus),
+                # long tasks should not be held behind each other
+                "prefetch-multiplier": "1",
+                "max-tasks-per-child": "1000",
+            },
+            "low-memory": {
+                "pool": "prefork",
+                "concurrency": "1",
+                "prefetch-multiplier": "1",
+                "max-tasks-per-child": "100",
+                "max-memory-per-child": "200000",
+            },
+            "container": {
+                "pool": "prefork",
+                "concurrency": str(cpus),
+                "prefetch-multiplier": "1",
+                "max-tasks-per-child": "1000",
+            },
+        }
+
     def start_server(self, *args: str) -> None:
-        """Start Celery Worker."""
-        self.app.Worker(*args).start()
+        """
+        Start Celery Worker.
+
+        The arguments are command line options, ``--pool=prefork``, parsed and
+        converted by ``celery worker`` itself.
+        """
+        from celery import signals
+
+        connect_hooks(self.hooks)
+
+        # the worker is ready once connected to the broker and consuming
+        def mark_ready(**kwargs: Any) -> None:
+            self.readiness.mark_ready()
+
+        signals.worker_ready.connect(mark_ready, weak=False)
+        self.app.worker_main(["worker", *args])
 
 
 class CeleryBeat(CeleryWorker):
     """Backend to start a celery beat process."""
 
+    marks_ready_when_serving = False
+
+    def get_profiles(self) -> dict[str, dict[str, Any]]:
+        """Beat is a single scheduler process, there is nothing to tune."""
+        return {}
+
     def start_server(self, *args: str) -> None:
         """Start Celery beat."""
         self.app.Beat(*args).start()
@@ -53,8 +53,16 @@ class DjangoQ2Worker(BaseServerBackend):
                   - --settings: Override Django settings module
 
         """
+        from django_q.signals import post_spawn
+
+        post_spawn.connect(self._on_post_spawn, weak=False)
         management.call_command("qcluster", *args)
 
+    def _on_post_spawn(self, sender: Any, proc_name: str, **kwargs: Any) -> None:
+        """Run the worker hooks in each process spawned by the cluster."""
+        # django-q2 sends no signal when its processes exit
+        self.hooks.start_worker(proc_name=proc_name)
+
     def prep_server_args(self) -> list[str]:
         """
         Prepare arguments for qcluster command.
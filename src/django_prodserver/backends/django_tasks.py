@@ -8,4 +8,9 @@ class DjangoTasksWorker(BaseServerBackend):
 
     def start_server(self, *args: str) -> None:
         """Call django-tasks management command."""
-        management.call_command("db_worker", *args)
+        # the worker runs in this process, there is no fork
+        self.hooks.start_worker()
+        try:
+            management.call_command("db_worker", *args)
+        finally:
+            self.hooks.run("worker_exit")
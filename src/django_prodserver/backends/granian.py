@@ -1,10 +1,23 @@
 """Granian server backends for ASGI and WSGI applications."""
 
+import logging
+import os
+from collections.abc import Mapping
+from importlib.metadata import PackageNotFoundError, version
 from typing import Any
+from urllib.parse import urlsplit
 
+from django.conf import settings
+
+from ..resources import available_cpus
 from ..utils import asgi_app_name, wsgi_app_name
 from .base import BaseServerBackend
 
+log = logging.getLogger(__name__)
+
+# first Granian release able to serve a static directory itself
+STATIC_FILES_MIN_VERSION = (1, 5)
+
 
 class GranianServerBase(BaseServerBackend):
     """
@@ -12,12 +25,47 @@ class GranianServerBase(BaseServerBackend):
 
     Provides common functionality for both ASGI and WSGI Granian servers,
     including argument parsing and server configuration.
+
+    When ``STATIC_ROOT`` is set, Granian serves it under ``STATIC_URL``
+    natively, so static requests never reach the Python workers. Set
+    ``"STATIC": False`` on the process to disable this, or a ``STATIC``
+    mapping to change the ``ROOT``, ``URL`` or ``MAX_AGE`` used.
     """
 
+    hooks_in_application = True
+
     def __init__(self, **server_args: Any) -> None:
         """Initialize the Granian server backend."""
         super().__init__(**server_args)
-        self.server_config = server_args.get("ARGS", {})
+        self.server_config: Mapping[str, Any] = (
+            self.process_args if isinstance(self.process_args, Mapping) else {}
+        )
+
+    def get_profiles(self) -> dict[str, dict[str, Any]]:
+        """Granian ARGS for each ``PROFILE``."""
+        cpus = available_cpus()
+        return {
+            "io-bound": {
+                "workers": str(cpus),
+                "runtime-threads": "2",
+                "backlog": "2048",
+            },
+            "cpu-bound": {
+                "workers": str(cpus),
+                "runtime-threads": "1",
+                "backlog": "2048",
+            },
+            "low-memory": {
+                "workers": "1",
+                "runtime-threads": "1",
+                "backlog": "512",
+            },
+            "container": {
+                "workers": str(cpus),
+                "runtime-threads": "1",
+                "backlog": "1024",
+            },
+        }
 
     def _parse_granian_kwargs(self) -> dict[str, Any]:
         """Parse server configuration into Granian constructor kwargs."""
@@ -48,6 +96,12 @@ class GranianServerBase(BaseServerBackend):
             "url-path-prefix": ("url_path_prefix", str),
             "url_path_prefix": ("url_path_prefix", str),
             "reload": ("reload", bool),
+            "static-path-route": ("static_path_route", str),
+            "static_path_route": ("static_path_route", str),
+            "static-path-mount": ("static_path_mount", str),
+            "static_path_mount": ("static_path_mount", str),
+            "static-path-expires": ("static_path_expires", int),
+            "static_path_expires": ("static_path_expires", int),
         }
 
         for key, value in self.server_config.items():
@@ -66,6 +120,38 @@ class GranianServerBase(BaseServerBackend):
                 else:
                     kwargs[param_name] = value
 
+        # explicit ARGS take precedence over the settings derived ones
+        return {**self._static_files_kwargs(), **kwargs}
+
+    def _static_files_kwargs(self) -> dict[str, Any]:
+        """Mount ``STATIC_ROOT`` on ``STATIC_URL`` in Granian's static handler."""
+        if self.static_config is False:
+            return {}
+        options = self.static_config if isinstance(self.static_config, Mapping) else {}
+        root = options.get("ROOT", settings.STATIC_ROOT)
+        url = options.get("URL", settings.STATIC_URL)
+        if not root or not url:
+            return {}
+        parsed_url = urlsplit(str(url))
+        if parsed_url.scheme or parsed_url.netloc:
+            # assets are served from another host, e.g. a CDN
+            return {}
+        if not _granian_supports_static_files():
+            log.info("Granian is too old to serve static files, upgrade to 1.5+")
+            return {}
+        if not os.path.isdir(root):
+            log.warning(
+                "STATIC_ROOT %s does not exist, run collectstatic to let Granian "
+                "serve static files.",
+                root,
+            )
+            return {}
+        kwargs: dict[str, Any] = {
+            "static_path_route": "/" + parsed_url.path.strip("/"),
+            "static_path_mount": os.path.abspath(root),
+        }
+        if "MAX_AGE" in options:
+            kwargs["static_path_expires"] = int(options["MAX_AGE"])
         return kwargs
 
     def _get_interface(self) -> Any:
@@ -96,6 +182,15 @@ class GranianServerBase(BaseServerBackend):
         server.serve()
 
 
+def _granian_supports_static_files() -> bool:
+    try:
+        release = version("granian")
+    except PackageNotFoundError:
+        return False
+    parts = tuple(int(part) for part in release.split(".")[:2] if part.isdigit())
+    return parts >= STATIC_FILES_MIN_VERSION
+
+
 class GranianASGIServer(GranianServerBase):
     """
     Granian ASGI Server Backend.
@@ -1,10 +1,31 @@
+import importlib.util
+import logging
 import sys
 from argparse import ArgumentParser, Namespace
+from collections.abc import Mapping
+from typing import Any
 
+from django.core.exceptions import ImproperlyConfigured
 from gunicorn.app.wsgiapp import WSGIApplication
+from gunicorn.config import Config
 
-from ..utils import wsgi_app_name
-from .base import BaseServerBackend
+from ..database import (
+    ConnectionBudget,
+    close_connections,
+    enable_pooling,
+    server_databases,
+)
+from ..gc_tuning import GCSettings
+from ..hooks import Hooks
+from ..resources import available_cpus
+from ..utils import asgi_app_name, current_process_config, wsgi_app_name
+from .base import BaseServerBackend, _normalise
+
+log = logging.getLogger(__name__)
+
+# worker classes running one greenlet, and so potentially one database
+# connection, per client connection
+GREENLET_WORKERS = {"gevent", "eventlet"}
 
 
 class DjangoApplication(WSGIApplication):
@@ -16,6 +37,64 @@ class DjangoApplication(WSGIApplication):
         args = (wsgi_app_name(),)
         super().init(parser, opts, args)
 
+    def load_config(self) -> None:
+        """Load the gunicorn configuration and add the process' HOOKS to it."""
+        super().load_config()
+        install_hooks(
+            self.cfg,
+            Hooks.for_current_process(),
+            GCSettings.from_config(current_process_config().get("GC")),
+        )
+
+
+class DjangoASGIApplication(DjangoApplication):
+    """Gunicorn application serving Django's ASGI application."""
+
+    def init(self, parser: ArgumentParser, opts: Namespace, args: object) -> None:
+        """Initialised the Gunicorn Server."""
+        # the worker class speaks ASGI, gunicorn only needs the import path
+        args = (asgi_app_name(),)
+        super(DjangoApplication, self).init(parser, opts, args)
+
+
+def install_hooks(
+    cfg: Config, hooks: Hooks, gc_settings: GCSettings | None = None
+) -> None:
+    """
+    Chain the prodserver hooks after gunicorn's own server hooks.
+
+    The arbiter closes its database connections before forking each worker,
+    with ``preload`` the application may have opened some while loading. For
+    the same reason it freezes its heap again when ``GC`` sets ``FREEZE``.
+    """
+    pre_fork = cfg.pre_fork
+    post_fork = cfg.post_fork
+    post_worker_init = cfg.post_worker_init
+    worker_exit = cfg.worker_exit
+
+    def on_pre_fork(server: Any, worker: Any) -> None:
+        pre_fork(server, worker)
+        close_connections()
+        if gc_settings is not None:
+            gc_settings.freeze_heap()
+
+    def on_post_fork(server: Any, worker: Any) -> None:
+        post_fork(server, worker)
+        hooks.run("post_fork", worker_id=worker.age)
+
+    def on_post_worker_init(worker: Any) -> None:
+        post_worker_init(worker)
+        hooks.run("worker_ready", worker_id=worker.age)
+
+    def on_worker_exit(server: Any, worker: Any) -> None:
+        worker_exit(server, worker)
+        hooks.run("worker_exit", worker_id=worker.age)
+
+    cfg.set("pre_fork", on_pre_fork)
+    cfg.set("post_fork", on_post_fork)
+    cfg.set("post_worker_init", on_post_worker_init)
+    cfg.set("worker_exit", on_worker_exit)
+
 
 class GunicornServer(BaseServerBackend):
     """
@@ -23,9 +102,265 @@ class GunicornServer(BaseServerBackend):
 
     Bypasses any Django handling of the command and sends all arguments straight
     to gunicorn.
+
+    The database connections the workers can open (workers x threads, or
+    worker-connections for gevent/eventlet, per database) are checked against
+    the ``DATABASE`` key, which can also enable psycopg connection pooling:
+
+    {
+        "BACKEND": "django_prodserver.backends.gunicorn.GunicornServer",
+        "ARGS": {"bind": "0.0.0.0:8000", "workers": "4", "threads": "8"},
+        "DATABASE": {"MAX_CONNECTIONS": 100, "ON_EXCEED": "adjust", "POOL": True},
+    }
     """
 
+    marks_ready_when_serving = True
+
+    def __init__(self, **server_args: Any) -> None:
+        super().__init__(**server_args)
+        self.connection_budget = ConnectionBudget.from_config(
+            server_args.get("DATABASE")
+        )
+        self.check_database_connections()
+
+    def _format_server_args_from_dict(self, args: str | Mapping[str, Any]) -> list[str]:
+        """Format ARGS as gunicorn options, ``True`` booleans become flags."""
+        if isinstance(args, str):
+            return [args]
+        formatted = []
+        for name, value in args.items():
+            if value is True:
+                formatted.append(f"--{name}")
+            elif value is not False:
+                formatted.append(f"--{name}={value}")
+        return formatted
+
+    def gunicorn_config(self) -> Config:
+        """The gunicorn configuration described by the ARGS."""
+        config = Config()
+        options, _ = config.parser().parse_known_args(self.args)
+        for name, value in vars(options).items():
+            if value is not None and name in config.settings:
+                config.set(name, value)
+        return config
+
+    def check_database_connections(self) -> None:
+        """Compare the connections the workers can open with the budget."""
+        config = self.gunicorn_config()
+        worker_class = config.worker_class_str
+        if worker_class in GREENLET_WORKERS and not importlib.util.find_spec(
+            worker_class
+        ):
+            raise ImproperlyConfigured(
+                f"Gunicorn worker-class '{worker_class}' requires the "
+                f"{worker_class} package to be installed."
+            )
+        databases = server_databases()
+        if not databases:
+            return
+        workers = config.workers
+        per_worker = self._concurrency(config)
+        total = workers * per_worker
+        log.info(
+            "Gunicorn can open up to %s connections per database "
+            "(%s workers x %s) to %s",
+            total,
+            workers,
+            per_worker,
+            ", ".join(databases),
+        )
+        if self.connection_budget.exceeded(total):
+            self._on_budget_exceeded(config, total)
+            per_worker = self._concurrency(self.gunicorn_config())
+        if self.connection_budget.pool:
+            enable_pooling(databases, per_worker)
+
+    def _concurrency(self, config: Config) -> int:
+        """Requests, and so connections, a single worker handles at once."""
+        worker_class = config.worker_class_str
+        if worker_class in GREENLET_WORKERS:
+            return int(config.worker_connections)
+        if worker_class == "sync" and config.threads == 1:
+            return 1
+        # gunicorn switches sync workers with threads to gthread
+        return int(config.threads)
+
+    def _on_budget_exceeded(self, config: Config, total: int) -> None:
+        budget = self.connection_budget.max_connections or total
+        message = (
+            f"Gunicorn can open {total} connections per database, more than "
+            f"DATABASE MAX_CONNECTIONS ({budget})."
+        )
+        if self.connection_budget.on_exceed == "error":
+            raise ImproperlyConfigured(message)
+        if self.connection_budget.on_exceed == "warn" or not isinstance(
+            self.process_args, Mapping
+        ):
+            log.warning(message)
+            return
+
+        workers = min(config.workers, budget)
+        per_worker = max(1, budget // workers)
+        if config.worker_class_str in GREENLET_WORKERS:
+            adjusted = {"workers": workers, "worker-connections": per_worker}
+        elif config.worker_class_str == "sync" and config.threads == 1:
+            adjusted = {"workers": workers}
+        else:
+            adjusted = {"workers": workers, "threads": per_worker}
+        log.warning("%s Adjusting to %s.", message, adjusted)
+        args = {
+            name: value
+            for name, value in self.process_args.items()
+            if name.replace("_", "-") not in adjusted
+        }
+        args.update({name: str(value) for name, value in adjusted.items()})
+        self.process_args = args
+        self.args = self._format_server_args_from_dict(args)
+
+    def get_profiles(self) -> dict[str, dict[str, Any]]:
+        """Gunicorn ARGS for each ``PROFILE``."""
+        cpus = available_cpus()
+        common = {
+            # the worker heartbeat file is written constantly, keep it in memory
+            "worker-tmp-dir": "/dev/shm",  # noqa: S108
+            "max-requests": "1000",
+            "max-requests-jitter": "100",
+            "backlog": "2048",
+        }
+        return {
+            "io-bound": {
+                **common,
+                "worker-class": "gthread",
+                "workers": str(cpus),
+                "threads": "8",
+                "keep-alive": "5",
+            },
+            "cpu-bound": {
+                **common,
+                "worker-class": "sync",
+                "workers": str(2 * cpus + 1),
+                "keep-alive": "2",
+            },
+            "low-memory": {
+                **common,
+                "worker-class": "gthread",
+                "workers": "1",
+                "threads": "4",
+                "keep-alive": "5",
+                "max-requests": "500",
+                "max-requests-jitter": "50",
+                "backlog": "512",
+            },
+            "container": {
+                **common,
+                "worker-class": "gthread",
+                "workers": str(cpus),
+                "threads": "4",
+                # longer than the idle timeout of most cloud load balancers
+                "keep-alive": "75",
+                "graceful-timeout": "25",
+                "access-logfile": "-",
+            },
+        }
+
     def start_server(self, *args: str) -> None:
-        """Add args back into sys.argv and run the server."""
+        """
+        Add args back into sys.argv and run the server.
+
+        The readiness probe is marked ready by the arbiter's ``when_ready``
+        hook, once the listening sockets are bound.
+        """
         sys.argv.extend(args)
-        DjangoApplication("%(prog)s [OPTIONS]").run()
+        application = self.get_application_class()("%(prog)s [OPTIONS]")
+        when_ready = application.cfg.when_ready
+
+        def on_when_ready(server: Any) -> None:
+            when_ready(server)
+            self.readiness.mark_ready()
+
+        application.cfg.set("when_ready", on_when_ready)
+        application.run()
+
+    def get_application_class(self) -> type[WSGIApplication]:
+        """Gunicorn application class loading the Django application."""
+        return DjangoApplication
+
+
+class GunicornUvicornServer(GunicornServer):
+    """
+    Backend running Django's ASGI application in uvicorn workers under gunicorn.
+
+    Gunicorn's arbiter manages the worker processes (graceful reloads on
+    ``SIGHUP``, ``max-requests`` recycling, timeouts) while each worker serves
+    the ASGI application with uvicorn. The application is preloaded in the
+    arbiter so workers share its memory. Any of these defaults can be changed
+    in ARGS.
+
+    {
+        "BACKEND": "django_prodserver.backends.gunicorn.GunicornUvicornServer",
+        "ARGS": {"bind": "0.0.0.0:8000", "workers": "4"},
+    }
+    """
+
+    def get_application_class(self) -> type[WSGIApplication]:
+        """Gunicorn application class loading the Django ASGI application."""
+        return DjangoASGIApplication
+
+    def default_args(self) -> dict[str, Any]:
+        """
+        ARGS applied unless configured explicitly.
+
+        The uvicorn worker class is added by ``apply_profile``, only when ARGS
+        do not set ``worker-class``, so uvicorn is not required otherwise.
+        """
+        return {
+            "preload": True,
+            "max-requests": "1000",
+            "max-requests-jitter": "100",
+        }
+
+    def get_profiles(self) -> dict[str, dict[str, Any]]:
+        """Gunicorn profiles, keeping the uvicorn worker class."""
+        return {
+            name: {
+                option: value
+                for option, value in args.items()
+                if option not in ("worker-class", "threads")
+            }
+            for name, args in super().get_profiles().items()
+        }
+
+    def apply_profile(
+        self, profile: str | None, args: str | Mapping[str, Any]
+    ) -> str | Mapping[str, Any]:
+        """Merge the defaults under the profile and explicit ARGS."""
+        args = super().apply_profile(profile, args)
+        if isinstance(args, str):
+            return args
+        explicit = {_normalise(name) for name in args}
+        defaults = {}
+        if "worker-class" not in explicit:
+            defaults["worker-class"] = uvicorn_worker_class()
+        defaults.update(
+            (name, value)
+            for name, value in self.default_args().items()
+            if name not in explicit
+        )
+        return {**defaults, **args}
+
+
+def uvicorn_worker_class() -> str:
+    """
+    Import path of the uvicorn gunicorn worker.
+
+    Prefers the standalone ``uvicorn-worker`` package, ``uvicorn.workers`` is
+    deprecated since uvicorn 0.30.
+    """
+    if importlib.util.find_spec("uvicorn_worker") is not None:
+        return "uvicorn_worker.UvicornWorker"
+    if importlib.util.find_spec("uvicorn") is not None:
+        return "uvicorn.workers.UvicornWorker"
+    raise ImproperlyConfigured(
+        "GunicornUvicornServer requires uvicorn, install it with "
+        "pip install django-prodserver[gunicorn,uvicorn]."
+    )
@@ -0,0 +1,87 @@
+import os
+from collections.abc import Mapping
+from typing import Any
+
+from django.core import management
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+
+from ..scheduler import EXECUTORS, Job, JobScheduler
+from .base import BaseServerBackend
+
+
+class ScheduledCommands(BaseServerBackend):
+    """
+    Backend running management commands on cron schedules in one warm process.
+
+    ``JOBS`` maps job names to their ``SCHEDULE``, a cron expression, and
+    ``COMMAND``, a string or a list of arguments. ``JITTER`` delays each run by
+    up to that many seconds and ``MAX_INSTANCES`` (1 by default) limits the
+    runs of a job at once, see ``django_prodserver.scheduler``.
+
+    Runs happen in children forked from this process, or with ARGS ``executor``
+    set to ``thread`` in a pool of ``threads`` threads (4 by default).
+
+    {
+        "BACKEND": "django_prodserver.backends.scheduler.ScheduledCommands",
+        "JOBS": {
+            "clearsessions": {"SCHEDULE": "@daily", "COMMAND": "clearsessions"},
+            "digest": {
+                "SCHEDULE": "*/15 * * * *",
+                "COMMAND": ["send_digest", "--batch", "100"],
+                "JITTER": 30,
+            },
+        },
+    }
+    """
+
+    def __init__(self, **server_args: Any) -> None:
+        super().__init__(**server_args)
+        jobs = server_args.get("JOBS")
+        if not isinstance(jobs, Mapping) or not jobs:
+            raise ImproperlyConfigured(
+                "ScheduledCommands requires JOBS mapping job names to a SCHEDULE "
+                "and a COMMAND."
+            )
+        self.jobs = [Job.from_config(name, config) for name, config in jobs.items()]
+        args = self.process_args if isinstance(self.process_args, Mapping) else {}
+        default = "fork" if hasattr(os, "fork") else "thread"
+        self.executor = str(args.get("executor", default))
+        if self.executor not in EXECUTORS:
+            raise ImproperlyConfigured(
+                f"ScheduledCommands ARGS 'executor' must be one of "
+                f"{', '.join(EXECUTORS)}, got {self.executor!r}."
+            )
+        try:
+            self.threads = int(args.get("threads", 4))
+        except (TypeError, ValueError):
+            raise ImproperlyConfigured(
+                f"ScheduledCommands ARGS 'threads' must be a number, got "
+                f"{args['threads']!r}."
+            ) from None
+
+    def prep_server_args(self) -> list[str]:
+        """The options are read from JOBS and ARGS directly."""
+        return []
+
+    def run_job(self, job: Job) -> None:
+        """Run the command of ``job``, in a forked child or a pool thread."""
+        if self.executor == "thread":
+            try:
+                management.call_command(*job.argv)
+            finally:
+                # connections are per thread, do not leave them to the next job
+                connections.close_all()
+            return
+        self.hooks.run("post_fork")
+        self.hooks.run("worker_ready")
+        try:
+            management.call_command(*job.argv)
+        finally:
+            self.hooks.run("worker_exit")
+
+    def start_server(self, *args: str) -> None:
+        """Run the jobs until stopped."""
+        JobScheduler(
+            self.jobs, self.run_job, executor=self.executor, threads=self.threads
+        ).serve_forever()
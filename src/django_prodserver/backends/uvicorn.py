@@ -1,9 +1,45 @@
+from typing import Any
+
 import uvicorn.main
 
+from ..resources import available_cpus
 from ..utils import asgi_app_name, wsgi_app_name
 from .base import BaseServerBackend
 
 
+def uvicorn_profiles() -> dict[str, dict[str, Any]]:
+    """Uvicorn ARGS for each ``PROFILE``."""
+    cpus = available_cpus()
+    return {
+        "io-bound": {
+            "workers": str(cpus),
+            "backlog": "2048",
+            "timeout-keep-alive": "5",
+            "limit-max-requests": "10000",
+        },
+        "cpu-bound": {
+            "workers": str(cpus),
+            "backlog": "2048",
+            "timeout-keep-alive": "2",
+            "limit-max-requests": "1000",
+        },
+        "low-memory": {
+            "workers": "1",
+            "backlog": "512",
+            "limit-concurrency": "100",
+            "limit-max-requests": "1000",
+        },
+        "container": {
+            "workers": str(cpus),
+            "backlog": "2048",
+            # longer than the idle timeout of most cloud load balancers
+            "timeout-keep-alive": "75",
+            "timeout-graceful-shutdown": "25",
+            "limit-max-requests": "10000",
+        },
+    }
+
+
 class UvicornServer(BaseServerBackend):
     """
     Uvicorn ASGIServer Backend.
@@ -12,6 +48,12 @@ class UvicornServer(BaseServerBackend):
     to uvicorn.
     """
 
+    hooks_in_application = True
+
+    def get_profiles(self) -> dict[str, dict[str, Any]]:
+        """Uvicorn ARGS for each ``PROFILE``."""
+        return uvicorn_profiles()
+
     def prep_server_args(self) -> list[str]:
         """Prepare the server args."""
         args = [asgi_app_name()]
@@ -31,6 +73,12 @@ class UvicornWSGIServer(BaseServerBackend):
     to uvicorn.
     """
 
+    hooks_in_application = True
+
+    def get_profiles(self) -> dict[str, dict[str, Any]]:
+        """Uvicorn ARGS for each ``PROFILE``."""
+        return uvicorn_profiles()
+
     def prep_server_args(self) -> list[str]:
         """Prepare the server args."""
         args = [wsgi_app_name(), "--interface=wsgi"]
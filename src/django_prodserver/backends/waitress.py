@@ -1,8 +1,56 @@
+import contextlib
+import logging
+import os
+import pkgutil
+import signal
+import socket
+from collections.abc import Mapping
+from types import FrameType
+from typing import Any
+
 import waitress.runner
+from django.core.exceptions import ImproperlyConfigured
+from waitress.adjustments import Adjustments, asbool
+from waitress.server import create_server
 
+from ..database import close_connections
+from ..prefork import PreforkSupervisor
+from ..resources import available_cpus, memory_limit, parse_size
 from ..utils import wsgi_app_name
 from .base import BaseServerBackend
 
+log = logging.getLogger(__name__)
+
+AUTO = "auto"
+
+# waitress defaults, used as the starting point when sizing buffers
+DEFAULT_OUTBUF_OVERFLOW = 1048576
+DEFAULT_INBUF_OVERFLOW = 524288
+MIN_BUFFER = 65536
+
+# options that only make sense as strictly positive integers
+POSITIVE_OPTIONS = {
+    "threads",
+    "backlog",
+    "connection_limit",
+    "channel_timeout",
+    "cleanup_interval",
+    "outbuf_overflow",
+    "outbuf_high_watermark",
+    "inbuf_overflow",
+    "recv_bytes",
+    "send_bytes",
+}
+
+# options describing where to listen, replaced by pre-bound sockets when
+# running several processes
+BIND_OPTIONS = {"host", "port", "listen", "ipv4", "ipv6", "unix_socket"}
+
+# select() cannot watch more than FD_SETSIZE descriptors, each channel can use
+# up to three (socket plus spooled input and output buffers)
+SELECT_FD_LIMIT = 1024
+FDS_PER_CHANNEL = 3
+
 
 class WaitressServer(BaseServerBackend):
     """
@@ -10,11 +58,179 @@ class WaitressServer(BaseServerBackend):
 
     Bypass any Django handling of the command and sends all arguments straight
     to waitress.
+
+    ARGS are validated against the options waitress understands. The sizing
+    options ``threads``, ``connection_limit``, ``outbuf_overflow``,
+    ``inbuf_overflow``, ``recv_bytes`` and ``asyncore_use_poll`` accept
+    ``"auto"`` to be derived from the CPU and memory limits of the container
+    and the optional ``RESPONSE_SIZE`` hint (typical response body size).
+
+    Setting ``processes`` above one forks that many pre-warmed waitress servers
+    sharing the listening socket, to use more than one core. With
+    ``reuse_port`` each process binds its own ``SO_REUSEPORT`` socket instead,
+    letting the kernel balance connections between them. With ``zygote`` the
+    processes, including those replacing a crashed or restarted one, are forked
+    from a pristine copy of the warmed parent, see ``django_prodserver.prefork``.
+
+    {
+        "BACKEND": "django_prodserver.backends.waitress.WaitressServer",
+        "ARGS": {"port": "8000", "threads": "auto", "processes": "4"},
+        "RESPONSE_SIZE": "256KB",
+    }
     """
 
+    def __init__(self, **server_args: Any) -> None:
+        super().__init__(**server_args)
+        args = self.process_args
+        self.options: dict[str, Any] = {}
+        self.processes = 1
+        self.reuse_port = False
+        self.zygote = False
+        self.graceful_timeout = 30
+        if isinstance(args, Mapping):
+            args = dict(args)
+            self.processes = self._pop_positive_int(args, "processes", 1)
+            self.graceful_timeout = self._pop_positive_int(args, "graceful_timeout", 30)
+            reuse_port = args.pop("reuse_port", args.pop("reuse-port", False))
+            self.reuse_port = asbool(reuse_port)
+            self.zygote = asbool(args.pop("zygote", False))
+            if self.reuse_port and not hasattr(socket, "SO_REUSEPORT"):
+                raise ImproperlyConfigured(
+                    "reuse_port is not supported on this platform."
+                )
+            response_size = server_args.get("RESPONSE_SIZE")
+            try:
+                response_bytes = parse_size(response_size) if response_size else None
+            except ValueError as e:
+                raise ImproperlyConfigured(
+                    f"RESPONSE_SIZE must be a size such as '256KB', got "
+                    f"{response_size!r}."
+                ) from e
+            self.options = self.tune_options(
+                self.validate_options(args), response_size=response_bytes
+            )
+            self.args = self._format_server_args_from_dict(self.options)
+
+    def get_profiles(self) -> dict[str, dict[str, Any]]:
+        """Waitress ARGS for each ``PROFILE``."""
+        return {
+            "io-bound": {
+                "threads": AUTO,
+                "connection_limit": AUTO,
+                "asyncore_use_poll": AUTO,
+                "backlog": "2048",
+                "channel_timeout": "60",
+            },
+            "cpu-bound": {
+                # one single threaded server per core sidesteps the GIL
+                "processes": str(available_cpus()),
+                "threads": "2",
+                "connection_limit": AUTO,
+                "asyncore_use_poll": AUTO,
+                "backlog": "2048",
+            },
+            "low-memory": {
+                "threads": "4",
+                "connection_limit": "100",
+                "outbuf_overflow": "262144",
+                "inbuf_overflow": "131072",
+                "backlog": "512",
+            },
+            "container": {
+                "threads": AUTO,
+                "connection_limit": AUTO,
+                "asyncore_use_poll": AUTO,
+                "outbuf_overflow": AUTO,
+                "inbuf_overflow": AUTO,
+                "recv_bytes": AUTO,
+                "backlog": "2048",
+            },
+        }
+
     def start_server(self, *args: str) -> None:
         """Start the server."""
-        waitress.runner.run(argv=args)
+        if self.processes > 1:
+            self.start_multiprocess()
+            return
+        # a single server runs in this process, there is no fork
+        self.hooks.start_worker()
+        try:
+            waitress.runner.run(argv=args)
+        finally:
+            self.hooks.run("worker_exit")
+
+    def start_multiprocess(self) -> None:
+        """
+        Run ``processes`` waitress servers forked from this process.
+
+        The application is loaded (and so warmed) before forking and the
+        listening sockets are bound once in the parent, so a worker being
+        restarted never refuses connections.
+        """
+        app = pkgutil.resolve_name(wsgi_app_name())
+        serve_options = {
+            name: value
+            for name, value in self.options.items()
+            if name not in BIND_OPTIONS and name != "unix_socket_perms"
+        }
+        sockets = [] if self.reuse_port else self.bind_sockets()
+
+        def serve(worker_id: int) -> None:
+            self.hooks.run("post_fork", worker_id=worker_id)
+            worker_sockets = self.bind_sockets() if self.reuse_port else sockets
+            server = create_server(app, sockets=worker_sockets, **serve_options)
+            signal.signal(signal.SIGTERM, _raise_system_exit)
+            self.hooks.run("worker_ready", worker_id=worker_id)
+            try:
+                server.run()
+            finally:
+                self.hooks.run("worker_exit", worker_id=worker_id)
+
+        # loading the application may have connected, workers open their own
+        close_connections()
+        if self.gc is not None:
+            self.gc.freeze_heap()
+        supervisor = PreforkSupervisor(
+            serve,
+            self.processes,
+            graceful_timeout=self.graceful_timeout,
+            name="waitress",
+            zygote=self.zygote,
+        )
+        try:
+            supervisor.run()
+        finally:
+            for sock in sockets:
+                sock.close()
+
+    def bind_sockets(self) -> list[socket.socket]:
+        """Create the listening sockets described by the bind options."""
+        bind = {
+            name: value
+            for name, value in self.options.items()
+            if name in BIND_OPTIONS or name in ("unix_socket_perms", "backlog")
+        }
+        adj = Adjustments(**bind)
+        sockets = []
+        if adj.unix_socket:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(adj.unix_socket)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.bind(adj.unix_socket)
+            os.chmod(adj.unix_socket, adj.unix_socket_perms)
+            sock.listen(adj.backlog)
+            return [sock]
+        for family, socktype, proto, sockaddr in adj.listen:
+            sock = socket.socket(family, socktype, proto)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if self.reuse_port:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            if family == socket.AF_INET6:
+                sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 1)
+            sock.bind(sockaddr)
+            sock.listen(adj.backlog)
+            sockets.append(sock)
+        return sockets
 
     def prep_server_args(self) -> list[str]:
         """Prepare the server args."""
@@ -22,3 +238,161 @@ class WaitressServer(BaseServerBackend):
         args.extend(self.args)
         args.append(wsgi_app_name())
         return args
+
+    def _pop_positive_int(self, args: dict[str, Any], name: str, default: int) -> int:
+        value = args.pop(name, args.pop(name.replace("_", "-"), default))
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            number = 0
+        if number < 1:
+            raise ImproperlyConfigured(
+                f"Waitress option '{name}' must be a positive integer, got {value!r}."
+            )
+        return number
+
+    def validate_options(self, args: Mapping[str, Any]) -> dict[str, Any]:
+        """
+        Normalise option names and check every value against waitress' casts.
+
+        Names may use dashes or underscores. Values are kept as given, except
+        booleans which are converted, so they can be rendered as flags. The
+        casts are private to waitress: when a release drops them the values
+        are passed on unchecked.
+        """
+        params = getattr(Adjustments, "_params", None)
+        if params is None:
+            log.debug("Waitress has no option casts, options are not validated.")
+            return {name.replace("-", "_"): value for name, value in args.items()}
+        casts = dict(params)
+        options: dict[str, Any] = {}
+        for name, value in args.items():
+            option = name.replace("-", "_")
+            if option not in casts:
+                raise ImproperlyConfigured(
+                    f"Unknown waitress option '{name}'. See "
+                    "https://docs.pylonsproject.org/projects/waitress/en/stable/"
+                    "arguments.html for the supported options."
+                )
+            if value == AUTO:
+                options[option] = AUTO
+                continue
+            try:
+                cast_value = casts[option](value)
+            except (TypeError, ValueError) as e:
+                raise ImproperlyConfigured(
+                    f"Invalid value {value!r} for waitress option '{name}'."
+                ) from e
+            if option in POSITIVE_OPTIONS and cast_value < 1:
+                raise ImproperlyConfigured(
+                    f"Waitress option '{name}' must be a positive integer, "
+                    f"got {value!r}."
+                )
+            options[option] = cast_value if casts[option] is asbool else value
+        return options
+
+    def tune_options(
+        self, options: dict[str, Any], response_size: int | None = None
+    ) -> dict[str, Any]:
+        """Replace ``"auto"`` values with sizes derived from the host limits."""
+        auto = {name for name, value in options.items() if value == AUTO}
+        unsupported = auto - {
+            "threads",
+            "connection_limit",
+            "outbuf_overflow",
+            "inbuf_overflow",
+            "recv_bytes",
+            "asyncore_use_poll",
+        }
+        if unsupported:
+            raise ImproperlyConfigured(
+                f"Waitress option(s) {', '.join(sorted(unsupported))} "
+                "cannot be set to 'auto'."
+            )
+
+        def current(name: str, default: int) -> int:
+            value = options.get(name, default)
+            return default if value == AUTO else int(value)
+
+        if "threads" in auto:
+            # threads mostly wait on I/O, a few per core keeps the GIL busy
+            options["threads"] = max(4, min(available_cpus() * 4, 64))
+        threads = current("threads", 4)
+
+        if "outbuf_overflow" in auto:
+            # keep typical responses in memory instead of spooling to disk
+            options["outbuf_overflow"] = (
+                max(MIN_BUFFER, _round_up(2 * response_size, MIN_BUFFER))
+                if response_size
+                else DEFAULT_OUTBUF_OVERFLOW
+            )
+        outbuf = current("outbuf_overflow", DEFAULT_OUTBUF_OVERFLOW)
+
+        if "inbuf_overflow" in auto:
+            options["inbuf_overflow"] = min(
+                DEFAULT_INBUF_OVERFLOW, max(MIN_BUFFER, outbuf // 2)
+            )
+        inbuf = current("inbuf_overflow", DEFAULT_INBUF_OVERFLOW)
+
+        if "recv_bytes" in auto:
+            options["recv_bytes"] = min(MIN_BUFFER, inbuf)
+
+        if "connection_limit" in auto:
+            connections = max(100, threads * 25)
+            memory = memory_limit()
+            if memory:
+                # at most a quarter of the memory is spent on channel buffers
+                connections = min(connections, memory // 4 // (inbuf + outbuf))
+            options["connection_limit"] = max(threads, connections)
+        connection_limit = current("connection_limit", 100)
+
+        if "asyncore_use_poll" in auto:
+            options["asyncore_use_poll"] = (
+                connection_limit * FDS_PER_CHANNEL >= SELECT_FD_LIMIT
+            )
+
+        self._warn_incoherent_options(options, threads, connection_limit)
+        return options
+
+    def _warn_incoherent_options(
+        self, options: Mapping[str, Any], threads: int, connection_limit: int
+    ) -> None:
+        if "send_bytes" in options:
+            log.warning("Waitress option 'send_bytes' is deprecated and ignored.")
+        if connection_limit < threads:
+            log.warning(
+                "Waitress connection_limit (%s) is lower than threads (%s), "
+                "some threads will never be used.",
+                connection_limit,
+                threads,
+            )
+        if connection_limit * FDS_PER_CHANNEL >= SELECT_FD_LIMIT and not options.get(
+            "asyncore_use_poll"
+        ):
+            log.warning(
+                "Waitress connection_limit (%s) can exceed the select() file "
+                "descriptor limit, set asyncore_use_poll to true.",
+                connection_limit,
+            )
+
+    def _format_server_args_from_dict(self, args: str | Mapping[str, Any]) -> list[str]:
+        """Format options for the waitress runner, booleans become flags."""
+        if isinstance(args, str):
+            return [args]
+        formatted = []
+        for name, value in args.items():
+            option = name.replace("_", "-")
+            if isinstance(value, bool):
+                formatted.append(f"--{option}" if value else f"--no-{option}")
+            else:
+                formatted.append(f"--{option}={value}")
+        return formatted
+
+
+def _raise_system_exit(signum: int, frame: FrameType | None) -> None:
+    # waitress shuts its task threads down cleanly on SystemExit
+    raise SystemExit(0)
+
+
+def _round_up(value: int, multiple: int) -> int:
+    return -(-value // multiple) * multiple
@@ -0,0 +1,81 @@
+import logging
+from collections.abc import Mapping
+from typing import Any
+
+from django.core import management
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import get_commands, load_command_class
+
+from ..zygote import ZygoteServer
+from .base import BaseServerBackend
+
+log = logging.getLogger(__name__)
+
+
+class CommandZygote(BaseServerBackend):
+    """
+    Backend keeping a warm Django process to run management commands.
+
+    Commands are sent with ``python -m django_prodserver.zygote SOCKET COMMAND``
+    and run in a child forked from this process, see ``django_prodserver.zygote``.
+    ``commands`` optionally lists the commands which may be run, ``mode`` sets
+    the permissions of the socket (``600`` by default).
+
+    {
+        "BACKEND": "django_prodserver.backends.zygote.CommandZygote",
+        "ARGS": {
+            "socket": "/run/prodserver/commands.sock",
+            "commands": "clearsessions,send_digest",
+        },
+    }
+    """
+
+    def __init__(self, **server_args: Any) -> None:
+        super().__init__(**server_args)
+        args = self.process_args if isinstance(self.process_args, Mapping) else {}
+        if not args.get("socket"):
+            raise ImproperlyConfigured(
+                "CommandZygote requires the path of its Unix socket in ARGS 'socket'."
+            )
+        self.socket_path = str(args["socket"])
+        commands = args.get("commands")
+        if isinstance(commands, str):
+            commands = [name.strip() for name in commands.split(",") if name.strip()]
+        self.commands = set(commands) if commands else None
+        try:
+            self.mode = int(str(args.get("mode", "600")), 8)
+        except ValueError:
+            raise ImproperlyConfigured(
+                f"CommandZygote ARGS 'mode' must be octal permissions, got "
+                f"{args['mode']!r}."
+            ) from None
+
+    def prep_server_args(self) -> list[str]:
+        """The options are read from ARGS directly."""
+        return []
+
+    def preload_commands(self) -> None:
+        """Import the commands up front, so children do not import them each time."""
+        for name, app_name in get_commands().items():
+            if self.commands is not None and name not in self.commands:
+                continue
+            try:
+                load_command_class(app_name, name)
+            except Exception:
+                log.warning("Cannot preload the %s command", name, exc_info=True)
+
+    def run_command(self, argv: list[str]) -> None:
+        """Run a management command, in the child forked for the request."""
+        self.hooks.run("post_fork")
+        self.hooks.run("worker_ready")
+        try:
+            management.ManagementUtility(["manage.py", *argv]).execute()
+        finally:
+            self.hooks.run("worker_exit")
+
+    def start_server(self, *args: str) -> None:
+        """Serve command requests until stopped."""
+        self.preload_commands()
+        ZygoteServer(
+            self.socket_path, self.run_command, self.commands, self.mode
+        ).serve_forever()
@@ -0,0 +1,121 @@
+"""
+Bytecode cache prepared ahead of time.
+
+On a read-only filesystem Python cannot write the ``.pyc`` files it compiles,
+so every boot compiles Django and the project again. With the
+``PRODUCTION_BYTECODE_CACHE`` setting pointing at a directory,
+``manage.py prodserver --prepare`` compiles every module on ``sys.path`` into
+it (e.g. in a Docker build step), and ``prodserver`` points the server and its
+workers at it through ``PYTHONPYCACHEPREFIX``.
+
+The files are compiled in the ``checked-hash`` mode: the interpreter compares
+them with a hash of their source on import, so a stale cache is never used,
+whatever the file timestamps in the image.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+
+log = logging.getLogger(__name__)
+
+PYCACHE_PREFIX_ENV_VAR = "PYTHONPYCACHEPREFIX"
+
+
+@dataclass
+class BytecodeResult:
+    """Outcome of a run of ``compile_bytecode``."""
+
+    directories: list[str]
+    compiled: int
+    failed: int
+
+    def __str__(self) -> str:
+        """Summarise the run for the command output."""
+        summary = (
+            f"{self.compiled} module(s) compiled from {len(self.directories)} path(s)"
+        )
+        if self.failed:
+            summary += f", {self.failed} failed to compile"
+        return summary
+
+
+def source_directories(exclude: str | None = None) -> list[str]:
+    """The directories of ``sys.path``, without those nested in another one."""
+    directories: list[str] = []
+    for entry in sys.path:
+        path = os.path.abspath(entry or os.curdir)
+        if os.path.isdir(path) and path != exclude and path not in directories:
+            directories.append(path)
+    return [
+        path
+        for path in directories
+        if not any(
+            path.startswith(parent + os.sep) for parent in directories if parent != path
+        )
+    ]
+
+
+def compile_bytecode(
+    cache_dir: str, directories: list[str] | None = None
+) -> BytecodeResult:
+    """
+    Compile the modules of ``directories`` (default ``sys.path``) into ``cache_dir``.
+
+    Runs ``compileall`` with this interpreter, over all CPUs. Files failing to
+    compile (test data, other Python versions...) are counted and skipped.
+    """
+    cache_dir = os.path.abspath(cache_dir)
+    if directories is None:
+        directories = source_directories(exclude=cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    result = subprocess.run(  # noqa: S603 - our own interpreter and module
+        [
+            sys.executable,
+            "-m",
+            "compileall",
+            "-q",
+            "-j",
+            "0",
+            "--invalidation-mode",
+            "checked-hash",
+            *directories,
+        ],
+        env={**os.environ, PYCACHE_PREFIX_ENV_VAR: cache_dir},
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    failed = sum(
+        line.startswith("*** Error compiling") for line in result.stdout.splitlines()
+    )
+    compiled = sum(
+        name.endswith(".pyc")
+        for _, _, filenames in os.walk(cache_dir)
+        for name in filenames
+    )
+    return BytecodeResult(directories, compiled, failed)
+
+
+def use_bytecode_cache(cache_dir: str) -> bool:
+    """
+    Load bytecode from ``cache_dir`` in this process and the ones it starts.
+
+    Modules imported before this call were compiled already, set
+    ``PYTHONPYCACHEPREFIX`` in the environment to cover those too.
+    """
+    cache_dir = os.path.abspath(cache_dir)
+    if not os.path.isdir(cache_dir):
+        log.warning(
+            "PRODUCTION_BYTECODE_CACHE %s does not exist, run "
+            "manage.py prodserver --prepare to create it",
+            cache_dir,
+        )
+        return False
+    sys.pycache_prefix = cache_dir
+    os.environ[PYCACHE_PREFIX_ENV_VAR] = cache_dir
+    return True
@@ -25,6 +25,12 @@ class AppSettings:
     PRODUCTION_PROCESSES: Mapping[str, Mapping[str, str]] = field(default_factory=dict)
     """Whether the app is enabled (dummy setting to demo usage)."""
 
+    PRODUCTION_BYTECODE_CACHE: str | None = None
+    """Directory ``prodserver --prepare`` compiles bytecode into, see ``bytecode``."""
+
+    PRODUCTION_CHECKS_CACHE: str | None = None
+    """Directory remembering passing system checks, see ``system_checks``."""
+
     def __getattribute__(self, __name: str) -> Any:
         """
         Check if a Django project settings should override the app default.
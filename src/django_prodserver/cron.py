@@ -0,0 +1,136 @@
+"""
+Cron expressions.
+
+The five standard fields are supported (minute, hour, day of month, month,
+day of week) with ``*``, lists (``1,15``), ranges (``1-5``), steps (``*/10``,
+``8-18/2``) and the names of months and days (``jan``, ``mon``), as well as the
+``@yearly``, ``@monthly``, ``@weekly``, ``@daily`` and ``@hourly`` shortcuts. As
+in cron, when both the day of month and the day of week are restricted, a day
+matching either runs.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from django.core.exceptions import ImproperlyConfigured
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+MONTHS = ["jan", "feb", "mar", "apr", "may", "jun"]
+MONTHS += ["jul", "aug", "sep", "oct", "nov", "dec"]
+DAYS = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]
+
+# (name, lowest, highest, names of the values from ``lowest``)
+FIELDS: tuple[tuple[str, int, int, list[str]], ...] = (
+    ("minute", 0, 59, []),
+    ("hour", 0, 23, []),
+    ("day of month", 1, 31, []),
+    ("month", 1, 12, MONTHS),
+    ("day of week", 0, 7, DAYS),
+)
+
+# no schedule goes longer than this without running, the rarest date is the
+# 29th of February which comes back within 8 years (around 2100)
+MAX_SEARCH = timedelta(days=366 * 9)
+
+
+class CronSchedule:
+    """A parsed cron expression."""
+
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+        fields = MACROS.get(expression.strip().lower(), expression).split()
+        if len(fields) != len(FIELDS):
+            raise ImproperlyConfigured(
+                f"Invalid cron expression {expression!r}: expected 5 fields."
+            )
+        values = [_parse_field(field, *spec) for field, spec in zip(fields, FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = values
+        # 7 is Sunday too
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+        if self.next_after(datetime(2000, 1, 1)) is None:
+            raise ImproperlyConfigured(
+                f"Cron expression {expression!r} never matches a date."
+            )
+
+    def __repr__(self) -> str:
+        """Show the expression, e.g. in log messages."""
+        return f"CronSchedule({self.expression!r})"
+
+    def matches_day(self, moment: datetime) -> bool:
+        """Whether the expression runs on the day of ``moment``."""
+        day = moment.day in self.days
+        # datetime counts from Monday = 0, cron from Sunday = 0
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day:
+            return weekday
+        if self.any_weekday:
+            return day
+        return day or weekday
+
+    def next_after(self, moment: datetime) -> datetime | None:
+        """The first time the expression matches strictly after ``moment``."""
+        current = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + MAX_SEARCH
+        while current <= limit:
+            if current.month not in self.months:
+                year, month = divmod(current.month, 12)
+                current = current.replace(
+                    year=current.year + year, month=month + 1, day=1, hour=0, minute=0
+                )
+            elif not self.matches_day(current):
+                current = (current + timedelta(days=1)).replace(hour=0, minute=0)
+            elif current.hour not in self.hours:
+                current = (current + timedelta(hours=1)).replace(minute=0)
+            elif current.minute not in self.minutes:
+                current += timedelta(minutes=1)
+            else:
+                return current
+        return None
+
+
+def _parse_field(
+    field: str, name: str, lowest: int, highest: int, names: list[str]
+) -> set[int]:
+    values: set[int] = set()
+    for part in field.lower().split(","):
+        expression, _, step_text = part.partition("/")
+        try:
+            step = int(step_text) if step_text else 1
+            if expression == "*":
+                start, end = lowest, highest
+            elif "-" in expression:
+                first, _, last = expression.partition("-")
+                start = _parse_value(first, lowest, names)
+                end = _parse_value(last, lowest, names)
+            else:
+                start = _parse_value(expression, lowest, names)
+                end = highest if step_text else start
+        except ValueError:
+            raise ImproperlyConfigured(
+                f"Invalid cron {name} field {field!r}."
+            ) from None
+        if step < 1 or not lowest <= start <= end <= highest:
+            raise ImproperlyConfigured(
+                f"Invalid cron {name} field {field!r}: values must be between "
+                f"{lowest} and {highest}."
+            )
+        values.update(range(start, end + 1, step))
+    return values
+
+
+def _parse_value(value: str, lowest: int, names: list[str]) -> int:
+    if value in names:
+        return names.index(value) + lowest
+    return int(value)
@@ -0,0 +1,205 @@
+"""
+Database connection budgeting for multi-worker servers.
+
+Every worker process, and every thread or greenlet inside it, can hold its
+own connection to each configured database. These helpers count those
+connections, so a backend can check them against the ``DATABASE`` key of its
+process before starting:
+
+    {
+        "BACKEND": "django_prodserver.backends.gunicorn.GunicornServer",
+        "ARGS": {"workers": "4", "threads": "8"},
+        "DATABASE": {"MAX_CONNECTIONS": 100, "ON_EXCEED": "adjust", "POOL": True},
+    }
+
+``POOL`` enables the connection pool of Django's PostgreSQL backend (Django
+5.1+ with psycopg 3), sized from the concurrency of each worker.
+
+Forked workers must never use a socket opened by their parent: both processes
+would talk over the same connection. The server process closes its
+connections before forking and every worker drops whatever it inherited, see
+the ``post_fork`` hook added by ``hooks.Hooks.for_process``. ``PREOPEN``
+additionally opens the connections of each worker before it takes work, so
+the first requests do not pay for the handshakes.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import os
+from collections.abc import Mapping
+from typing import Any
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+
+log = logging.getLogger(__name__)
+
+ON_EXCEED_CHOICES = ("warn", "adjust", "error")
+
+POSTGRESQL_ENGINE = "django.db.backends.postgresql"
+
+# seconds a worker waits for its pools to fill when pre-opening connections
+PREOPEN_TIMEOUT = 30.0
+
+# pid of the process which closed its connections before forking workers
+_forked_from: int | None = None
+
+# connections and cache clients inherited from the parent process. They are
+# kept referenced forever, when garbage collected they would be closed and
+# shut down the parent's session on the shared socket.
+_inherited: list[Any] = []
+
+
+class ConnectionBudget:
+    """The ``DATABASE`` key of a process."""
+
+    def __init__(
+        self,
+        max_connections: int | None = None,
+        on_exceed: str = "warn",
+        pool: bool = False,
+        preopen: bool = False,
+    ) -> None:
+        if on_exceed not in ON_EXCEED_CHOICES:
+            raise ImproperlyConfigured(
+                f"DATABASE ON_EXCEED must be one of {', '.join(ON_EXCEED_CHOICES)}, "
+                f"got {on_exceed!r}."
+            )
+        if max_connections is not None and max_connections < 1:
+            raise ImproperlyConfigured(
+                "DATABASE MAX_CONNECTIONS must be a positive integer."
+            )
+        self.max_connections = max_connections
+        self.on_exceed = on_exceed
+        self.pool = pool
+        self.preopen = preopen
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any] | None) -> ConnectionBudget:
+        """Build the budget from the ``DATABASE`` key of a process."""
+        config = config or {}
+        max_connections = config.get("MAX_CONNECTIONS")
+        return cls(
+            max_connections=int(max_connections) if max_connections else None,
+            on_exceed=config.get("ON_EXCEED", "warn"),
+            pool=bool(config.get("POOL", False)),
+            preopen=bool(config.get("PREOPEN", False)),
+        )
+
+    def exceeded(self, per_database: int) -> bool:
+        """Whether ``per_database`` connections are over the budget."""
+        return self.max_connections is not None and per_database > self.max_connections
+
+
+def server_databases() -> list[str]:
+    """Aliases of the databases reached over the network (not SQLite)."""
+    return [
+        alias
+        for alias, config in settings.DATABASES.items()
+        if "sqlite3" not in config.get("ENGINE", "")
+    ]
+
+
+def enable_pooling(aliases: list[str], max_size: int) -> None:
+    """
+    Turn on the psycopg connection pool of the PostgreSQL ``aliases``.
+
+    Each worker gets a pool of up to ``max_size`` connections per database.
+    Pools configured explicitly in ``OPTIONS`` are left untouched. Must run
+    before any connection is opened, the settings are read on first use.
+    """
+    postgres = [
+        alias
+        for alias in aliases
+        if settings.DATABASES[alias].get("ENGINE") == POSTGRESQL_ENGINE
+    ]
+    if not postgres:
+        return
+    if django.VERSION < (5, 1):
+        raise ImproperlyConfigured("DATABASE POOL requires Django 5.1 or later.")
+    for module in ("psycopg", "psycopg_pool"):
+        if importlib.util.find_spec(module) is None:
+            raise ImproperlyConfigured(
+                f"DATABASE POOL requires the {module} package, install psycopg[pool]."
+            )
+    for alias in postgres:
+        config = settings.DATABASES[alias]
+        options = config.setdefault("OPTIONS", {})
+        if options.get("pool"):
+            continue
+        if config.get("CONN_MAX_AGE"):
+            raise ImproperlyConfigured(
+                f"DATABASE POOL cannot be used with persistent connections, set "
+                f"CONN_MAX_AGE to 0 for the {alias!r} database."
+            )
+        options["pool"] = {"min_size": max(1, max_size // 2), "max_size": max_size}
+        log.info("Enabled a pool of up to %s connections for %r", max_size, alias)
+
+
+def _open_pool(connection: Any) -> Any:
+    """The psycopg pool of ``connection`` if it has been created, else None."""
+    pools = getattr(type(connection), "_connection_pools", None) or {}
+    return pools.get(connection.alias)
+
+
+def close_connections() -> None:
+    """
+    Close the database connections and cache clients of this process.
+
+    Called in the server process before it forks workers, the workers then
+    open connections of their own.
+    """
+    global _forked_from
+    _forked_from = os.getpid()
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+        if _open_pool(connection) is not None:
+            connection.close_pool()
+    for cache in caches.all(initialized_only=True):
+        cache.close()
+
+
+def reset_inherited_connections(**kwargs: Any) -> None:
+    """
+    Drop the database connections and cache clients inherited through a fork.
+
+    They are not closed, closing would end the session the parent still
+    uses. Django opens new ones on first use. Does nothing in the process
+    that forked, or in processes which were not forked from it.
+    """
+    if _forked_from is None or _forked_from == os.getpid():
+        return
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is not None:
+            _inherited.append(connection.connection)
+            connection.connection = None
+        pool = _open_pool(connection)
+        if pool is not None:
+            _inherited.append(pool)
+            del type(connection)._connection_pools[connection.alias]
+    for alias in list(caches):
+        if hasattr(caches._connections, alias):
+            _inherited.append(caches[alias])
+            del caches[alias]
+
+
+def preopen_connections(**kwargs: Any) -> None:
+    """
+    Open the database connections of a worker before it takes work.
+
+    Pooled databases are filled up to the ``min_size`` of their pool, others
+    get the connection of the current thread.
+    """
+    for alias in server_databases():
+        connection = connections[alias]
+        pool = getattr(connection, "pool", None)
+        if pool is not None:
+            pool.open(wait=True, timeout=PREOPEN_TIMEOUT)
+        else:
+            connection.ensure_connection()
+        log.debug("Pre-opened connections to %r", alias)
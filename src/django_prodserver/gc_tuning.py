@@ -0,0 +1,296 @@
+"""
+Garbage collector tuning for long-running processes.
+
+The ``GC`` key of a process configures Python's garbage collector:
+
+    {
+        "BACKEND": "django_prodserver.backends.gunicorn.GunicornServer",
+        "GC": {"FREEZE": True, "THRESHOLD": [50000, 20, 10], "COLLECT_INTERVAL": 60},
+    }
+
+* ``FREEZE`` (default True): once the process has warmed up, and again right
+  before forking workers where the backend allows, run a full collection and
+  ``gc.freeze()`` everything left. The collector then never scans, nor writes
+  to, the objects loaded at startup: they stay shared copy-on-write between
+  forked workers and do not make full collections slower.
+* ``THRESHOLD``: the arguments of ``gc.set_threshold()`` in each worker.
+* ``COLLECT_INTERVAL``: seconds between full collections. Automatic full
+  (generation 2) collections are disabled in each worker, and a background
+  thread runs one every interval while no request is being handled. A
+  collection is forced when the worker has not been idle for two intervals.
+
+``"GC": True`` only freezes.
+
+Whether ``GC`` is set or not, every worker records the time it spent paused
+in collections, see ``GCPauses``, and logs it when it exits. The ``METRICS``
+key also exports it, see ``django_prodserver.metrics``.
+"""
+
+from __future__ import annotations
+
+import bisect
+import gc
+import logging
+import os
+import threading
+import time
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+
+log = logging.getLogger(__name__)
+
+GENERATIONS = 3
+
+# upper bounds, in seconds, of the buckets of the pause duration histogram
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# gen-2 threshold large enough that automatic full collections never happen
+# (up to Python 3.13, the incremental collector of 3.14 ignores it)
+NO_FULL_COLLECTIONS = 2**31 - 1
+
+
+class InFlight:
+    """Number of requests being handled by this process."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def enter(self) -> None:
+        """A request started."""
+        with self._lock:
+            self.count += 1
+
+    def exit(self) -> None:
+        """A request finished."""
+        with self._lock:
+            self.count -= 1
+
+
+in_flight = InFlight()
+
+
+class GCPauses:
+    """
+    Collections of each generation, and how long they paused the process.
+
+    Pause durations are counted in the buckets of a histogram (``BUCKETS``,
+    in seconds). Pauses happening while requests are in flight are counted
+    separately, along with the request time they stalled: a pause of 10ms
+    during 3 requests stalls them by 30ms in total.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Start counting from zero, in the current process."""
+        self.pid = os.getpid()
+        self.collections = [0] * GENERATIONS
+        self.seconds = [0.0] * GENERATIONS
+        self.longest = [0.0] * GENERATIONS
+        self.collected = [0] * GENERATIONS
+        # counts per bucket, the last bucket is for pauses over BUCKETS[-1]
+        self.buckets = [[0] * (len(BUCKETS) + 1) for _ in range(GENERATIONS)]
+        self.during_requests = [0] * GENERATIONS
+        self.stalled_request_seconds = [0.0] * GENERATIONS
+        self._started: float | None = None
+        self._in_flight = 0
+
+    def callback(self, phase: str, info: dict[str, int]) -> None:
+        """Record a collection, for ``gc.callbacks``."""
+        if phase == "start":
+            self._started = time.perf_counter()
+            self._in_flight = in_flight.count
+            return
+        if self._started is None:
+            return
+        duration = time.perf_counter() - self._started
+        self._started = None
+        generation = info.get("generation", GENERATIONS - 1)
+        self.collections[generation] += 1
+        self.seconds[generation] += duration
+        self.longest[generation] = max(self.longest[generation], duration)
+        self.collected[generation] += info.get("collected", 0)
+        self.buckets[generation][bisect.bisect_left(BUCKETS, duration)] += 1
+        if self._in_flight:
+            self.during_requests[generation] += 1
+            self.stalled_request_seconds[generation] += duration * self._in_flight
+
+    def to_dict(self) -> dict[str, Any]:
+        """The pauses as JSON serialisable data, by generation."""
+        return {
+            str(generation): {
+                "collections": self.collections[generation],
+                "seconds": self.seconds[generation],
+                "longest_seconds": self.longest[generation],
+                "collected": self.collected[generation],
+                "buckets": self.buckets[generation],
+                "during_requests": self.during_requests[generation],
+                "stalled_request_seconds": self.stalled_request_seconds[generation],
+            }
+            for generation in range(GENERATIONS)
+        }
+
+    def __str__(self) -> str:
+        """Summarise the pauses for the logs."""
+        total = sum(self.seconds) * 1000
+        parts = [
+            f"gen {generation}: {self.collections[generation]} in "
+            f"{self.seconds[generation] * 1000:.1f}ms, longest "
+            f"{self.longest[generation] * 1000:.1f}ms"
+            for generation in range(GENERATIONS)
+        ]
+        summary = f"GC paused for {total:.1f}ms ({'; '.join(parts)})"
+        if any(self.during_requests):
+            summary += (
+                f", {sum(self.during_requests)} pause(s) during requests stalling "
+                f"them by {sum(self.stalled_request_seconds) * 1000:.1f}ms"
+            )
+        return summary
+
+
+# pauses of the current process, recording starts with the worker hooks
+pauses = GCPauses()
+
+
+def record_gc_pauses(**kwargs: Any) -> None:
+    """Start recording the collector's pauses, for the ``worker_ready`` hook."""
+    if pauses.pid != os.getpid():
+        # the counts are those of the process this one was forked from
+        pauses.reset()
+    if pauses.callback not in gc.callbacks:
+        gc.callbacks.append(pauses.callback)
+
+
+def log_gc_pauses(**kwargs: Any) -> None:
+    """Log the pauses of the worker, for the ``worker_exit`` hook."""
+    if pauses.pid == os.getpid() and pauses.callback in gc.callbacks:
+        log.info("%s", pauses)
+
+
+class GCSettings:
+    """The ``GC`` key of a process."""
+
+    def __init__(
+        self,
+        freeze: bool = True,
+        threshold: Sequence[int] | None = None,
+        collect_interval: float | None = None,
+    ) -> None:
+        if threshold is not None and not 1 <= len(threshold) <= GENERATIONS:
+            raise ImproperlyConfigured(
+                "GC THRESHOLD must list one to three thresholds, as gc.set_threshold."
+            )
+        if collect_interval is not None and collect_interval <= 0:
+            raise ImproperlyConfigured("GC COLLECT_INTERVAL must be positive.")
+        self.freeze = freeze
+        self.threshold = list(threshold) if threshold is not None else None
+        self.collect_interval = collect_interval
+        self._collector: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any] | bool | None) -> GCSettings | None:
+        """Build the settings from the ``GC`` key, None when it is not set."""
+        if not config:
+            return None
+        if config is True:
+            return cls()
+        if not isinstance(config, Mapping):
+            raise ImproperlyConfigured("GC must be True or a dictionary.")
+        try:
+            threshold = config.get("THRESHOLD")
+            interval = config.get("COLLECT_INTERVAL")
+            return cls(
+                freeze=bool(config.get("FREEZE", True)),
+                threshold=[int(value) for value in threshold] if threshold else None,
+                collect_interval=float(interval) if interval else None,
+            )
+        except (TypeError, ValueError):
+            raise ImproperlyConfigured(
+                "GC THRESHOLD must be a list of integers and COLLECT_INTERVAL a "
+                "number of seconds."
+            ) from None
+
+    def freeze_heap(self) -> None:
+        """Collect, then move every object left out of the collector's sight."""
+        if not self.freeze:
+            return
+        start = time.perf_counter()
+        gc.collect()
+        gc.freeze()
+        log.debug(
+            "Froze %s objects in %.1fms",
+            gc.get_freeze_count(),
+            (time.perf_counter() - start) * 1000,
+        )
+
+    def configure_worker(self, **kwargs: Any) -> None:
+        """Apply the thresholds, for the ``worker_ready`` hook."""
+        if self.threshold is not None:
+            gc.set_threshold(*self.threshold)
+        if self.collect_interval is not None:
+            threshold = list(gc.get_threshold())
+            threshold[2] = NO_FULL_COLLECTIONS
+            gc.set_threshold(*threshold)
+            self.start_collector(self.collect_interval)
+
+    def start_collector(self, interval: float) -> None:
+        """Start the thread running a full collection every ``interval``."""
+        self._stop.clear()
+        self._collector = threading.Thread(
+            target=self._collect_when_idle,
+            args=(interval,),
+            name="prodserver-gc",
+            daemon=True,
+        )
+        self._collector.start()
+
+    def stop_collector(self, **kwargs: Any) -> None:
+        """Stop the collection thread, for the ``worker_exit`` hook."""
+        self._stop.set()
+
+    def _collect_when_idle(self, interval: float) -> None:
+        last = time.monotonic()
+        while not self._stop.wait(interval):
+            overdue = time.monotonic() - last >= 2 * interval
+            if in_flight.count == 0 or overdue:
+                gc.collect()
+                last = time.monotonic()
+
+
+class InFlightWSGI:
+    """Count the requests being handled by a WSGI application."""
+
+    def __init__(self, application: Any) -> None:
+        self.application = application
+
+    def __call__(self, environ: dict[str, Any], start_response: Any) -> Any:
+        """Handle the request, counted while the application runs."""
+        in_flight.enter()
+        try:
+            return self.application(environ, start_response)
+        finally:
+            in_flight.exit()
+
+
+class InFlightASGI:
+    """Count the requests being handled by an ASGI application."""
+
+    def __init__(self, application: Any) -> None:
+        self.application = application
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        """Handle the request, counted until the response is complete."""
+        # websockets stay open for long, they would never leave the worker idle
+        if scope["type"] != "http":
+            await self.application(scope, receive, send)
+            return
+        in_flight.enter()
+        try:
+            await self.application(scope, receive, send)
+        finally:
+            in_flight.exit()
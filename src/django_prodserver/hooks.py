@@ -0,0 +1,168 @@
+"""
+Lifecycle hooks shared by every backend.
+
+The ``HOOKS`` key of a process maps hook names to a dotted path, or a list of
+dotted paths, of callables:
+
+    {
+        "BACKEND": "django_prodserver.backends.gunicorn.GunicornServer",
+        "HOOKS": {
+            "pre_start": "myproject.hooks.configure_logging",
+            "post_fork": ["myproject.hooks.reset_clients", "myproject.hooks.pin_cpu"],
+            "worker_exit": "myproject.hooks.flush_metrics",
+        },
+    }
+
+* ``pre_start``: in the main process, before warmup and before the server
+  starts.
+* ``post_fork``: in each worker process, as soon as it has been started.
+* ``worker_ready``: in each worker process, once it is about to take work.
+* ``worker_exit``: in each worker process, when it shuts down.
+
+Backends that do not fork run the worker hooks in their own process. Hooks are
+called with keyword arguments only: ``server_name`` (the process name),
+``pid`` and, where the backend numbers its workers, ``worker_id``. They should
+accept ``**kwargs`` so new arguments can be added.
+
+``Hooks.for_process`` adds prodserver's own hooks before the configured ones:
+every worker drops the database connections and cache clients it inherited
+from its parent, opens fresh ones when ``DATABASE`` sets ``PREOPEN``, applies
+the ``GC`` settings of the process, records its garbage collection pauses,
+exports them when ``METRICS`` is set, and installs the ``SAMPLING`` profiler
+and the ``TRACEMALLOC`` tracer.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+from .database import (
+    ConnectionBudget,
+    preopen_connections,
+    reset_inherited_connections,
+)
+from .gc_tuning import GCSettings, log_gc_pauses, record_gc_pauses
+from .memory import MemoryTracer
+from .metrics import Metrics
+from .sampling import SamplingProfiler
+from .utils import PROCESS_ENV_VAR, current_process_config
+
+HOOK_NAMES = ("pre_start", "post_fork", "worker_ready", "worker_exit")
+
+Hook = Callable[..., Any]
+
+# pid of the process the worker hooks were last started in, see
+# ``Hooks.start_worker_once``
+_worker_started_in: int | None = None
+
+
+class Hooks:
+    """The hooks configured for a process."""
+
+    def __init__(
+        self, hooks: Mapping[str, list[Hook]] | None = None, server_name: str = ""
+    ) -> None:
+        self.hooks: dict[str, list[Hook]] = {name: [] for name in HOOK_NAMES}
+        for name, callables in (hooks or {}).items():
+            self.hooks[name].extend(callables)
+        self.server_name = server_name
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Mapping[str, str | list[str]] | None,
+        server_name: str | None = None,
+    ) -> Hooks:
+        """Import the hooks from the ``HOOKS`` key of a process."""
+        hooks: dict[str, list[Hook]] = {}
+        for name, paths in (config or {}).items():
+            if name not in HOOK_NAMES:
+                raise ImproperlyConfigured(
+                    f"Unknown hook '{name}'. Available hooks are: "
+                    f"{', '.join(HOOK_NAMES)}."
+                )
+            if isinstance(paths, str):
+                paths = [paths]
+            try:
+                hooks[name] = [import_string(path) for path in paths]
+            except ImportError as e:
+                raise ImproperlyConfigured(f"Cannot import {name} hook: {e}") from e
+        if server_name is None:
+            server_name = os.environ.get(PROCESS_ENV_VAR, "")
+        return cls(hooks, server_name)
+
+    @classmethod
+    def for_process(
+        cls, config: Mapping[str, Any], server_name: str | None = None
+    ) -> Hooks:
+        """The configured hooks of a process, after prodserver's own."""
+        hooks = cls.from_config(config.get("HOOKS"), server_name)
+        hooks.hooks["post_fork"].insert(0, reset_inherited_connections)
+        if ConnectionBudget.from_config(config.get("DATABASE")).preopen:
+            hooks.hooks["worker_ready"].insert(0, preopen_connections)
+        gc_settings = GCSettings.from_config(config.get("GC"))
+        if gc_settings is not None:
+            hooks.hooks["worker_ready"].insert(0, gc_settings.configure_worker)
+            hooks.hooks["worker_exit"].append(gc_settings.stop_collector)
+        hooks.hooks["worker_ready"].insert(0, record_gc_pauses)
+        hooks.hooks["worker_exit"].append(log_gc_pauses)
+        metrics = Metrics.from_config(config.get("METRICS"), hooks.server_name)
+        if metrics is not None:
+            hooks.hooks["worker_ready"].insert(1, metrics.start_worker)
+            hooks.hooks["worker_exit"].insert(0, metrics.stop_worker)
+        sampler = SamplingProfiler.from_config(
+            config.get("SAMPLING"), hooks.server_name
+        )
+        if sampler is not None:
+            hooks.hooks["worker_ready"].insert(1, sampler.install)
+            hooks.hooks["worker_exit"].insert(0, sampler.uninstall)
+        tracer = MemoryTracer.from_config(config.get("TRACEMALLOC"), hooks.server_name)
+        if tracer is not None:
+            hooks.hooks["worker_ready"].insert(1, tracer.install)
+            hooks.hooks["worker_exit"].insert(0, tracer.uninstall)
+        return hooks
+
+    @classmethod
+    def for_current_process(cls) -> Hooks:
+        """Hooks of the process being served, for use inside its workers."""
+        return cls.for_process(current_process_config())
+
+    def __bool__(self) -> bool:
+        """Whether any hook is configured."""
+        return any(self.hooks.values())
+
+    def register(self, name: str, hook: Hook) -> None:
+        """Add ``hook`` to the callables run for ``name``."""
+        self.hooks[name].append(hook)
+
+    def run(self, name: str, **context: Any) -> None:
+        """Call every hook registered for ``name``."""
+        context.setdefault("server_name", self.server_name)
+        context.setdefault("pid", os.getpid())
+        for hook in self.hooks[name]:
+            hook(**context)
+
+    def start_worker(self, **context: Any) -> None:
+        """Run ``post_fork`` then ``worker_ready`` in a worker that is starting."""
+        self.run("post_fork", **context)
+        self.run("worker_ready", **context)
+
+    def start_worker_once(self) -> None:
+        """
+        Start the worker hooks of this process, unless already done.
+
+        For servers without worker hooks of their own, where this is called
+        when the worker imports the application. ``worker_exit`` runs at exit.
+        """
+        global _worker_started_in
+        if _worker_started_in == os.getpid():
+            return
+        _worker_started_in = os.getpid()
+        self.start_worker()
+        atexit.register(self.run, "worker_exit")
@@ -1,12 +1,26 @@
+from __future__ import annotations
+
+import json
+import os
 import sys
+import tracemalloc
 from argparse import ArgumentParser
-from collections.abc import Mapping
+from collections.abc import Mapping, Sequence
+from typing import Any
 
+from django.conf import settings
 from django.core.management import BaseCommand, CommandError, handle_default_options
 from django.core.management.base import SystemCheckError
 from django.utils.module_loading import import_string
 
+from ...bytecode import compile_bytecode, use_bytecode_cache
 from ...conf import app_settings
+from ...memory import diff_report
+from ...precompress import precompress
+from ...sampling import ProfileReport, SamplingProfiler
+from ...startup import StartupProfileFailure, profile_startup
+from ...system_checks import run_cached
+from ...utils import PROCESS_ENV_VAR, WarmupFailure
 
 
 class Command(BaseCommand):
@@ -36,6 +50,45 @@ class Command(BaseCommand):
             default=default,
         )
         parser.add_argument("--list", action="store_true")
+        parser.add_argument(
+            "--precompress",
+            action="store_true",
+            help="Write .br/.gz siblings of the files in STATIC_ROOT and exit.",
+        )
+        parser.add_argument(
+            "--force-checks",
+            action="store_true",
+            help="Run the system checks even if they passed for this code before.",
+        )
+        parser.add_argument(
+            "--prepare",
+            action="store_true",
+            help="Compile bytecode into PRODUCTION_BYTECODE_CACHE and exit.",
+        )
+        parser.add_argument(
+            "--profile-startup",
+            action="store_true",
+            help="Report where the time goes while the server boots, then exit.",
+        )
+        parser.add_argument(
+            "--profile-report",
+            action="store_true",
+            help="Merge the continuous profiles of the workers, report, then exit.",
+        )
+        parser.add_argument(
+            "--memdiff",
+            nargs=2,
+            metavar=("OLD", "NEW"),
+            help="Report the allocation sites that grew between two TRACEMALLOC "
+            "snapshots, then exit.",
+        )
+        parser.add_argument(
+            "--profile-output",
+            help=(
+                "With --profile-startup, also write the profile to this JSON file. "
+                "With --profile-report, write the merged stacks to this file."
+            ),
+        )
 
     def run_from_argv(self, argv: list[str]) -> None:
         """
@@ -61,7 +114,22 @@ class Command(BaseCommand):
             return
 
         try:
-            self.start_server(*args, **cmd_options)
+            if cmd_options["precompress"]:
+                self.precompress_static_files()
+            elif cmd_options["prepare"]:
+                self.prepare_bytecode_cache()
+            elif cmd_options["profile_startup"]:
+                self.profile_startup(
+                    cmd_options["server_name"], cmd_options["profile_output"]
+                )
+            elif cmd_options["memdiff"]:
+                self.memdiff(cmd_options["memdiff"])
+            elif cmd_options["profile_report"]:
+                self.profile_report(
+                    cmd_options["server_name"], cmd_options["profile_output"]
+                )
+            else:
+                self.start_server(*args, **cmd_options)
         except CommandError as e:
             if options.traceback:
                 raise
@@ -96,9 +164,23 @@ class Command(BaseCommand):
                 f"Backend not configured for server named {server_name}"
             ) from None
 
+        if not kwargs.get("skip_checks"):
+            run_cached(self.check, force=bool(kwargs.get("force_checks")))
+
         backend_class = import_string(server_backend)
 
+        # inherited by every worker process the backend starts
+        os.environ[PROCESS_ENV_VAR] = server_name
+        if app_settings.PRODUCTION_BYTECODE_CACHE:
+            use_bytecode_cache(app_settings.PRODUCTION_BYTECODE_CACHE)
+
         backend = backend_class(**server_config)
+        try:
+            backend.warmup()
+        except WarmupFailure as e:
+            raise CommandError(
+                f"Warmup failed for server named {server_name}: {e}"
+            ) from e
         backend.start_server(*backend.prep_server_args())
 
     def list_process_names(self) -> None:
@@ -109,3 +191,69 @@ class Command(BaseCommand):
                 f"Available production process names are:\n {available_servers}"
             )
         )
+
+    def precompress_static_files(self) -> None:
+        """Pre-compress the collected static files."""
+        if not settings.STATIC_ROOT:
+            raise CommandError(
+                "STATIC_ROOT must be set to pre-compress static files. "
+                "Run collectstatic first."
+            )
+        result = precompress(settings.STATIC_ROOT)
+        self.stdout.write(self.style.SUCCESS(f"Pre-compressed static files: {result}"))
+
+    def prepare_bytecode_cache(self) -> None:
+        """Compile the bytecode of every module into the bytecode cache."""
+        cache_dir = app_settings.PRODUCTION_BYTECODE_CACHE
+        if not cache_dir:
+            raise CommandError(
+                "PRODUCTION_BYTECODE_CACHE must be set to the directory to "
+                "compile bytecode into."
+            )
+        result = compile_bytecode(cache_dir)
+        self.stdout.write(self.style.SUCCESS(f"Prepared {cache_dir}: {result}"))
+
+    def profile_startup(self, server_name: str, output: str | None = None) -> None:
+        """Profile the boot of ``server_name`` and print the report."""
+        self.stdout.write(self.style.NOTICE(f"Profiling startup of {server_name}"))
+        try:
+            profile = profile_startup(server_name)
+        except StartupProfileFailure as e:
+            raise CommandError(
+                f"Server named {server_name} failed to start:\n{e}"
+            ) from e
+        self.stdout.write(profile.report())
+        if output:
+            with open(output, "w") as f:
+                json.dump(profile.to_dict(), f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote the profile to {output}"))
+
+    def profile_report(self, server_name: str, output: str | None = None) -> None:
+        """Merge the continuous profiles of ``server_name`` and print the report."""
+        config: Mapping[str, Any] = app_settings.PRODUCTION_PROCESSES[server_name]
+        profiler = SamplingProfiler.from_config(config.get("SAMPLING"), server_name)
+        if profiler is None:
+            raise CommandError(
+                f"SAMPLING is not configured for server named {server_name}."
+            )
+        report = ProfileReport.from_directory(profiler.continuous_directory)
+        if not report.files:
+            raise CommandError(
+                f"No continuous profiles in {profiler.continuous_directory}."
+            )
+        self.stdout.write(report.report())
+        if output:
+            report.write(output)
+            self.stdout.write(
+                self.style.SUCCESS(f"Wrote the merged stacks to {output}")
+            )
+
+    def memdiff(self, paths: Sequence[str]) -> None:
+        """Print the allocation sites which grew between two memory snapshots."""
+        if len(paths) != 2:
+            raise CommandError("--memdiff takes the OLD and NEW snapshots to compare.")
+        try:
+            old, new = (tracemalloc.Snapshot.load(path) for path in paths)
+        except (OSError, EOFError, ValueError) as e:
+            raise CommandError(f"Cannot load the memory snapshots: {e}") from e
+        self.stdout.write(diff_report(old, new))
@@ -0,0 +1,199 @@
+"""
+Memory snapshots of live workers, to find what leaks.
+
+The ``TRACEMALLOC`` key of a process installs a signal handler in each of its
+workers. Sending the signal to a worker starts ``tracemalloc`` in it, takes a
+snapshot of its allocations every ``INTERVAL`` seconds, ``COUNT`` times, then
+stops tracing:
+
+    {
+        "BACKEND": "django_prodserver.backends.celery.CeleryWorker",
+        "TRACEMALLOC": {"SIGNAL": "SIGURG", "INTERVAL": 300, "COUNT": 6},
+    }
+
+``kill -URG <worker pid>`` then dumps the snapshots to
+``DIR/<pid>-<time>-<n>.tracemalloc``. Along each but the first,
+``DIR/<pid>-<time>-<n>.txt`` reports the ``TOP`` allocation sites (25 by
+default) which grew the most since the first one. ``manage.py prodserver
+--memdiff OLD NEW`` compares any two snapshots, also of different workers.
+
+Allocations are traced with ``FRAMES`` frames (1 by default), sites are
+reported with their whole traceback when it is larger. ``DIR`` defaults to a
+directory named after the process in the temporary directory.
+
+Tracing slows allocations down and takes memory of its own, it only runs
+between the signal and the last snapshot. ``SIGURG`` is ignored by processes
+which do not handle it: sending it to the wrong process is harmless.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import signal
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Mapping
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .sampling import SignalTrigger
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_SUFFIX = ".tracemalloc"
+REPORT_SUFFIX = ".txt"
+
+# allocations made by tracemalloc and the import system are not leaks
+FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _kib(size: int) -> str:
+    return f"{size / 1024:+.1f} KiB"
+
+
+def diff_report(
+    old: tracemalloc.Snapshot, new: tracemalloc.Snapshot, limit: int = 25
+) -> str:
+    """Report the ``limit`` allocation sites which grew the most from old to new."""
+    key_type = "traceback" if new.traceback_limit > 1 else "lineno"
+    stats = new.compare_to(old, key_type)
+    growing = [stat for stat in stats if stat.size_diff > 0]
+    lines = [
+        f"Allocations changed by {_kib(sum(stat.size_diff for stat in stats))}, "
+        f"{len(growing)} site(s) grew",
+        "",
+    ]
+    for stat in growing[:limit]:
+        frame = stat.traceback[0]
+        lines.append(
+            f"  {_kib(stat.size_diff):>14} {stat.count_diff:+8d} blocks  "
+            f"{frame.filename}:{frame.lineno}"
+        )
+        # the callers, when allocations are traced with more than one frame
+        lines += [
+            f"{'':36}from {caller.filename}:{caller.lineno}"
+            for caller in list(stat.traceback)[1:]
+        ]
+    return "\n".join(lines) + "\n"
+
+
+class MemoryTracer:
+    """The ``TRACEMALLOC`` key of a process."""
+
+    def __init__(
+        self,
+        directory: str,
+        signum: int,
+        interval: float = 60.0,
+        count: int = 5,
+        frames: int = 1,
+        top: int = 25,
+    ) -> None:
+        if interval <= 0 or count < 2 or frames < 1 or top < 1:
+            raise ImproperlyConfigured(
+                "TRACEMALLOC INTERVAL must be positive, COUNT at least 2, FRAMES "
+                "and TOP at least 1."
+            )
+        self.directory = directory
+        self.signum = signum
+        self.interval = interval
+        self.count = count
+        self.frames = frames
+        self.top = top
+        self._trigger = SignalTrigger(signum, self.trace, "prodserver-tracemalloc")
+
+    @classmethod
+    def from_config(
+        cls, config: Mapping[str, Any] | bool | None, server_name: str = ""
+    ) -> MemoryTracer | None:
+        """Build the tracer from the ``TRACEMALLOC`` key, None when it is not set."""
+        if not config:
+            return None
+        if config is True:
+            config = {}
+        if not isinstance(config, Mapping):
+            raise ImproperlyConfigured("TRACEMALLOC must be True or a dictionary.")
+        signal_name = config.get("SIGNAL", "SIGURG")
+        signum = getattr(signal, signal_name, None)
+        if not isinstance(signum, int):
+            raise ImproperlyConfigured(
+                f"TRACEMALLOC SIGNAL '{signal_name}' is not available on this platform."
+            )
+        directory = config.get("DIR") or os.path.join(
+            tempfile.gettempdir(), f"prodserver-memory-{server_name or 'default'}"
+        )
+        try:
+            return cls(
+                str(directory),
+                signum,
+                interval=float(config.get("INTERVAL", 60)),
+                count=int(config.get("COUNT", 5)),
+                frames=int(config.get("FRAMES", 1)),
+                top=int(config.get("TOP", 25)),
+            )
+        except (TypeError, ValueError):
+            raise ImproperlyConfigured(
+                "TRACEMALLOC INTERVAL must be a number of seconds, COUNT, FRAMES "
+                "and TOP integers."
+            ) from None
+
+    def install(self, **kwargs: Any) -> None:
+        """Trace when the signal is received, for the ``worker_ready`` hook."""
+        if not self._trigger.start():
+            log.warning("Cannot install the memory tracer outside the main thread.")
+
+    def uninstall(self, **kwargs: Any) -> None:
+        """Stop tracing, keeping the snapshots taken, for ``worker_exit``."""
+        self._trigger.stop()
+
+    def take_snapshot(self) -> tracemalloc.Snapshot:
+        """Snapshot the allocations traced in this process."""
+        return tracemalloc.take_snapshot().filter_traces(FILTERS)
+
+    def trace(self) -> list[str]:
+        """Trace allocations and take the snapshots, return the files written."""
+        log.info(
+            "Tracing the allocations of process %s for %s snapshots",
+            os.getpid(),
+            self.count,
+        )
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start(self.frames)
+        written = []
+        first: tracemalloc.Snapshot | None = None
+        try:
+            for index in range(self.count):
+                if index and self._trigger.stopped.wait(self.interval):
+                    break
+                snapshot = self.take_snapshot()
+                path = os.path.join(
+                    self.directory,
+                    f"{os.getpid()}-{time.strftime('%Y%m%dT%H%M%S')}-{index}",
+                )
+                try:
+                    os.makedirs(self.directory, exist_ok=True)
+                    snapshot.dump(path + SNAPSHOT_SUFFIX)
+                    written.append(path + SNAPSHOT_SUFFIX)
+                    if first is None:
+                        first = snapshot
+                        continue
+                    with open(path + REPORT_SUFFIX, "w") as f:
+                        f.write(diff_report(first, snapshot, self.top))
+                    written.append(path + REPORT_SUFFIX)
+                except OSError as e:
+                    log.warning("Cannot write memory snapshots to %s: %s", path, e)
+                    break
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+        log.info("Wrote %s", ", ".join(written) or "no memory snapshot")
+        return written
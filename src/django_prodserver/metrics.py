@@ -0,0 +1,258 @@
+"""
+Metrics of the workers of a process, served on the readiness side-port.
+
+The ``METRICS`` key of a process makes every worker write a snapshot of its
+metrics to a directory and log a summary every ``INTERVAL`` seconds (60 by
+default). ``GET /metrics`` on the ``READINESS`` port merges the snapshots of
+the workers alive in the Prometheus text format:
+
+    {
+        "BACKEND": "django_prodserver.backends.gunicorn.GunicornServer",
+        "READINESS": {"PORT": 8081},
+        "METRICS": {"INTERVAL": 30, "DIR": "/run/prodserver/metrics"},
+    }
+
+``DIR`` defaults to a directory named after the process in the temporary
+directory. The metrics are labelled with the process name and the pid of the
+worker:
+
+* ``prodserver_gc_pause_seconds``: histogram of the garbage collection pauses,
+  by generation.
+* ``prodserver_gc_collected_objects_total``: objects freed, by generation.
+* ``prodserver_gc_pauses_during_requests_total`` and
+  ``prodserver_gc_stalled_request_seconds_total``: pauses which happened while
+  requests were in flight, and the request time they added up.
+* ``prodserver_requests_in_flight``: requests being handled.
+* ``prodserver_allocated_blocks``: memory blocks allocated by the interpreter.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+from collections.abc import Mapping
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+
+from . import gc_tuning
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_SUFFIX = ".json"
+
+
+class Metrics:
+    """The ``METRICS`` key of a process."""
+
+    def __init__(
+        self, directory: str, interval: float = 60.0, server_name: str = ""
+    ) -> None:
+        if interval <= 0:
+            raise ImproperlyConfigured("METRICS INTERVAL must be positive.")
+        self.directory = directory
+        self.interval = interval
+        self.server_name = server_name
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_config(
+        cls, config: Mapping[str, Any] | bool | None, server_name: str = ""
+    ) -> Metrics | None:
+        """Build the settings from the ``METRICS`` key, None when it is not set."""
+        if not config:
+            return None
+        if config is True:
+            config = {}
+        if not isinstance(config, Mapping):
+            raise ImproperlyConfigured("METRICS must be True or a dictionary.")
+        directory = config.get("DIR") or os.path.join(
+            tempfile.gettempdir(), f"prodserver-metrics-{server_name or 'default'}"
+        )
+        try:
+            interval = float(config.get("INTERVAL", 60))
+        except (TypeError, ValueError):
+            raise ImproperlyConfigured(
+                "METRICS INTERVAL must be a number of seconds."
+            ) from None
+        return cls(str(directory), interval, server_name)
+
+    # worker side
+
+    def snapshot(self) -> dict[str, Any]:
+        """The metrics of the current process."""
+        return {
+            "pid": os.getpid(),
+            "server_name": self.server_name,
+            "gc": gc_tuning.pauses.to_dict(),
+            "requests_in_flight": gc_tuning.in_flight.count,
+            "allocated_blocks": sys.getallocatedblocks(),
+        }
+
+    def write_snapshot(self) -> None:
+        """Write the metrics of the current process for the side-port to read."""
+        try:
+            save_snapshot(self.directory, self.snapshot())
+        except OSError as e:
+            log.warning("Cannot write metrics to %s: %s", self.directory, e)
+
+    def start_worker(self, **kwargs: Any) -> None:
+        """Export the metrics of a worker periodically, for ``worker_ready``."""
+        self.write_snapshot()
+        self._stop.clear()
+        threading.Thread(
+            target=self._export, name="prodserver-metrics", daemon=True
+        ).start()
+
+    def stop_worker(self, **kwargs: Any) -> None:
+        """Stop exporting and remove the worker's snapshot, for ``worker_exit``."""
+        self._stop.set()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self._path(os.getpid()))
+
+    def _export(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write_snapshot()
+            log.info("%s", gc_tuning.pauses)
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"{pid}{SNAPSHOT_SUFFIX}")
+
+    # side-port side
+
+    def snapshots(self) -> list[dict[str, Any]]:
+        """The snapshots of the live workers, removing those of dead ones."""
+        return live_snapshots(self.directory)
+
+    def render(self) -> str:
+        """The metrics of the live workers in the Prometheus text format."""
+        families: dict[str, tuple[str, str, list[str]]] = {}
+
+        def add(name: str, kind: str, help: str, labels: str, value: Any) -> None:
+            family = name
+            for suffix in ("_bucket", "_sum", "_count"):
+                if kind == "histogram" and name.endswith(suffix):
+                    family = name[: -len(suffix)]
+            families.setdefault(family, (kind, help, []))[2].append(
+                f"{name}{{{labels}}} {value}"
+            )
+
+        pause_help = "Garbage collection pauses."
+        for snapshot in self.snapshots():
+            labels = (
+                f'server="{snapshot.get("server_name", "")}",pid="{snapshot["pid"]}"'
+            )
+            for generation, data in sorted(snapshot.get("gc", {}).items()):
+                gen_labels = f'{labels},generation="{generation}"'
+                cumulative = 0
+                bounds = [*map(str, gc_tuning.BUCKETS), "+Inf"]
+                for bound, count in zip(bounds, data["buckets"]):
+                    cumulative += count
+                    add(
+                        "prodserver_gc_pause_seconds_bucket",
+                        "histogram",
+                        pause_help,
+                        f'{gen_labels},le="{bound}"',
+                        cumulative,
+                    )
+                add(
+                    "prodserver_gc_pause_seconds_sum",
+                    "histogram",
+                    pause_help,
+                    gen_labels,
+                    data["seconds"],
+                )
+                add(
+                    "prodserver_gc_pause_seconds_count",
+                    "histogram",
+                    pause_help,
+                    gen_labels,
+                    data["collections"],
+                )
+                add(
+                    "prodserver_gc_collected_objects_total",
+                    "counter",
+                    "Objects freed by garbage collections.",
+                    gen_labels,
+                    data["collected"],
+                )
+                add(
+                    "prodserver_gc_pauses_during_requests_total",
+                    "counter",
+                    "Garbage collection pauses while requests were in flight.",
+                    gen_labels,
+                    data["during_requests"],
+                )
+                add(
+                    "prodserver_gc_stalled_request_seconds_total",
+                    "counter",
+                    "Request time spent waiting for garbage collections.",
+                    gen_labels,
+                    data["stalled_request_seconds"],
+                )
+            add(
+                "prodserver_requests_in_flight",
+                "gauge",
+                "Requests being handled.",
+                labels,
+                snapshot.get("requests_in_flight", 0),
+            )
+            add(
+                "prodserver_allocated_blocks",
+                "gauge",
+                "Memory blocks allocated by the interpreter.",
+                labels,
+                snapshot.get("allocated_blocks", 0),
+            )
+        lines = []
+        for family, (kind, help, samples) in families.items():
+            lines += [f"# HELP {family} {help}", f"# TYPE {family} {kind}", *samples]
+        return "\n".join(lines) + "\n"
+
+
+def save_snapshot(directory: str, snapshot: dict[str, Any]) -> None:
+    """Write the snapshot of the current process to ``directory/<pid>.json``."""
+    path = os.path.join(directory, f"{os.getpid()}{SNAPSHOT_SUFFIX}")
+    os.makedirs(directory, exist_ok=True)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(snapshot, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def live_snapshots(directory: str) -> list[dict[str, Any]]:
+    """
+    Read the ``<pid>.json`` files of ``directory`` written by live processes.
+
+    The files of processes which are not running anymore are removed.
+    """
+    try:
+        names = sorted(os.listdir(directory))
+    except FileNotFoundError:
+        return []
+    snapshots = []
+    for name in names:
+        if not name.endswith(SNAPSHOT_SUFFIX):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            pid = int(name[: -len(SNAPSHOT_SUFFIX)])
+            os.kill(pid, 0)
+        except ValueError:
+            continue
+        except ProcessLookupError:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            continue
+        except PermissionError:
+            pass
+        try:
+            with open(path) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return snapshots
@@ -0,0 +1,213 @@
+"""
+Pre-compression of static assets.
+
+Walks ``STATIC_ROOT`` and writes ``.br`` (when the optional ``brotli`` package
+is installed) and ``.gz`` siblings next to every compressible file, so the
+static fast path can send them without compressing on every request. Work is
+spread over a process pool and a content-hash manifest stored in the static
+root lets later runs skip files that have not changed.
+
+Run it with ``manage.py prodserver --precompress`` (e.g. after
+``collectstatic`` in a Docker build), or at startup with
+``"STATIC": {"PRECOMPRESS": True}``.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+MANIFEST_NAME = "prodserver-precompress.json"
+
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# formats that are already compressed, compressing them again is wasted CPU
+COMPRESSED_EXTENSIONS = {
+    ".7z",
+    ".avif",
+    ".br",
+    ".bz2",
+    ".gif",
+    ".gz",
+    ".heic",
+    ".jpeg",
+    ".jpg",
+    ".mp3",
+    ".mp4",
+    ".ogg",
+    ".pdf",
+    ".png",
+    ".rar",
+    ".webm",
+    ".webp",
+    ".woff",
+    ".woff2",
+    ".xz",
+    ".zip",
+    ".zst",
+}
+
+# files smaller than this fit in a single packet anyway
+MIN_SIZE = 256
+
+# a variant is only kept when it saves at least 5%
+MAX_RATIO = 0.95
+
+
+@dataclass
+class PrecompressResult:
+    """Summary of a precompress run."""
+
+    compressed: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    ignored: int = 0
+
+    def __str__(self) -> str:
+        """One line summary, as printed by ``prodserver --precompress``."""
+        return (
+            f"{len(self.compressed)} file(s) compressed, "
+            f"{self.unchanged} unchanged, {self.ignored} ignored"
+        )
+
+
+def encodings() -> list[str]:
+    """Encodings produced, depending on the available libraries."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def should_compress(path: str) -> bool:
+    """Whether ``path`` is worth compressing."""
+    name = os.path.basename(path)
+    if name == MANIFEST_NAME:
+        return False
+    if os.path.splitext(name)[1].lower() in COMPRESSED_EXTENSIONS:
+        return False
+    try:
+        return os.path.getsize(path) >= MIN_SIZE
+    except OSError:
+        return False
+
+
+def compress_file(
+    path: str, previous_hash: str | None, wanted: list[str]
+) -> tuple[str, str, list[str] | None]:
+    """
+    Write the compressed siblings of ``path`` if its content changed.
+
+    Returns the path, its content hash and the encodings written, or ``None``
+    when the file is unchanged. Runs in the worker processes of the pool.
+    """
+    with open(path, "rb") as fh:
+        data = fh.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if digest == previous_hash:
+        return path, digest, None
+
+    written = []
+    for encoding in wanted:
+        sibling = path + SUFFIXES[encoding]
+        if encoding == "br":
+            compressed = brotli.compress(data)
+        else:
+            compressed = gzip.compress(data, 9, mtime=0)
+        if len(compressed) <= len(data) * MAX_RATIO:
+            tmp_path = f"{sibling}.tmp{os.getpid()}"
+            with open(tmp_path, "wb") as fh:
+                fh.write(compressed)
+            os.replace(tmp_path, sibling)
+            written.append(encoding)
+        elif os.path.exists(sibling):
+            # the file changed and no longer compresses well
+            os.remove(sibling)
+    return path, digest, written
+
+
+def precompress(root: str, workers: int | None = None) -> PrecompressResult:
+    """
+    Compress every compressible file below ``root``.
+
+    ``workers`` defaults to the number of CPUs, ``1`` compresses in-process.
+    """
+    root = os.path.abspath(root)
+    manifest_path = os.path.join(root, MANIFEST_NAME)
+    manifest = _load_manifest(manifest_path)
+    wanted = encodings()
+    result = PrecompressResult()
+
+    jobs = []
+    for dirpath, _dirnames, filenames in os.walk(root, followlinks=True):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if not should_compress(path):
+                result.ignored += 1
+                continue
+            entry = manifest.get(os.path.relpath(path, root), {})
+            jobs.append(
+                (path, entry.get("sha256") if _is_fresh(path, entry, wanted) else None)
+            )
+
+    if workers == 1 or len(jobs) < 2:
+        outcomes = [compress_file(path, digest, wanted) for path, digest in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(
+                executor.map(
+                    compress_file,
+                    [path for path, _ in jobs],
+                    [digest for _, digest in jobs],
+                    [wanted] * len(jobs),
+                    chunksize=16,
+                )
+            )
+
+    new_manifest = {}
+    for path, digest, written in outcomes:
+        relative = os.path.relpath(path, root)
+        if written is None:
+            new_manifest[relative] = manifest[relative]
+            result.unchanged += 1
+        else:
+            new_manifest[relative] = {
+                "sha256": digest,
+                "encodings": wanted,
+                "variants": written,
+            }
+            result.compressed.append(relative)
+    _save_manifest(manifest_path, new_manifest)
+    return result
+
+
+def _is_fresh(path: str, entry: dict[str, Any], wanted: list[str]) -> bool:
+    """Whether the manifest entry still describes the siblings on disk."""
+    if not entry or not set(wanted) <= set(entry.get("encodings", [])):
+        return False
+    return all(
+        os.path.exists(path + SUFFIXES[encoding])
+        for encoding in entry.get("variants", [])
+    )
+
+
+def _load_manifest(path: str) -> dict[str, dict[str, Any]]:
+    try:
+        with open(path) as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _save_manifest(path: str, manifest: dict[str, dict[str, Any]]) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as fh:
+        json.dump(manifest, fh, indent=0, sort_keys=True)
+    os.replace(tmp_path, path)
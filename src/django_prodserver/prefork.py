@@ -0,0 +1,393 @@
+"""
+A small prefork process supervisor.
+
+Used by backends whose server only runs a single process (e.g. waitress) to
+fork several pre-warmed copies of it from a parent that has already loaded
+the application, so they share its memory copy-on-write. The supervisor keeps
+the configured number of workers alive and handles the usual signals:
+
+* ``SIGTERM`` / ``SIGINT``: stop the workers (gracefully, then forcefully).
+* ``SIGHUP``: graceful rolling restart, one worker at a time.
+
+With ``zygote`` the supervisor first forks a ``Zygote``: a copy of itself taken
+right after warmup which does nothing but fork the workers, including
+replacements of crashed or restarted ones. Whatever the supervisor's own heap
+goes through over a long uptime, every worker starts from that pristine state,
+in a few milliseconds, and shares the same pages as its siblings. On Linux the
+supervisor becomes the "child subreaper" of the workers, so it still waits for
+them as its own children. Elsewhere workers are forked by the supervisor.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import ctypes
+import logging
+import os
+import select
+import signal
+import sys
+import time
+from collections.abc import Callable
+from types import FrameType
+
+log = logging.getLogger(__name__)
+
+SUPERVISOR_SIGNALS = (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGCHLD)
+
+# from <linux/prctl.h>
+PR_SET_CHILD_SUBREAPER = 36
+# how long to wait for the zygote to fork a worker before forking it directly
+ZYGOTE_TIMEOUT = 10.0
+
+
+class ZygoteError(Exception):
+    """The zygote could not fork a worker."""
+
+
+def set_child_subreaper() -> bool:
+    """Adopt orphaned descendants of this process, returns whether supported."""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.prctl(PR_SET_CHILD_SUBREAPER, 1, 0, 0, 0) == 0
+    except (OSError, AttributeError):
+        return False
+
+
+class Zygote:
+    """
+    A process forking workers running ``run_child(worker_id)`` on request.
+
+    The zygote forks an intermediate child which forks the worker and exits
+    straight away, so the worker is adopted by the subreaper: the process which
+    called ``set_child_subreaper()`` before ``start()``.
+    """
+
+    def __init__(self, run_child: Callable[[int], None]) -> None:
+        self.run_child = run_child
+        self.pid: int | None = None
+        self._requests: int | None = None
+        self._replies: int | None = None
+
+    def start(self) -> int:
+        """Fork the zygote from the current state of this process."""
+        request_r, request_w = os.pipe()
+        reply_r, reply_w = os.pipe()
+        for stream in (sys.stdout, sys.stderr):
+            stream.flush()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - runs in the zygote
+            os.close(request_w)
+            os.close(reply_r)
+            self._serve(request_r, reply_w)
+        os.close(request_r)
+        os.close(reply_w)
+        self.pid, self._requests, self._replies = pid, request_w, reply_r
+        log.debug("Started zygote (pid %s)", pid)
+        return pid
+
+    def spawn(self, worker_id: int, timeout: float = ZYGOTE_TIMEOUT) -> int:
+        """Have the zygote fork a worker, return the worker's pid."""
+        if self._requests is None or self._replies is None:
+            raise ZygoteError("the zygote is not running")
+        try:
+            os.write(self._requests, f"{worker_id}\n".encode())
+            reply = b""
+            while not reply.endswith(b"\n"):
+                readable, _, _ = select.select([self._replies], [], [], timeout)
+                chunk = os.read(self._replies, 64) if readable else b""
+                if not chunk:
+                    raise ZygoteError("the zygote did not answer")
+                reply += chunk
+            return int(reply)
+        except (OSError, ValueError) as e:
+            raise ZygoteError(str(e)) from e
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Let the zygote exit and wait for it, killing it after ``timeout``."""
+        for fd in (self._requests, self._replies):
+            if fd is not None:
+                os.close(fd)
+        self._requests = self._replies = None
+        if self.pid is None:
+            return
+        deadline = time.monotonic() + timeout
+        with contextlib.suppress(ChildProcessError):
+            while not os.waitpid(self.pid, os.WNOHANG)[0]:
+                if time.monotonic() >= deadline:
+                    with contextlib.suppress(ProcessLookupError):
+                        os.kill(self.pid, signal.SIGKILL)
+                    os.waitpid(self.pid, 0)
+                    break
+                time.sleep(0.01)
+        self.pid = None
+
+    def _serve(self, requests: int, replies: int) -> None:  # pragma: no cover
+        code = 0
+        try:
+            # the supervisor stops the zygote by closing the pipe
+            for signum in (signal.SIGINT, signal.SIGHUP):
+                signal.signal(signum, signal.SIG_IGN)
+            with os.fdopen(requests, "rb", buffering=0) as lines:
+                for line in iter(lines.readline, b""):
+                    worker_id = int(line)
+                    pid_r, pid_w = os.pipe()
+                    intermediate = os.fork()
+                    if intermediate == 0:
+                        os.close(pid_r)
+                        self._fork_worker(worker_id, pid_w, [requests, replies])
+                    os.close(pid_w)
+                    with os.fdopen(pid_r, "rb") as pid_file:
+                        pid = pid_file.read()
+                    # once the intermediate child is reaped, the worker has
+                    # been re-parented to the subreaper
+                    os.waitpid(intermediate, 0)
+                    os.write(replies, pid + b"\n")
+        except BaseException:
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _fork_worker(  # pragma: no cover - runs in the intermediate child
+        self, worker_id: int, pid_w: int, zygote_fds: list[int]
+    ) -> None:
+        pid = os.fork()
+        if pid == 0:
+            os.close(pid_w)
+            for fd in zygote_fds:
+                with contextlib.suppress(OSError):
+                    os.close(fd)
+            for signum in (signal.SIGINT, signal.SIGHUP):
+                signal.signal(signum, signal.SIG_DFL)
+            self.run_child(worker_id)
+        os.write(pid_w, str(pid).encode())
+        os._exit(0)
+
+
+class PreforkSupervisor:
+    """
+    Fork ``processes`` workers each running ``target(worker_id)``.
+
+    ``target`` runs in the forked child and should block while serving. When it
+    returns the worker exits with status 0, if it raises the worker exits with
+    status 1. Workers that exit are respawned until the supervisor stops.
+
+    With ``zygote`` the workers are forked by a ``Zygote`` started when the
+    supervisor runs.
+    """
+
+    def __init__(
+        self,
+        target: Callable[[int], None],
+        processes: int,
+        graceful_timeout: float = 30.0,
+        name: str = "worker",
+        zygote: bool = False,
+    ) -> None:
+        if processes < 1:
+            raise ValueError("A prefork supervisor needs at least one process.")
+        self.target = target
+        self.processes = processes
+        self.graceful_timeout = graceful_timeout
+        self.name = name
+        self.use_zygote = zygote
+        self.zygote: Zygote | None = None
+        self.workers: dict[int, int] = {}
+        self._spawned_at: dict[int, float] = {}
+        self._stopping = False
+        self._reloading = False
+        self._wakeup: tuple[int, int] | None = None
+        self._previous_handlers: dict[int, object] = {}
+
+    # parent side
+
+    def run(self) -> None:
+        """Spawn the workers and supervise them until asked to stop."""
+        if self.use_zygote:
+            # before the signal handlers, the zygote is a copy of the warm state
+            self.start_zygote()
+        self._install_signal_handlers()
+        try:
+            for worker_id in range(self.processes):
+                self.spawn(worker_id)
+            log.info("Started %s %s processes", self.processes, self.name)
+            while not self._stopping:
+                self._wait_for_event(timeout=1.0)
+                if self._reloading:
+                    self._reloading = False
+                    self.graceful_restart()
+                self.reap(respawn=not self._stopping)
+        finally:
+            self.stop()
+            self._restore_signal_handlers()
+
+    def start_zygote(self) -> bool:
+        """Fork the zygote spawning the workers, returns whether it started."""
+        if not set_child_subreaper():
+            log.warning(
+                "A zygote requires Linux, %s processes are forked by the supervisor",
+                self.name,
+            )
+            return False
+        self.zygote = Zygote(self._run_child)
+        self.zygote.start()
+        return True
+
+    def spawn(self, worker_id: int) -> int:
+        """Fork a single worker, from the zygote if there is one, return its pid."""
+        if self.zygote is not None:
+            try:
+                pid = self.zygote.spawn(worker_id)
+            except ZygoteError as e:
+                log.warning(
+                    "The zygote failed (%s), %s processes are now forked by the "
+                    "supervisor",
+                    e,
+                    self.name,
+                )
+                self.zygote.stop()
+                self.zygote = None
+            else:
+                self._add_worker(pid, worker_id)
+                return pid
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - runs in the forked child
+            self._run_child(worker_id)
+        self._add_worker(pid, worker_id)
+        return pid
+
+    def _add_worker(self, pid: int, worker_id: int) -> None:
+        self.workers[pid] = worker_id
+        self._spawned_at[worker_id] = time.monotonic()
+        log.debug("Spawned %s %s (pid %s)", self.name, worker_id, pid)
+
+    def reap(self, respawn: bool = True) -> None:
+        """Collect exited workers and optionally replace them."""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker_id = self.workers.pop(pid, None)
+            if worker_id is None:
+                continue
+            log.warning(
+                "%s %s (pid %s) exited with status %s",
+                self.name.capitalize(),
+                worker_id,
+                pid,
+                os.waitstatus_to_exitcode(status),
+            )
+            if respawn and not self._stopping:
+                # avoid a fork storm when workers crash straight away
+                if time.monotonic() - self._spawned_at.get(worker_id, 0) < 1.0:
+                    time.sleep(1.0)
+                self.spawn(worker_id)
+
+    def graceful_restart(self) -> None:
+        """Replace every worker, one at a time, without dropping the socket."""
+        log.info("Gracefully restarting %s processes", self.name)
+        for pid, worker_id in list(self.workers.items()):
+            self.workers.pop(pid)
+            self.spawn(worker_id)
+            self._terminate(pid)
+
+    def stop(self) -> None:
+        """Ask every worker to exit, killing those that outlive the timeout."""
+        self._stopping = True
+        pids = list(self.workers)
+        self.workers.clear()
+        for pid in pids:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        for pid in pids:
+            self._wait_pid(pid, deadline)
+        if self.zygote is not None:
+            self.zygote.stop()
+            self.zygote = None
+
+    def _terminate(self, pid: int) -> None:
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(pid, signal.SIGTERM)
+        self._wait_pid(pid, time.monotonic() + self.graceful_timeout)
+
+    def _wait_pid(self, pid: int, deadline: float) -> None:
+        while True:
+            try:
+                waited, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if waited:
+                return
+            if time.monotonic() >= deadline:
+                log.warning("Killing %s (pid %s) after timeout", self.name, pid)
+                with contextlib.suppress(ProcessLookupError):
+                    os.kill(pid, signal.SIGKILL)
+                with contextlib.suppress(ChildProcessError):
+                    os.waitpid(pid, 0)
+                return
+            time.sleep(0.05)
+
+    def _install_signal_handlers(self) -> None:
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(read_fd, False)
+        os.set_blocking(write_fd, False)
+        self._wakeup = (read_fd, write_fd)
+        for signum in SUPERVISOR_SIGNALS:
+            self._previous_handlers[signum] = signal.signal(signum, self._on_signal)
+
+    def _restore_signal_handlers(self) -> None:
+        for signum, handler in self._previous_handlers.items():
+            signal.signal(signum, handler)  # type: ignore[arg-type]
+        self._previous_handlers.clear()
+        if self._wakeup:
+            for fd in self._wakeup:
+                os.close(fd)
+            self._wakeup = None
+
+    def _on_signal(self, signum: int, frame: FrameType | None) -> None:
+        if signum in (signal.SIGTERM, signal.SIGINT):
+            self._stopping = True
+        elif signum == signal.SIGHUP:
+            self._reloading = True
+        if self._wakeup:
+            with contextlib.suppress(BlockingIOError):
+                os.write(self._wakeup[1], b"\0")
+
+    def _wait_for_event(self, timeout: float) -> None:
+        if not self._wakeup:
+            time.sleep(timeout)
+            return
+        read_fd = self._wakeup[0]
+        with contextlib.suppress(InterruptedError):
+            readable, _, _ = select.select([read_fd], [], [], timeout)
+            if readable:
+                with contextlib.suppress(BlockingIOError):
+                    os.read(read_fd, 1024)
+
+    # child side
+
+    def _run_child(self, worker_id: int) -> None:  # pragma: no cover
+        code = 0
+        try:
+            for signum in self._previous_handlers:
+                signal.signal(signum, signal.SIG_DFL)
+            if self._wakeup:
+                for fd in self._wakeup:
+                    os.close(fd)
+            self.target(worker_id)
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else int(e.code is not None)
+        except BaseException:
+            log.exception("%s %s crashed", self.name.capitalize(), worker_id)
+            code = 1
+        finally:
+            for stream in (sys.stdout, sys.stderr):
+                with contextlib.suppress(Exception):
+                    stream.flush()
+            os._exit(code)
@@ -0,0 +1,148 @@
+"""
+Readiness reporting for load balancers and orchestrators.
+
+A process only reports itself as ready once warmup has completed, so traffic
+is never routed to a cold process. Readiness can be exposed as a file on disk
+(for ``exec`` style probes) and/or a small HTTP side-port (for ``httpGet``
+style probes), configured per process:
+
+    {
+        "BACKEND": "django_prodserver.backends.gunicorn.GunicornServer",
+        "ARGS": {"bind": "0.0.0.0:8000"},
+        "READINESS": {"FILE": "/tmp/web.ready", "PORT": 8081},
+    }
+
+The side-port also serves ``/metrics`` when the process sets ``METRICS``, see
+``django_prodserver.metrics``, and ``/profiles`` when its ``REQUEST_PROFILING``
+sets ``PAGE``, see ``django_prodserver.request_profiling``. None of these
+pages is authenticated and the side-port listens on every interface unless
+``HOST`` says otherwise.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextlib
+import logging
+import os
+import threading
+from collections.abc import Callable, Mapping
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+log = logging.getLogger(__name__)
+
+
+class _ProbeRequestHandler(BaseHTTPRequestHandler):
+    """Answer every GET with the readiness state of the owning probe."""
+
+    probe: ReadinessProbe
+
+    def do_GET(self) -> None:
+        """Respond with 200 once ready, 503 until then."""
+        status, body = self.probe.http_response(self.path)
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Silence the default stderr access log, probes are very chatty."""
+
+
+class ReadinessProbe:
+    """
+    Expose the readiness state of a prodserver process.
+
+    The probe starts in the "not ready" state. ``mark_ready`` is called once
+    the server accepts connections by the backends which can tell (gunicorn's
+    ``when_ready``, celery's ``worker_ready``), by the others once warmup has
+    completed, just before they bind their public port.
+    """
+
+    def __init__(
+        self,
+        file: str | None = None,
+        port: int | None = None,
+        host: str = "0.0.0.0",  # noqa: S104
+    ) -> None:
+        self.file = file
+        self.port = port
+        self.host = host
+        self.ready = False
+        # renderers of the other pages served by the side-port, by path
+        self.pages: dict[str, Callable[[], str]] = {}
+        self._server: ThreadingHTTPServer | None = None
+        self._owner_pid = os.getpid()
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any] | None) -> ReadinessProbe:
+        """Build a probe from the ``READINESS`` key of a process entry."""
+        if not config:
+            return cls()
+        port = config.get("PORT")
+        return cls(
+            file=config.get("FILE"),
+            port=int(port) if port is not None else None,
+            host=config.get("HOST", "0.0.0.0"),  # noqa: S104
+        )
+
+    def start(self) -> None:
+        """Publish the "not ready" state before warmup begins."""
+        if self.file:
+            self._owner_pid = os.getpid()
+            self._remove_file()
+            atexit.register(self._remove_file)
+        if self.port is not None and self._server is None:
+            handler = type(
+                "ProbeRequestHandler", (_ProbeRequestHandler,), {"probe": self}
+            )
+            self._server = ThreadingHTTPServer((self.host, self.port), handler)
+            self._server.daemon_threads = True
+            thread = threading.Thread(
+                target=self._server.serve_forever,
+                name="prodserver-readiness",
+                daemon=True,
+            )
+            thread.start()
+            log.info("Readiness probe listening on %s:%s", self.host, self.port)
+
+    def mark_ready(self) -> None:
+        """Flip the probe to ready, warmup has completed."""
+        self.ready = True
+        if self.file:
+            tmp_file = f"{self.file}.tmp"
+            with open(tmp_file, "w") as fh:
+                fh.write(f"{os.getpid()}\n")
+            os.replace(tmp_file, self.file)
+
+    def mark_not_ready(self) -> None:
+        """Flip the probe back to not ready, e.g. while shutting down."""
+        self.ready = False
+        if self.file:
+            self._remove_file()
+
+    def stop(self) -> None:
+        """Stop serving the HTTP side-port."""
+        self.mark_not_ready()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def http_response(self, path: str) -> tuple[int, bytes]:
+        """Status code and body served by the HTTP side-port for ``path``."""
+        page = self.pages.get(path.partition("?")[0])
+        if page is not None:
+            return 200, page().encode()
+        if self.ready:
+            return 200, b"ready\n"
+        return 503, b"starting\n"
+
+    def _remove_file(self) -> None:
+        # forked workers inherit the atexit hook, only the owner cleans up
+        if self.file and os.getpid() == self._owner_pid:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.file)
@@ -0,0 +1,297 @@
+"""
+Profiling a sample of production requests with ``cProfile``.
+
+The ``REQUEST_PROFILING`` key of a process profiles some of the requests its
+WSGI workers serve, so slow endpoints can be investigated without reproducing
+production traffic locally:
+
+    {
+        "BACKEND": "django_prodserver.backends.gunicorn.GunicornServer",
+        "READINESS": {"PORT": 8081},
+        "REQUEST_PROFILING": {"RATE": 0.001, "PATHS": ["^/api/"], "KEEP": 100},
+    }
+
+A request is profiled when any of these holds:
+
+* ``RATE``: it is picked at random, with this probability. It defaults to 0.01,
+  or to 0 when ``PATHS`` or ``HEADER`` already select the requests.
+* ``PATHS``: its path matches one of these regular expressions.
+* ``HEADER``: it carries this header, e.g. ``X-Profile``. When ``TOKEN`` is
+  set, the header must hold that value, otherwise any client can have its
+  requests profiled.
+
+Each profile records the view the request resolved to, how long it took and
+the ``TOP`` functions (20 by default) it spent the most time in. Each worker
+keeps its last ``KEEP`` profiles (100 by default) in memory and writes them to
+``DIR/<pid>.json``, ``DIR`` defaulting to a directory named after the process
+in the temporary directory. With ``"PAGE": True``, ``GET /profiles`` on the
+``READINESS`` port reports the profiles of the live workers by view. The page
+has no authentication and shows request paths, view names and source files:
+only turn it on when the port is not reachable from outside.
+
+A worker profiles one request at a time, requests arriving meanwhile are
+served without profiling. From Python 3.12 ``cProfile`` measures every thread
+of the process, the profile of a request would include the others served at
+the same time: workers running several threads (``wsgi.multithread``) do not
+profile there. ``"REQUEST_PROFILING": True`` uses the defaults.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import hmac
+import logging
+import os
+import pstats
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .metrics import live_snapshots, save_snapshot
+from .sampling import endpoint_name
+
+log = logging.getLogger(__name__)
+
+# cProfile runs on sys.monitoring from Python 3.12, which sees every thread
+PROCESS_WIDE = sys.version_info >= (3, 12)
+
+
+@dataclass
+class RequestProfile:
+    """The profile of one request."""
+
+    view: str
+    method: str
+    path: str
+    seconds: float
+    # the functions the request spent the most time in, by their own time
+    functions: list[dict[str, Any]] = field(default_factory=list)
+    started_at: float = 0.0
+
+
+def function_name(filename: str, line: int, name: str) -> str:
+    """Name of a function in the stats of ``cProfile``."""
+    if filename == "~":
+        # built-in functions
+        return name
+    return f"{name} ({filename}:{line})"
+
+
+def top_functions(profiler: cProfile.Profile, limit: int) -> list[dict[str, Any]]:
+    """The ``limit`` functions ``profiler`` measured the most own time in."""
+    stats = pstats.Stats(profiler).stats  # type: ignore[attr-defined]
+    ranked = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)
+    return [
+        {
+            "function": function_name(*key),
+            "calls": calls,
+            "seconds": own,
+            "cumulative_seconds": cumulative,
+        }
+        for key, (_, calls, own, cumulative, _) in ranked[:limit]
+    ]
+
+
+class RequestProfiler:
+    """The ``REQUEST_PROFILING`` key of a process."""
+
+    def __init__(
+        self,
+        directory: str,
+        rate: float | None = None,
+        paths: list[str] | None = None,
+        header: str | None = None,
+        token: str | None = None,
+        top: int = 20,
+        keep: int = 100,
+        page: bool = False,
+    ) -> None:
+        if rate is None:
+            # an allowlist alone must not profile other requests at random
+            rate = 0.0 if paths or header else 0.01
+        if not 0 <= rate <= 1:
+            raise ImproperlyConfigured(
+                "REQUEST_PROFILING RATE must be between 0 and 1."
+            )
+        if top <= 0 or keep <= 0:
+            raise ImproperlyConfigured(
+                "REQUEST_PROFILING TOP and KEEP must be positive."
+            )
+        try:
+            self.paths = [re.compile(pattern) for pattern in paths or []]
+        except re.error as e:
+            raise ImproperlyConfigured(
+                f"REQUEST_PROFILING PATHS must be regular expressions: {e}"
+            ) from e
+        self.directory = directory
+        self.rate = rate
+        # the key of the header in the WSGI environ
+        self.header = "HTTP_" + header.upper().replace("-", "_") if header else None
+        self.token = token
+        self.top = top
+        # whether the readiness side-port serves ``/profiles``
+        self.page = page
+        self.profiles: deque[RequestProfile] = deque(maxlen=keep)
+
+    @classmethod
+    def from_config(
+        cls, config: Mapping[str, Any] | bool | None, server_name: str = ""
+    ) -> RequestProfiler | None:
+        """Build the profiler from ``REQUEST_PROFILING``, None when it is not set."""
+        if not config:
+            return None
+        if config is True:
+            config = {}
+        if not isinstance(config, Mapping):
+            raise ImproperlyConfigured(
+                "REQUEST_PROFILING must be True or a dictionary."
+            )
+        directory = config.get("DIR") or os.path.join(
+            tempfile.gettempdir(), f"prodserver-requests-{server_name or 'default'}"
+        )
+        paths = config.get("PATHS") or []
+        rate = config.get("RATE")
+        try:
+            return cls(
+                str(directory),
+                rate=float(rate) if rate is not None else None,
+                paths=[paths] if isinstance(paths, str) else list(paths),
+                header=config.get("HEADER"),
+                token=config.get("TOKEN"),
+                top=int(config.get("TOP", 20)),
+                keep=int(config.get("KEEP", 100)),
+                page=bool(config.get("PAGE", False)),
+            )
+        except (TypeError, ValueError):
+            raise ImproperlyConfigured(
+                "REQUEST_PROFILING RATE must be a number, TOP and KEEP integers."
+            ) from None
+
+    def should_profile(self, environ: Mapping[str, Any]) -> bool:
+        """Whether the request described by ``environ`` is to be profiled."""
+        if self.header and self.header in environ:
+            if self.token is None or hmac.compare_digest(
+                str(environ[self.header]).encode(), self.token.encode()
+            ):
+                return True
+        path = environ.get("PATH_INFO") or "/"
+        if any(pattern.search(path) for pattern in self.paths):
+            return True
+        return random.random() < self.rate  # noqa: S311
+
+    def record(self, profile: RequestProfile) -> None:
+        """Keep ``profile`` and write the worker's profiles for the side-port."""
+        self.profiles.append(profile)
+        log.info(
+            "Profiled %s %s (%s) in %.1fms",
+            profile.method,
+            profile.path,
+            profile.view,
+            profile.seconds * 1000,
+        )
+        snapshot = {
+            "pid": os.getpid(),
+            "profiles": [asdict(kept) for kept in self.profiles],
+        }
+        try:
+            save_snapshot(self.directory, snapshot)
+        except OSError as e:
+            log.warning("Cannot write request profiles to %s: %s", self.directory, e)
+
+    def render(self) -> str:
+        """Report the profiles kept by the live workers, by view."""
+        by_view: dict[str, list[dict[str, Any]]] = {}
+        snapshots = live_snapshots(self.directory)
+        for snapshot in snapshots:
+            for profile in snapshot.get("profiles", []):
+                by_view.setdefault(profile["view"], []).append(profile)
+        total = sum(len(profiles) for profiles in by_view.values())
+        lines = [f"Request profiles: {total} from {len(snapshots)} worker(s)"]
+        ranked = sorted(
+            by_view.items(),
+            key=lambda item: sum(profile["seconds"] for profile in item[1]),
+            reverse=True,
+        )
+        for view, profiles in ranked:
+            seconds = [profile["seconds"] for profile in profiles]
+            lines += [
+                "",
+                f"{view}: {len(profiles)} request(s), "
+                f"{sum(seconds) / len(seconds) * 1000:.1f}ms average, "
+                f"slowest {max(seconds) * 1000:.1f}ms",
+            ]
+            functions: dict[str, float] = {}
+            for profile in profiles:
+                for function in profile["functions"]:
+                    name = function["function"]
+                    functions[name] = functions.get(name, 0.0) + function["seconds"]
+            slowest = sorted(functions.items(), key=lambda item: item[1], reverse=True)
+            lines += [
+                f"  {seconds * 1000:9.1f}ms  {name}"
+                for name, seconds in slowest[: self.top]
+            ]
+        return "\n".join(lines) + "\n"
+
+
+class ProfiledWSGI:
+    """Profile some of the requests of a WSGI application."""
+
+    def __init__(self, application: Any, profiler: RequestProfiler) -> None:
+        self.application = application
+        self.profiler = profiler
+        self._busy = threading.Lock()
+        self._warned_threads = False
+
+    def __call__(self, environ: dict[str, Any], start_response: Any) -> Any:
+        """Handle the request, profiling it when picked."""
+        if not self.profiler.should_profile(environ):
+            return self.application(environ, start_response)
+        if PROCESS_WIDE and environ.get("wsgi.multithread"):
+            if not self._warned_threads:
+                self._warned_threads = True
+                log.warning(
+                    "Not profiling requests: the profile of a request served by "
+                    "a threaded worker would include the other threads."
+                )
+            return self.application(environ, start_response)
+        if not self._busy.acquire(blocking=False):
+            return self.application(environ, start_response)
+        try:
+            return self._profile(environ, start_response)
+        finally:
+            self._busy.release()
+
+    def _profile(self, environ: dict[str, Any], start_response: Any) -> Any:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # another profiler is active in this process
+            return self.application(environ, start_response)
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            return self.application(environ, start_response)
+        finally:
+            profiler.disable()
+            seconds = time.perf_counter() - start
+            path = environ.get("PATH_INFO") or "/"
+            self.profiler.record(
+                RequestProfile(
+                    view=endpoint_name(path),
+                    method=environ.get("REQUEST_METHOD", ""),
+                    path=path,
+                    seconds=seconds,
+                    functions=top_functions(profiler, self.profiler.top),
+                    started_at=started_at,
+                )
+            )
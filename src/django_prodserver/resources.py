@@ -0,0 +1,104 @@
+"""
+Discovery of the resources available to the current process.
+
+Containers commonly restrict CPU and memory through cgroups while
+``os.cpu_count()`` still reports every core of the host, so backends that
+size themselves automatically should use these helpers instead.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+# cgroup v1 reports "no limit" as a very large number rather than "max"
+_UNLIMITED_THRESHOLD = 1 << 60
+
+_SIZE_UNITS = {
+    "": 1,
+    "b": 1,
+    "k": 1024,
+    "kb": 1024,
+    "kib": 1024,
+    "m": 1024**2,
+    "mb": 1024**2,
+    "mib": 1024**2,
+    "g": 1024**3,
+    "gb": 1024**3,
+    "gib": 1024**3,
+}
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([a-zA-Z]*)\s*$")
+
+
+def _read(*parts: str) -> str | None:
+    try:
+        with open(os.path.join(CGROUP_ROOT, *parts)) as fh:
+            return fh.read().strip()
+    except OSError:
+        return None
+
+
+def _cgroup_cpu_quota() -> float | None:
+    """CPU quota of the current cgroup in cores, ``None`` when unlimited."""
+    cpu_max = _read("cpu.max")
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+    cfs_quota = _read("cpu", "cpu.cfs_quota_us")
+    cfs_period = _read("cpu", "cpu.cfs_period_us")
+    if cfs_quota and cfs_period and int(cfs_quota) > 0:
+        return int(cfs_quota) / int(cfs_period)
+    return None
+
+
+def available_cpus() -> int:
+    """
+    Number of CPUs this process can actually use.
+
+    Takes the CPU affinity mask and any cgroup CPU quota into account.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return max(1, cpus)
+
+
+def memory_limit() -> int | None:
+    """
+    Memory available to this process in bytes.
+
+    Returns the cgroup memory limit when there is one, otherwise the physical
+    memory of the host, or ``None`` if neither can be determined.
+    """
+    for parts in (("memory.max",), ("memory", "memory.limit_in_bytes")):
+        value = _read(*parts)
+        if value and value != "max" and int(value) < _UNLIMITED_THRESHOLD:
+            return int(value)
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def parse_size(value: str | int) -> int:
+    """
+    Convert a human readable size such as ``"256KB"`` or ``"1.5M"`` to bytes.
+
+    Units are binary (``1KB == 1024``). Raises ``ValueError`` for bad input.
+    """
+    if isinstance(value, int):
+        return value
+    match = _SIZE_RE.match(value)
+    if not match or match.group(2).lower() not in _SIZE_UNITS:
+        raise ValueError(f"Invalid size {value!r}")
+    number, unit = match.groups()
+    return int(float(number) * _SIZE_UNITS[unit.lower()])
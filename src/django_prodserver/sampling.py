@@ -0,0 +1,487 @@
+"""
+Statistical profiling of live workers.
+
+The ``SAMPLING`` key of a process installs a signal handler in each of its
+workers. Sending the signal to a worker records the stacks of all its threads
+every ``INTERVAL`` seconds for ``DURATION`` seconds, without restarting it or
+attaching a debugger, then writes them to ``DIR`` in the collapsed stack
+format read by ``flamegraph.pl``, speedscope or inferno:
+
+    {
+        "BACKEND": "django_prodserver.backends.gunicorn.GunicornServer",
+        "SAMPLING": {"SIGNAL": "SIGUSR2", "DURATION": 30, "INTERVAL": 0.01},
+    }
+
+``kill -USR2 <worker pid>`` then writes ``DIR/<pid>-<time>.collapsed``.
+``"SAMPLING": True`` uses the defaults shown above. ``DIR`` defaults to a
+directory named after the process in the temporary directory.
+
+Samples are taken by a thread of the worker, the handler only wakes it up.
+Stacks are sampled whatever the threads are doing, so threads waiting for
+work show up as well.
+
+``CONTINUOUS`` also samples every worker all the time, that many times a
+second (``True`` for 10), to track where the time goes over days:
+
+    "SAMPLING": {"CONTINUOUS": 10, "ROTATE": 3600, "RETENTION": 7}
+
+The stack of each thread serving a request starts with the name of the view
+it resolved to, as in ``reverse()``, other threads with ``(no request)``.
+Views are only known under WSGI, ASGI requests are not told apart. Samples
+are aggregated per ``ROTATE`` seconds (an hour by default) in
+``DIR/continuous/<start>-<pid>.collapsed``, rewritten every minute, and the
+files older than ``RETENTION`` days (7 by default) are removed.
+``manage.py prodserver <name> --profile-report`` merges them, see
+``ProfileReport``.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+import select
+import signal
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Mapping
+from types import FrameType
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import Resolver404, resolve
+
+log = logging.getLogger(__name__)
+
+COLLAPSED_SUFFIX = ".collapsed"
+CONTINUOUS_DIR = "continuous"
+
+# root frame of the samples of threads not serving a request
+NO_REQUEST = "(no request)"
+
+# seconds between writes of the current window of the continuous profile
+FLUSH_INTERVAL = 60.0
+
+# prodserver's own threads, never sampled
+_sampler_threads: set[int] = set()
+
+
+class Endpoints:
+    """The view each thread of this process is serving."""
+
+    def __init__(self) -> None:
+        self.by_thread: dict[int, str] = {}
+
+    def enter(self, name: str) -> None:
+        """The current thread started serving a request for ``name``."""
+        self.by_thread[threading.get_ident()] = name
+
+    def exit(self) -> None:
+        """The current thread finished its request."""
+        self.by_thread.pop(threading.get_ident(), None)
+
+
+endpoints = Endpoints()
+
+
+def endpoint_name(path: str) -> str:
+    """Name of the view serving ``path``, its URL name or dotted path."""
+    try:
+        return resolve(path).view_name
+    except Resolver404:
+        return "(not found)"
+
+
+def frame_name(frame: FrameType) -> str:
+    """Name of a frame's function, with where it is defined."""
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+def collapse(frame: FrameType | None) -> str:
+    """The stack ending at ``frame``, outermost first, separated by ``;``."""
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class EndpointsWSGI:
+    """Record the view each thread of a WSGI application is serving."""
+
+    def __init__(self, application: Any) -> None:
+        self.application = application
+
+    def __call__(self, environ: dict[str, Any], start_response: Any) -> Any:
+        """Handle the request, labelled while the application runs."""
+        endpoints.enter(endpoint_name(environ.get("PATH_INFO") or "/"))
+        try:
+            return self.application(environ, start_response)
+        finally:
+            endpoints.exit()
+
+
+class StackSampler:
+    """
+    Counts of the stacks of this process's threads, sampled periodically.
+
+    With ``labels``, the stack of each thread starts with its label, or
+    ``NO_REQUEST`` for threads without one.
+    """
+
+    def __init__(
+        self, interval: float, labels: Mapping[int, str] | None = None
+    ) -> None:
+        self.interval = interval
+        self.labels = labels
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+
+    def sample(self) -> None:
+        """Record the current stack of every other thread."""
+        current = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == current or ident in _sampler_threads:
+                continue
+            stack = collapse(frame)
+            if self.labels is not None:
+                stack = f"{self.labels.get(ident, NO_REQUEST)};{stack}"
+            self.stacks[stack] += 1
+        self.samples += 1
+
+    def run(self, duration: float, stop: threading.Event) -> None:
+        """Sample for ``duration`` seconds, or until ``stop`` is set."""
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline and not stop.wait(self.interval):
+            self.sample()
+
+    def write(self, path: str) -> None:
+        """Write the stacks in the collapsed format, one stack per line."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        os.replace(f"{path}.tmp", path)
+
+
+class SignalTrigger:
+    """
+    Run ``action`` in a thread of its own each time ``signum`` is received.
+
+    The signal handler only wakes the thread up, as locks and logging are not
+    safe in it. Signals received while ``action`` runs do not run it again.
+    """
+
+    def __init__(self, signum: int, action: Callable[[], Any], name: str) -> None:
+        self.signum = signum
+        self.action = action
+        self.name = name
+        self.stopped = threading.Event()
+        self._wakeup: tuple[int, int] | None = None
+        self._previous_handler: Any = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> bool:
+        """Install the handler, False outside the main thread where it cannot."""
+        if threading.current_thread() is not threading.main_thread():
+            return False
+        self.stopped.clear()
+        self._wakeup = os.pipe()
+        for fd in self._wakeup:
+            os.set_blocking(fd, False)
+        self._previous_handler = signal.signal(self.signum, self._on_signal)
+        self._thread = threading.Thread(
+            target=self._serve, args=(self._wakeup[0],), name=self.name, daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """Restore the previous handler and stop the thread."""
+        self.stopped.set()
+        if self._wakeup is None or self._thread is None:
+            return
+        with contextlib.suppress(ValueError):
+            signal.signal(self.signum, self._previous_handler)
+        self._on_signal(self.signum, None)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            for fd in self._wakeup:
+                os.close(fd)
+            self._wakeup = None
+
+    def _on_signal(self, signum: int, frame: FrameType | None) -> None:
+        if self._wakeup is not None:
+            with contextlib.suppress(BlockingIOError):
+                os.write(self._wakeup[1], b"\0")
+
+    def _serve(self, read_fd: int) -> None:
+        _sampler_threads.add(threading.get_ident())
+        try:
+            while not self.stopped.is_set():
+                select.select([read_fd], [], [])
+                self._drain(read_fd)
+                if not self.stopped.is_set():
+                    self.action()
+                    self._drain(read_fd)
+        finally:
+            # thread idents are reused once threads exit
+            _sampler_threads.discard(threading.get_ident())
+
+    @staticmethod
+    def _drain(fd: int) -> None:
+        with contextlib.suppress(BlockingIOError):
+            os.read(fd, 4096)
+
+
+class SamplingProfiler:
+    """The ``SAMPLING`` key of a process."""
+
+    def __init__(
+        self,
+        directory: str,
+        signum: int,
+        duration: float = 30.0,
+        interval: float = 0.01,
+        continuous: float | None = None,
+        rotate: float = 3600.0,
+        retention: float = 7.0,
+    ) -> None:
+        if min(duration, interval, continuous or 1, rotate, retention) <= 0:
+            raise ImproperlyConfigured(
+                "SAMPLING DURATION, INTERVAL, CONTINUOUS, ROTATE and RETENTION "
+                "must be positive."
+            )
+        self.directory = directory
+        self.signum = signum
+        self.duration = duration
+        self.interval = interval
+        self.continuous = continuous
+        self.rotate = rotate
+        self.retention = retention
+        self._stop = threading.Event()
+        self._trigger = SignalTrigger(signum, self.profile, "prodserver-sampler")
+        self._continuous_thread: threading.Thread | None = None
+
+    @classmethod
+    def from_config(
+        cls, config: Mapping[str, Any] | bool | None, server_name: str = ""
+    ) -> SamplingProfiler | None:
+        """Build the profiler from the ``SAMPLING`` key, None when it is not set."""
+        if not config:
+            return None
+        if config is True:
+            config = {}
+        if not isinstance(config, Mapping):
+            raise ImproperlyConfigured("SAMPLING must be True or a dictionary.")
+        signal_name = config.get("SIGNAL", "SIGUSR2")
+        signum = getattr(signal, signal_name, None)
+        if not isinstance(signum, int):
+            raise ImproperlyConfigured(
+                f"SAMPLING SIGNAL '{signal_name}' is not available on this platform."
+            )
+        directory = config.get("DIR") or os.path.join(
+            tempfile.gettempdir(), f"prodserver-profiles-{server_name or 'default'}"
+        )
+        continuous = config.get("CONTINUOUS")
+        if continuous is True:
+            continuous = 10
+        try:
+            return cls(
+                str(directory),
+                signum,
+                duration=float(config.get("DURATION", 30)),
+                interval=float(config.get("INTERVAL", 0.01)),
+                continuous=float(continuous) if continuous else None,
+                rotate=float(config.get("ROTATE", 3600)),
+                retention=float(config.get("RETENTION", 7)),
+            )
+        except (TypeError, ValueError):
+            raise ImproperlyConfigured(
+                "SAMPLING DURATION, INTERVAL, ROTATE and RETENTION must be numbers "
+                "and CONTINUOUS a number of samples per second."
+            ) from None
+
+    @property
+    def continuous_directory(self) -> str:
+        """Directory of the continuous profiles."""
+        return os.path.join(self.directory, CONTINUOUS_DIR)
+
+    def install(self, **kwargs: Any) -> None:
+        """Sample when the signal is received, for the ``worker_ready`` hook."""
+        self._stop.clear()
+        if self.continuous:
+            self._continuous_thread = threading.Thread(
+                target=self._sample_continuously,
+                args=(self.continuous,),
+                name="prodserver-profiler",
+                daemon=True,
+            )
+            self._continuous_thread.start()
+        if not self._trigger.start():
+            log.warning("Cannot install the sampling profiler outside the main thread.")
+
+    def uninstall(self, **kwargs: Any) -> None:
+        """Stop sampling, keeping what was sampled, for the ``worker_exit`` hook."""
+        self._stop.set()
+        if self._continuous_thread is not None:
+            self._continuous_thread.join(1)
+        self._trigger.stop()
+
+    def profile(self) -> str | None:
+        """Sample this process for ``duration``, return the file written."""
+        log.info(
+            "Sampling the stacks of process %s for %ss", os.getpid(), self.duration
+        )
+        sampler = StackSampler(self.interval)
+        sampler.run(self.duration, self._stop)
+        path = os.path.join(
+            self.directory,
+            f"{os.getpid()}-{time.strftime('%Y%m%dT%H%M%S')}{COLLAPSED_SUFFIX}",
+        )
+        try:
+            sampler.write(path)
+        except OSError as e:
+            log.warning("Cannot write the sampled stacks to %s: %s", path, e)
+            return None
+        log.info(
+            "Wrote %s samples of %s stacks to %s",
+            sampler.samples,
+            len(sampler.stacks),
+            path,
+        )
+        return path
+
+    def _sample_continuously(self, rate: float) -> None:
+        _sampler_threads.add(threading.get_ident())
+        sampler: StackSampler | None = None
+        window = 0.0
+        written = time.monotonic()
+        try:
+            while not self._stop.wait(1 / rate):
+                now = time.time()
+                if sampler is None or now - window >= self.rotate:
+                    if sampler is not None:
+                        self._write_window(sampler, window)
+                    sampler = StackSampler(1 / rate, endpoints.by_thread)
+                    # windows start at the same time in every worker
+                    window = now - now % self.rotate
+                    self.remove_expired()
+                sampler.sample()
+                if time.monotonic() - written >= FLUSH_INTERVAL:
+                    self._write_window(sampler, window)
+                    written = time.monotonic()
+        finally:
+            if sampler is not None and sampler.samples:
+                self._write_window(sampler, window)
+            _sampler_threads.discard(threading.get_ident())
+
+    def _write_window(self, sampler: StackSampler, window: float) -> None:
+        start = time.strftime("%Y%m%dT%H%M%S", time.gmtime(window))
+        path = os.path.join(
+            self.continuous_directory, f"{start}-{os.getpid()}{COLLAPSED_SUFFIX}"
+        )
+        try:
+            sampler.write(path)
+        except OSError as e:
+            log.warning("Cannot write the continuous profile to %s: %s", path, e)
+
+    def remove_expired(self) -> None:
+        """Remove the continuous profiles older than ``retention`` days."""
+        expired = time.time() - self.retention * 86400
+        for path in continuous_profiles(self.continuous_directory):
+            with contextlib.suppress(FileNotFoundError):
+                if os.path.getmtime(path) < expired:
+                    os.remove(path)
+
+
+def continuous_profiles(directory: str) -> list[str]:
+    """Paths of the profiles in ``directory``, oldest window first."""
+    try:
+        names = sorted(os.listdir(directory))
+    except FileNotFoundError:
+        return []
+    return [
+        os.path.join(directory, name)
+        for name in names
+        if name.endswith(COLLAPSED_SUFFIX)
+    ]
+
+
+def read_collapsed(path: str) -> Counter[str]:
+    """Read the stacks of a collapsed stack file."""
+    stacks: Counter[str] = Counter()
+    with open(path) as f:
+        for line in f:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            if stack and count.isdigit():
+                stacks[stack] += int(count)
+    return stacks
+
+
+class ProfileReport:
+    """The continuous profiles of every worker, merged."""
+
+    def __init__(self, stacks: Counter[str], files: int = 0) -> None:
+        self.stacks = stacks
+        self.files = files
+
+    @classmethod
+    def from_directory(cls, directory: str) -> ProfileReport:
+        """Merge the profiles written to ``directory``."""
+        stacks: Counter[str] = Counter()
+        paths = continuous_profiles(directory)
+        for path in paths:
+            stacks.update(read_collapsed(path))
+        return cls(stacks, len(paths))
+
+    @property
+    def samples(self) -> int:
+        """Number of thread stacks sampled."""
+        return sum(self.stacks.values())
+
+    def endpoints(self) -> Counter[str]:
+        """Samples of each view, from the first frame of the stacks."""
+        counts: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            counts[stack.split(";", 1)[0]] += count
+        return counts
+
+    def functions(self, endpoint: str | None = None) -> Counter[str]:
+        """Samples of the functions running when sampled, optionally of a view."""
+        counts: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            if endpoint is None or frames[0] == endpoint:
+                counts[frames[-1]] += count
+        return counts
+
+    def report(self, limit: int = 15) -> str:
+        """Human readable report, ranking the ``limit`` busiest of each kind."""
+        lines = [
+            f"Continuous profile: {self.samples} samples from {self.files} files",
+            "",
+            "Views:",
+        ]
+        lines += self._ranked(self.endpoints(), limit)
+        lines += ["", "Functions running, excluding threads without a request:"]
+        lines += self._ranked(self.functions() - self.functions(NO_REQUEST), limit)
+        return "\n".join(lines)
+
+    def _ranked(self, counts: Counter[str], limit: int) -> list[str]:
+        total = self.samples or 1
+        return [
+            f"  {count / total:7.2%}  {name}"
+            for name, count in counts.most_common(limit)
+        ]
+
+    def write(self, path: str) -> None:
+        """Write the merged stacks in the collapsed format."""
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
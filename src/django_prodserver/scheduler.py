@@ -0,0 +1,317 @@
+"""
+An in-process scheduler for periodic jobs.
+
+Replaces a crontab of ``manage.py`` calls, which boot Django again for every
+run, by a single warm process. Jobs wait in a heap ordered by their next run,
+so the scheduler sleeps until the earliest one is due however many jobs there
+are. A due job runs either in a child forked from the scheduler, sharing its
+loaded state copy-on-write, or in a thread of a pool.
+
+Each job may run ``max_instances`` times at once, 1 by default: a run due
+while the previous one is still going is skipped rather than piling up.
+``jitter`` delays every run by a random number of seconds, to spread jobs of
+many hosts sharing a schedule. As with cron, runs missed while the process was
+not running or was suspended are not caught up.
+
+Schedules are evaluated in local time, which Django sets to ``TIME_ZONE``.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import heapq
+import itertools
+import logging
+import os
+import random
+import select
+import shlex
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from types import FrameType
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .cron import CronSchedule
+
+log = logging.getLogger(__name__)
+
+EXECUTORS = ("fork", "thread")
+# SIGCHLD wakes the scheduler up to collect finished children, not on Windows
+SCHEDULER_SIGNALS = tuple(
+    getattr(signal, name)
+    for name in ("SIGTERM", "SIGINT", "SIGCHLD")
+    if hasattr(signal, name)
+)
+
+
+@dataclass
+class Job:
+    """A management command run on a cron schedule."""
+
+    name: str
+    schedule: CronSchedule
+    argv: list[str]
+    jitter: float = 0.0
+    max_instances: int = 1
+
+    @classmethod
+    def from_config(cls, name: str, config: Mapping[str, Any]) -> Job:
+        """
+        Build a job from an entry of ``JOBS``.
+
+        {
+            "SCHEDULE": "*/15 * * * *",
+            "COMMAND": "send_digest --batch 100",
+            "JITTER": 30,
+            "MAX_INSTANCES": 1,
+        }
+        """
+        if not isinstance(config, Mapping) or not config.get("SCHEDULE"):
+            raise ImproperlyConfigured(f"Job '{name}' requires a SCHEDULE.")
+        command = config.get("COMMAND")
+        argv = shlex.split(command) if isinstance(command, str) else command
+        if not argv:
+            raise ImproperlyConfigured(f"Job '{name}' requires a COMMAND.")
+        try:
+            jitter = float(config.get("JITTER", 0))
+            max_instances = int(config.get("MAX_INSTANCES", 1))
+        except (TypeError, ValueError):
+            raise ImproperlyConfigured(
+                f"Job '{name}' JITTER and MAX_INSTANCES must be numbers."
+            ) from None
+        if jitter < 0 or max_instances < 1:
+            raise ImproperlyConfigured(
+                f"Job '{name}' needs a JITTER of at least 0 and a MAX_INSTANCES "
+                "of at least 1."
+            )
+        return cls(
+            name,
+            CronSchedule(str(config["SCHEDULE"])),
+            [str(arg) for arg in argv],
+            jitter,
+            max_instances,
+        )
+
+
+class JobScheduler:
+    """
+    Run ``run_job(job)`` for each of ``jobs`` when its schedule is due.
+
+    With the ``fork`` executor every run happens in a forked child, which exits
+    with status 1 when ``run_job`` raises. With ``thread`` runs share a pool of
+    ``threads`` threads.
+    """
+
+    def __init__(
+        self,
+        jobs: Iterable[Job],
+        run_job: Callable[[Job], None],
+        executor: str = "fork",
+        threads: int = 4,
+        graceful_timeout: float = 30.0,
+    ) -> None:
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor {executor!r}.")
+        self.jobs = list(jobs)
+        self.run_job = run_job
+        self.executor = executor
+        self.threads = threads
+        self.graceful_timeout = graceful_timeout
+        # (due timestamp with jitter, tie breaker, cron time, job)
+        self.queue: list[tuple[float, int, datetime, Job]] = []
+        self.running: Counter[str] = Counter()
+        self.children: dict[int, tuple[Job, float]] = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._pool: ThreadPoolExecutor | None = None
+        self._stopping = False
+        self._wakeup: tuple[int, int] | None = None
+        self._previous_handlers: dict[int, Any] = {}
+
+    def schedule(self, job: Job, after: datetime) -> None:
+        """Queue the first run of ``job`` after ``after``."""
+        run_at = job.schedule.next_after(after)
+        if run_at is None:
+            return
+        due = run_at.timestamp()
+        if job.jitter:
+            due += random.uniform(0, job.jitter)  # noqa: S311 - not for security
+        heapq.heappush(self.queue, (due, next(self._counter), run_at, job))
+
+    def run_pending(self, now: float | None = None) -> float | None:
+        """Start the jobs due at ``now``, return the seconds until the next one."""
+        now = time.time() if now is None else now
+        while self.queue and self.queue[0][0] <= now:
+            _, _, run_at, job = heapq.heappop(self.queue)
+            self.launch(job)
+            # runs missed while suspended are skipped, like cron does
+            self.schedule(job, max(run_at, datetime.fromtimestamp(now)))
+        return self.queue[0][0] - now if self.queue else None
+
+    def launch(self, job: Job) -> bool:
+        """Start a run of ``job`` unless it already runs ``max_instances`` times."""
+        self.reap()
+        with self._lock:
+            if self.running[job.name] >= job.max_instances:
+                log.warning(
+                    "Skipping job %s, %s run(s) still in progress",
+                    job.name,
+                    self.running[job.name],
+                )
+                return False
+            self.running[job.name] += 1
+        log.info("Running job %s", job.name)
+        if self.executor == "thread":
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    self.threads, thread_name_prefix="prodserver-job"
+                )
+            self._pool.submit(self._run_in_thread, job)
+            return True
+        for stream in (sys.stdout, sys.stderr):
+            stream.flush()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - runs in the forked child
+            self._run_child(job)
+        self.children[pid] = (job, time.monotonic())
+        return True
+
+    def reap(self) -> None:
+        """Collect the children whose run has finished."""
+        for pid in list(self.children):
+            try:
+                done, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done, status = pid, 0
+            if done:
+                job, started = self.children.pop(pid)
+                self._finished(job, started, os.waitstatus_to_exitcode(status))
+
+    def serve_forever(self) -> None:
+        """Run the jobs on schedule until ``SIGTERM`` or ``SIGINT``."""
+        self._install_signal_handlers()
+        try:
+            now = datetime.now()
+            for job in self.jobs:
+                self.schedule(job, now)
+            log.info("Scheduled %s job(s)", len(self.jobs))
+            while not self._stopping:
+                delay = self.run_pending()
+                self._wait_for_event(delay)
+                self.reap()
+        finally:
+            self.stop()
+            self._restore_signal_handlers()
+
+    def stop(self) -> None:
+        """
+        Wait for the runs in progress to finish.
+
+        Children still running after ``graceful_timeout`` are killed, threads
+        cannot be interrupted and are waited for.
+        """
+        self._stopping = True
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        deadline = time.monotonic() + self.graceful_timeout
+        while True:
+            self.reap()
+            if not self.children:
+                return
+            if time.monotonic() >= deadline:
+                for pid, (job, _) in self.children.items():
+                    log.warning("Killing job %s (pid %s) after timeout", job.name, pid)
+                    with contextlib.suppress(ProcessLookupError):
+                        os.kill(pid, signal.SIGKILL)
+                deadline = float("inf")
+            time.sleep(0.05)
+
+    def _finished(self, job: Job, started: float, code: int) -> None:
+        with self._lock:
+            self.running[job.name] -= 1
+        duration = time.monotonic() - started
+        if code == 0:
+            log.info("Job %s finished in %.1fs", job.name, duration)
+        else:
+            log.warning(
+                "Job %s failed with status %s after %.1fs", job.name, code, duration
+            )
+
+    def _run_in_thread(self, job: Job) -> None:
+        started = time.monotonic()
+        code = 1
+        try:
+            self.run_job(job)
+            code = 0
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else int(e.code is not None)
+        except Exception:
+            log.exception("Job %s crashed", job.name)
+        finally:
+            self._finished(job, started, code)
+
+    def _run_child(self, job: Job) -> None:  # pragma: no cover
+        code = 0
+        try:
+            for signum in self._previous_handlers:
+                signal.signal(signum, signal.SIG_DFL)
+            if self._wakeup:
+                for fd in self._wakeup:
+                    os.close(fd)
+            self.run_job(job)
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else int(e.code is not None)
+        except BaseException:
+            log.exception("Job %s crashed", job.name)
+            code = 1
+        finally:
+            for stream in (sys.stdout, sys.stderr):
+                with contextlib.suppress(Exception):
+                    stream.flush()
+            os._exit(code)
+
+    def _install_signal_handlers(self) -> None:
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(read_fd, False)
+        os.set_blocking(write_fd, False)
+        self._wakeup = (read_fd, write_fd)
+        for signum in SCHEDULER_SIGNALS:
+            self._previous_handlers[signum] = signal.signal(signum, self._on_signal)
+
+    def _restore_signal_handlers(self) -> None:
+        for signum, handler in self._previous_handlers.items():
+            signal.signal(signum, handler)
+        self._previous_handlers.clear()
+        if self._wakeup:
+            for fd in self._wakeup:
+                os.close(fd)
+            self._wakeup = None
+
+    def _on_signal(self, signum: int, frame: FrameType | None) -> None:
+        if signum in (signal.SIGTERM, signal.SIGINT):
+            self._stopping = True
+        if self._wakeup:
+            with contextlib.suppress(BlockingIOError):
+                os.write(self._wakeup[1], b"\0")
+
+    def _wait_for_event(self, timeout: float | None) -> None:
+        """Sleep until the next job is due or a signal arrives."""
+        if not self._wakeup:
+            time.sleep(timeout or 0)
+            return
+        read_fd = self._wakeup[0]
+        with contextlib.suppress(InterruptedError):
+            readable, _, _ = select.select([read_fd], [], [], timeout)
+            if readable:
+                with contextlib.suppress(BlockingIOError):
+                    os.read(read_fd, 1024)
@@ -0,0 +1,215 @@
+"""
+Profiling of the startup path of a process.
+
+``manage.py prodserver web --profile-startup`` boots the ``web`` process in a
+child interpreter started with ``-X importtime`` and stops just before the
+server would start serving. It reports, slowest first:
+
+* the phases of the boot: ``django.setup()``, system checks, the backend's
+  initialisation and argument preparation, and warmup, without the process's
+  ``HOOKS`` nor its ``READINESS`` probe so a live server is left alone;
+* the time ``apps.populate`` spent on each installed app, importing it, its
+  models and running its ``ready()``;
+* the modules taking longest to import, including what they import.
+
+``--profile-output`` additionally writes the data as JSON.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+IMPORTTIME_PREFIX = "import time:"
+
+
+class StartupProfileFailure(Exception):
+    """The profiled process failed to start."""
+
+
+@dataclass
+class ImportTiming:
+    """Time ``-X importtime`` measured for importing a module."""
+
+    module: str
+    self_seconds: float
+    cumulative_seconds: float
+
+
+@dataclass
+class StartupProfile:
+    """Where the time went while a process started."""
+
+    server_name: str
+    total_seconds: float
+    phases: dict[str, float] = field(default_factory=dict)
+    apps: dict[str, float] = field(default_factory=dict)
+    imports: list[ImportTiming] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        """The profile as JSON serialisable data."""
+        return asdict(self)
+
+    def report(self, limit: int = 15) -> str:
+        """Human readable report, ranking the ``limit`` slowest of each kind."""
+        lines = [
+            f"Startup profile of {self.server_name}: {self.total_seconds:.3f}s",
+            "",
+            "Phases:",
+        ]
+        lines += _ranked(self.phases, limit)
+        lines += ["", "Slowest apps (import, models and ready):"]
+        lines += _ranked(self.apps, limit)
+        lines += ["", "Slowest imports (including their own imports):"]
+        lines += _ranked(
+            {timing.module: timing.cumulative_seconds for timing in self.imports},
+            limit,
+        )
+        return "\n".join(lines)
+
+
+def _ranked(timings: dict[str, float], limit: int) -> list[str]:
+    ranked = sorted(timings.items(), key=lambda item: item[1], reverse=True)
+    return [f"  {seconds:8.3f}s  {name}" for name, seconds in ranked[:limit]]
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    """Read the ``-X importtime`` lines of ``output``, other lines are ignored."""
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith(IMPORTTIME_PREFIX):
+            continue
+        fields = line[len(IMPORTTIME_PREFIX) :].split("|")
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except (IndexError, ValueError):
+            # the header line
+            continue
+        timings.append(
+            ImportTiming(fields[2].strip(), self_us / 1e6, cumulative_us / 1e6)
+        )
+    return timings
+
+
+def profile_startup(server_name: str) -> StartupProfile:
+    """Boot ``server_name`` in a child interpreter and profile it."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, sys.path))}
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "startup.json")
+        start = time.perf_counter()
+        result = subprocess.run(  # noqa: S603 - our own interpreter and module
+            [sys.executable, "-X", "importtime", "-m", __name__, server_name, output],
+            env=env,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=False,
+        )
+        total = time.perf_counter() - start
+        if result.returncode != 0:
+            errors = [
+                line
+                for line in result.stderr.splitlines()
+                if not line.startswith(IMPORTTIME_PREFIX)
+            ]
+            raise StartupProfileFailure("\n".join(errors[-20:]))
+        with open(output) as f:
+            recorded = json.load(f)
+    return StartupProfile(
+        server_name,
+        total,
+        phases=recorded["phases"],
+        apps=recorded["apps"],
+        imports=parse_importtime(result.stderr),
+    )
+
+
+@contextmanager
+def timed(timings: dict[str, float], name: str) -> Iterator[None]:
+    """Add the time spent in the block to ``timings[name]``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] += time.perf_counter() - start
+
+
+@contextmanager
+def timed_app_configs(timings: dict[str, float]) -> Iterator[None]:
+    """Time the import, ``import_models`` and ``ready`` of every app."""
+    from django.apps import AppConfig
+
+    create = AppConfig.__dict__["create"]
+
+    def timed_method(label: str, method: Callable[[], None]) -> Callable[[], None]:
+        def wrapper() -> None:
+            with timed(timings, label):
+                method()
+
+        return wrapper
+
+    def timed_create(cls: type[AppConfig], entry: str) -> AppConfig:
+        app_timings: dict[str, float] = defaultdict(float)
+        with timed(app_timings, "create"):
+            app_config = create.__func__(cls, entry)
+        timings[app_config.label] += app_timings["create"]
+        # populate() calls them on the instance, where these shadow the class
+        app_config.import_models = timed_method(
+            app_config.label, app_config.import_models
+        )
+        app_config.ready = timed_method(app_config.label, app_config.ready)
+        return app_config
+
+    AppConfig.create = classmethod(timed_create)
+    try:
+        yield
+    finally:
+        AppConfig.create = create
+
+
+def record_startup(server_name: str) -> dict[str, dict[str, float]]:
+    """Boot ``server_name`` up to starting its server, timing each phase."""
+    import django
+    from django.core import checks
+    from django.utils.module_loading import import_string
+
+    from .utils import PROCESS_ENV_VAR
+
+    phases: dict[str, float] = defaultdict(float)
+    apps: dict[str, float] = defaultdict(float)
+    with timed(phases, "django.setup()"), timed_app_configs(apps):
+        django.setup()
+    with timed(phases, "system checks"):
+        checks.run_checks()
+
+    from .conf import app_settings
+
+    # the readiness probe and hooks belong to the live server, which may run
+    # next to this one: its readiness file and port must be left alone
+    config = {
+        key: value
+        for key, value in app_settings.PRODUCTION_PROCESSES[server_name].items()
+        if key not in ("READINESS", "HOOKS")
+    }
+    os.environ[PROCESS_ENV_VAR] = server_name
+    with timed(phases, "backend boot"):
+        backend = import_string(config["BACKEND"])(**config)
+    with timed(phases, "warmup"):
+        backend.warmup()
+    with timed(phases, "backend boot"):
+        backend.prep_server_args()
+    return {"phases": dict(phases), "apps": dict(apps)}
+
+
+if __name__ == "__main__":
+    name, path = sys.argv[1:3]
+    with open(path, "w") as f:
+        json.dump(record_startup(name), f)
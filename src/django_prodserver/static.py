@@ -0,0 +1,304 @@
+"""
+Static file fast path for the prodserver application wrappers.
+
+At startup ``STATIC_ROOT`` is indexed into memory, mapping each URL to its
+precomputed response headers and any pre-compressed ``.br`` / ``.gz``
+siblings. Matching requests are answered straight from that index, without
+going through Django's request cycle, using ``wsgi.file_wrapper`` (sendfile on
+most servers) or the ASGI ``http.response.pathsend`` extension when the server
+supports it.
+
+Enable it per process with the ``STATIC`` key:
+
+    {
+        "BACKEND": "django_prodserver.backends.gunicorn.GunicornServer",
+        "ARGS": {"bind": "0.0.0.0:8000"},
+        "STATIC": {"MAX_AGE": 3600},
+    }
+"""
+
+from __future__ import annotations
+
+import asyncio
+import mimetypes
+import os
+import re
+from collections.abc import Awaitable, Callable, Iterable, Mapping, MutableMapping
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from typing import Any
+from urllib.parse import unquote, urlsplit
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .precompress import MANIFEST_NAME
+
+StartResponse = Callable[..., Any]
+WSGIApp = Callable[[dict[str, Any], StartResponse], Iterable[bytes]]
+ASGIScope = MutableMapping[str, Any]
+ASGIReceive = Callable[[], Awaitable[MutableMapping[str, Any]]]
+ASGISend = Callable[[MutableMapping[str, Any]], Awaitable[None]]
+ASGIApp = Callable[[ASGIScope, ASGIReceive, ASGISend], Awaitable[None]]
+
+# served in order of preference when the client accepts them
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# ManifestStaticFilesStorage names, e.g. "app.3f2a1b9c8d7e.js"
+HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{12}\.[^/.]+$")
+
+DEFAULT_MAX_AGE = 60
+IMMUTABLE_MAX_AGE = 31536000
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass(frozen=True)
+class StaticVariant:
+    """A file on disk that can be sent for a static URL."""
+
+    path: str
+    size: int
+    etag: str
+    encoding: str | None = None
+
+
+@dataclass(frozen=True)
+class StaticFile:
+    """A static URL with its precomputed headers and encoded variants."""
+
+    identity: StaticVariant
+    headers: tuple[tuple[str, str], ...]
+    variants: tuple[StaticVariant, ...] = field(default=())
+
+    def select(self, accept_encoding: str) -> StaticVariant:
+        """Pick the smallest representation the client accepts."""
+        if accept_encoding:
+            accepted = {
+                part.split(";", 1)[0].strip().lower()
+                for part in accept_encoding.split(",")
+            }
+            for variant in self.variants:
+                if variant.encoding in accepted:
+                    return variant
+        return self.identity
+
+
+class StaticFilesIndex:
+    """In-memory map of static URLs to the files serving them."""
+
+    def __init__(self, root: str, url: str, max_age: int = DEFAULT_MAX_AGE) -> None:
+        self.root = os.path.abspath(root)
+        self.prefix = urlsplit(url).path
+        if not self.prefix.endswith("/"):
+            self.prefix += "/"
+        self.max_age = max_age
+        self.files: dict[str, StaticFile] = {}
+
+    @classmethod
+    def from_config(cls, config: bool | Mapping[str, Any]) -> StaticFilesIndex:
+        """Build and populate an index from the ``STATIC`` key of a process."""
+        options: Mapping[str, Any] = config if isinstance(config, Mapping) else {}
+        root = options.get("ROOT", settings.STATIC_ROOT)
+        url = options.get("URL", settings.STATIC_URL)
+        if not root or not url:
+            raise ImproperlyConfigured(
+                "Serving static files from prodserver requires STATIC_ROOT and "
+                "STATIC_URL to be set. Run collectstatic before starting."
+            )
+        index = cls(str(root), str(url), int(options.get("MAX_AGE", DEFAULT_MAX_AGE)))
+        index.build()
+        return index
+
+    def build(self) -> None:
+        """Walk the static root and index every file found."""
+        files: dict[str, StaticFile] = {}
+        for dirpath, _dirnames, filenames in os.walk(self.root, followlinks=True):
+            for filename in filenames:
+                if filename == MANIFEST_NAME:
+                    continue
+                path = os.path.join(dirpath, filename)
+                relative = os.path.relpath(path, self.root).replace(os.sep, "/")
+                static_file = self._index_file(path, relative)
+                if static_file is not None:
+                    files[self.prefix + relative] = static_file
+        self.files = files
+
+    def lookup(self, path: str) -> StaticFile | None:
+        """Return the indexed file for a request path, if any."""
+        if not path.startswith(self.prefix):
+            return None
+        return self.files.get(unquote(path))
+
+    def _index_file(self, path: str, relative: str) -> StaticFile | None:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+        content_type, _ = mimetypes.guess_type(relative)
+        content_type = content_type or "application/octet-stream"
+        if content_type.startswith("text/") or content_type in (
+            "application/javascript",
+            "application/json",
+            "image/svg+xml",
+        ):
+            content_type += "; charset=utf-8"
+        if HASHED_NAME_RE.search(relative):
+            cache_control = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+        else:
+            cache_control = f"public, max-age={self.max_age}"
+
+        variants = []
+        for encoding, suffix in ENCODINGS:
+            try:
+                encoded = os.stat(path + suffix)
+            except OSError:
+                continue
+            if encoded.st_size < stat.st_size:
+                variants.append(
+                    StaticVariant(
+                        path + suffix,
+                        encoded.st_size,
+                        f'{etag[:-1]}-{suffix[1:]}"',
+                        encoding,
+                    )
+                )
+        headers = [
+            ("Content-Type", content_type),
+            ("Cache-Control", cache_control),
+            ("Last-Modified", formatdate(stat.st_mtime, usegmt=True)),
+        ]
+        if variants:
+            headers.append(("Vary", "Accept-Encoding"))
+        return StaticFile(
+            StaticVariant(path, stat.st_size, etag),
+            tuple(headers),
+            tuple(variants),
+        )
+
+
+def response_headers(
+    static_file: StaticFile, variant: StaticVariant, not_modified: bool
+) -> list[tuple[str, str]]:
+    """Headers sent for ``variant`` of ``static_file``."""
+    headers = [*static_file.headers, ("ETag", variant.etag)]
+    if variant.encoding:
+        headers.append(("Content-Encoding", variant.encoding))
+    if not not_modified:
+        headers.append(("Content-Length", str(variant.size)))
+    return headers
+
+
+def is_not_modified(variant: StaticVariant, if_none_match: str) -> bool:
+    """Whether an ``If-None-Match`` header matches the variant's ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return variant.etag in (
+        tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+    )
+
+
+class StaticFilesWSGI:
+    """WSGI middleware answering static requests from a ``StaticFilesIndex``."""
+
+    def __init__(self, application: WSGIApp, index: StaticFilesIndex) -> None:
+        self.application = application
+        self.index = index
+
+    def __call__(
+        self, environ: dict[str, Any], start_response: StartResponse
+    ) -> Iterable[bytes]:
+        """Serve indexed static files, pass anything else to the application."""
+        method = environ.get("REQUEST_METHOD")
+        if method in ("GET", "HEAD"):
+            path = environ.get("SCRIPT_NAME", "") + environ.get("PATH_INFO", "")
+            # PEP 3333 paths are latin-1 decoded bytes
+            path = path.encode("latin-1").decode("utf-8", "replace")
+            static_file = self.index.lookup(path)
+            if static_file is not None:
+                return self.serve(static_file, environ, start_response)
+        return self.application(environ, start_response)
+
+    def serve(
+        self,
+        static_file: StaticFile,
+        environ: dict[str, Any],
+        start_response: StartResponse,
+    ) -> Iterable[bytes]:
+        """Send a static file, using the server's file wrapper when available."""
+        variant = static_file.select(environ.get("HTTP_ACCEPT_ENCODING", ""))
+        not_modified = is_not_modified(variant, environ.get("HTTP_IF_NONE_MATCH", ""))
+        headers = response_headers(static_file, variant, not_modified)
+        if not_modified:
+            start_response("304 Not Modified", headers)
+            return []
+        start_response("200 OK", headers)
+        if environ["REQUEST_METHOD"] == "HEAD":
+            return []
+        file_wrapper = environ.get("wsgi.file_wrapper", FileWrapper)
+        return file_wrapper(open(variant.path, "rb"), CHUNK_SIZE)
+
+
+class StaticFilesASGI:
+    """ASGI middleware answering static requests from a ``StaticFilesIndex``."""
+
+    def __init__(self, application: ASGIApp, index: StaticFilesIndex) -> None:
+        self.application = application
+        self.index = index
+
+    async def __call__(
+        self, scope: ASGIScope, receive: ASGIReceive, send: ASGISend
+    ) -> None:
+        """Serve indexed static files, pass anything else to the application."""
+        if scope["type"] == "http" and scope["method"] in ("GET", "HEAD"):
+            static_file = self.index.lookup(scope["path"])
+            if static_file is not None:
+                await self.serve(static_file, scope, send)
+                return
+        await self.application(scope, receive, send)
+
+    async def serve(
+        self, static_file: StaticFile, scope: ASGIScope, send: ASGISend
+    ) -> None:
+        """Send a static file, zero-copy when the server supports pathsend."""
+        request_headers = {
+            name.decode("latin-1").lower(): value.decode("latin-1")
+            for name, value in scope.get("headers", [])
+        }
+        variant = static_file.select(request_headers.get("accept-encoding", ""))
+        not_modified = is_not_modified(
+            variant, request_headers.get("if-none-match", "")
+        )
+        headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in response_headers(static_file, variant, not_modified)
+        ]
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 304 if not_modified else 200,
+                "headers": headers,
+            }
+        )
+        if not_modified or scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+        if "http.response.pathsend" in scope.get("extensions", {}):
+            await send({"type": "http.response.pathsend", "path": variant.path})
+            return
+        with open(variant.path, "rb") as fh:
+            while True:
+                chunk = await asyncio.to_thread(fh.read, CHUNK_SIZE)
+                more_body = len(chunk) == CHUNK_SIZE
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": more_body,
+                    }
+                )
+                if not more_body:
+                    break
@@ -0,0 +1,176 @@
+"""
+System check results cached across boots.
+
+``prodserver`` runs Django's system checks before starting a server. Once they
+pass, a marker named after a fingerprint of the project is written to the
+``PRODUCTION_CHECKS_CACHE`` directory and later boots with the same
+fingerprint skip the checks. By default the markers go to a directory of the
+temporary directory private to the user, which is not trusted when another
+user could write to it.
+
+The fingerprint covers the Python and Django versions, every setting, the
+content of the settings module and of the project's apps, and the version of
+the distributions providing the apps installed in site-packages, so changing
+any of them runs the checks again. Warnings are only displayed by the run
+which wrote the marker.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import importlib.metadata
+import logging
+import os
+import re
+import site
+import stat
+import sys
+import sysconfig
+import tempfile
+from collections.abc import Callable, Collection, Iterator, Mapping
+
+import django
+from django.apps import apps
+from django.conf import settings
+
+log = logging.getLogger(__name__)
+
+MARKER_PREFIX = "prodserver-checks-"
+
+# "<function f at 0x7f...>" differs on every boot, drop the address
+_ADDRESS = re.compile(r" at 0x[0-9a-f]+")
+
+
+def checks_fingerprint() -> str:
+    """Hash of everything the result of the system checks depends on."""
+    digest = hashlib.sha256()
+    digest.update(f"{sys.version}\n{django.get_version()}\n".encode())
+    for name in sorted(dir(settings)):
+        if name.isupper():
+            value = _ADDRESS.sub("", repr(getattr(settings, name)))
+            digest.update(f"{name}={value}\n".encode())
+    installed = _installed_versions()
+    for name, version in installed.items():
+        digest.update(f"{name}:{version}\n".encode())
+    for path in _source_files(installed):
+        digest.update(path.encode())
+        try:
+            with open(path, "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+        except OSError:
+            continue
+    return digest.hexdigest()
+
+
+def _installed_versions() -> dict[str, str]:
+    """Distribution versions of the apps installed in site-packages, by app."""
+    site_packages = tuple(_site_packages())
+    versions = {}
+    for app_config in apps.get_app_configs():
+        if os.path.realpath(app_config.path).startswith(site_packages):
+            version = _distribution_version(app_config.name.partition(".")[0])
+            if version:
+                versions[app_config.name] = version
+    return versions
+
+
+def _source_files(installed: Collection[str]) -> Iterator[str]:
+    settings_module = sys.modules.get(settings.SETTINGS_MODULE or "")
+    path = getattr(settings_module, "__file__", None)
+    if path:
+        yield path
+    for app_config in apps.get_app_configs():
+        if app_config.name in installed:
+            continue
+        for dirpath, dirnames, filenames in os.walk(app_config.path):
+            dirnames.sort()
+            dirnames[:] = [name for name in dirnames if name != "__pycache__"]
+            for filename in sorted(filenames):
+                if filename.endswith(".py"):
+                    yield os.path.join(dirpath, filename)
+
+
+def _site_packages() -> list[str]:
+    paths = {sysconfig.get_paths()["purelib"], sysconfig.get_paths()["platlib"]}
+    paths.update(getattr(site, "getsitepackages", list)())
+    if site.ENABLE_USER_SITE:
+        paths.add(site.getusersitepackages())
+    return [os.path.realpath(path) + os.sep for path in paths]
+
+
+@functools.cache
+def _packages_distributions() -> Mapping[str, list[str]]:
+    # new in Python 3.10, before it distributions are looked up by package name
+    return getattr(importlib.metadata, "packages_distributions", dict)()
+
+
+def _distribution_version(package: str) -> str | None:
+    for name in _packages_distributions().get(package, [package]):
+        try:
+            return f"{name}=={importlib.metadata.version(name)}"
+        except importlib.metadata.PackageNotFoundError:
+            continue
+    return None
+
+
+def checks_cache_dir() -> str | None:
+    """Directory the markers are written to, None when it cannot be trusted."""
+    from .conf import app_settings
+
+    if app_settings.PRODUCTION_CHECKS_CACHE:
+        return app_settings.PRODUCTION_CHECKS_CACHE
+    if not hasattr(os, "getuid"):
+        return os.path.join(tempfile.gettempdir(), "prodserver-checks")
+    path = os.path.join(tempfile.gettempdir(), f"prodserver-checks-{os.getuid()}")
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        info = os.lstat(path)
+    except OSError as e:
+        log.debug("Cannot create the system checks cache: %s", e)
+        return None
+    # another user could otherwise create markers suppressing the checks
+    if (
+        not stat.S_ISDIR(info.st_mode)
+        or info.st_uid != os.getuid()
+        or info.st_mode & 0o077
+    ):
+        log.warning("Not caching system checks in %s, others can write to it", path)
+        return None
+    return path
+
+
+def checks_passed(fingerprint: str) -> bool:
+    """Whether the checks already passed for ``fingerprint``."""
+    directory = checks_cache_dir()
+    return directory is not None and os.path.exists(
+        os.path.join(directory, MARKER_PREFIX + fingerprint)
+    )
+
+
+def record_checks_passed(fingerprint: str) -> None:
+    """Remember the checks passed, failing silently on read-only storage."""
+    directory = checks_cache_dir()
+    if directory is None:
+        return
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, MARKER_PREFIX + fingerprint), "w") as f:
+            f.write(django.get_version())
+    except OSError as e:
+        log.debug("Cannot cache the system check result: %s", e)
+
+
+def run_cached(check: Callable[[], None], force: bool = False) -> bool:
+    """
+    Call ``check`` unless it passed for the current fingerprint.
+
+    ``check`` raises when the checks fail. Returns whether it was called.
+    """
+    fingerprint = checks_fingerprint()
+    if not force and checks_passed(fingerprint):
+        log.info("System checks passed before for this code and settings, skipping")
+        return False
+    check()
+    record_checks_passed(fingerprint)
+    return True
@@ -1,11 +1,32 @@
 import logging
+import os
+from collections.abc import Mapping
+from typing import Any
 
 from django.conf import settings
 from django.core.handlers.wsgi import WSGIHandler
 from django.test import RequestFactory
 
+from .conf import app_settings
+
 log = logging.getLogger(__name__)
 
+# set by the prodserver command so that worker processes spawned by a backend
+# can find the configuration of the process they belong to
+PROCESS_ENV_VAR = "PRODSERVER_PROCESS"
+
+# process entry keys implemented by wrapping the WSGI/ASGI application
+WRAPPER_KEYS = (
+    "STATIC",
+    "HOOKS",
+    "DATABASE",
+    "GC",
+    "METRICS",
+    "SAMPLING",
+    "REQUEST_PROFILING",
+    "TRACEMALLOC",
+)
+
 
 class WarmupFailure(Exception):
     """Exception to capture WarmupFailure."""
@@ -31,11 +52,32 @@ def wsgi_healthcheck(app: WSGIHandler, url: str, ok_status: int = 200) -> None:
         )
 
 
+def current_process_config() -> Mapping[str, Any]:
+    """Get the PRODUCTION_PROCESSES entry of the process being served."""
+    name = os.environ.get(PROCESS_ENV_VAR)
+    if not name:
+        return {}
+    try:
+        return app_settings.PRODUCTION_PROCESSES.get(name) or {}
+    except AttributeError:
+        return {}
+
+
+def app_wrapper_required() -> bool:
+    """Whether the current process needs prodserver to wrap the application."""
+    config = current_process_config()
+    return any(config.get(key) for key in WRAPPER_KEYS)
+
+
 def wsgi_app_name() -> str:
     """Get the WSGI name from settings."""
+    if app_wrapper_required():
+        return "django_prodserver.wsgi:application"
     return ":".join(settings.WSGI_APPLICATION.rsplit(".", 1))
 
 
 def asgi_app_name() -> str:
     """Get the ASGI name from settings."""
+    if app_wrapper_required():
+        return "django_prodserver.asgi:application"
     return ":".join(settings.ASGI_APPLICATION.rsplit(".", 1))
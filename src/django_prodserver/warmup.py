@@ -0,0 +1,175 @@
+"""
+Warmup steps declared by the installed apps.
+
+Any ``AppConfig`` can set ``prodserver_warmup`` to a callable, a dotted path to
+one, or a list of either. They are called without arguments while the server
+process warms up, once, before any worker is forked, so whatever they compute
+(ContentType caches, URL reverse maps, compiled regexes, serializer fields...)
+is shared by every worker instead of being built under traffic:
+
+    class ShopConfig(AppConfig):
+        name = "shop"
+        prodserver_warmup = ["shop.warmup.load_catalogue"]
+
+Set ``"WARMUP": {"APPS": False}`` on a process to skip them.
+
+prodserver declares its own steps the same way, compiling every template into
+the cached template loaders and populating the URL resolver.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.template import TemplateSyntaxError, engines
+from django.template.loaders.cached import Loader as CachedLoader
+from django.urls import URLResolver, get_resolver
+from django.utils import translation
+from django.utils.module_loading import import_string
+
+from .utils import WarmupFailure
+
+log = logging.getLogger(__name__)
+
+Warmup = Callable[[], Any]
+
+LOCALE_MIDDLEWARE = "django.middleware.locale.LocaleMiddleware"
+
+
+@dataclass
+class WarmupTiming:
+    """How long a single warmup step took."""
+
+    name: str
+    seconds: float
+
+    def __str__(self) -> str:
+        """Describe the timing for the startup report."""
+        return f"Warmed up {self.name} in {self.seconds * 1000:.1f}ms"
+
+
+def discover_warmups() -> Iterator[tuple[str, Warmup]]:
+    """Yield the name and callable of every app's warmup steps, in app order."""
+    for app_config in apps.get_app_configs():
+        warmups = getattr(app_config, "prodserver_warmup", None)
+        if warmups is None:
+            continue
+        if isinstance(warmups, str) or callable(warmups):
+            warmups = [warmups]
+        for warmup in warmups:
+            if isinstance(warmup, str):
+                try:
+                    warmup = import_string(warmup)
+                except ImportError as e:
+                    raise ImproperlyConfigured(
+                        f"Cannot import prodserver_warmup of {app_config.label}: {e}"
+                    ) from e
+            name = getattr(warmup, "__qualname__", repr(warmup))
+            yield f"{app_config.label}:{name}", warmup
+
+
+def run_warmups() -> list[WarmupTiming]:
+    """
+    Run every app's warmup steps and time them.
+
+    A step raising an exception aborts startup with ``WarmupFailure``.
+    """
+    timings = []
+    for name, warmup in discover_warmups():
+        start = time.perf_counter()
+        try:
+            warmup()
+        except Exception as e:
+            raise WarmupFailure(f"{name} raised {e!r}") from e
+        timing = WarmupTiming(name, time.perf_counter() - start)
+        log.info("%s", timing)
+        timings.append(timing)
+    return timings
+
+
+def compile_templates() -> None:
+    """
+    Compile every template of the Django template engines.
+
+    Only engines using the cached template loader keep the compiled
+    templates, others are skipped. Files failing to compile (often not
+    templates at all), for whatever reason, are logged and left to fail when
+    they are used.
+    """
+    compiled = failed = 0
+    for backend in engines.all():
+        engine = getattr(backend, "engine", None)
+        if engine is None or not any(
+            isinstance(loader, CachedLoader) for loader in engine.template_loaders
+        ):
+            continue
+        for name in _template_names(engine):
+            try:
+                engine.get_template(name)
+            except (TemplateSyntaxError, UnicodeDecodeError) as e:
+                failed += 1
+                log.debug("Cannot compile template %s: %s", name, e)
+            except Exception as e:
+                # e.g. a custom tag failing to compile, a template the site may
+                # never render must not keep it from starting
+                failed += 1
+                log.warning("Cannot compile template %s: %r", name, e)
+            else:
+                compiled += 1
+    log.info("Compiled %s templates, %s failed to compile", compiled, failed)
+
+
+def _template_names(engine: Any) -> list[str]:
+    """Names of the templates in the directories of the engine's loaders."""
+    names = set()
+    for loader in engine.template_loaders:
+        loaders = loader.loaders if isinstance(loader, CachedLoader) else [loader]
+        for inner in loaders:
+            for directory in getattr(inner, "get_dirs", list)():
+                for dirpath, dirnames, filenames in os.walk(directory):
+                    dirnames[:] = [
+                        name for name in dirnames if not name.startswith(".")
+                    ]
+                    relative = os.path.relpath(dirpath, directory)
+                    for filename in filenames:
+                        if filename.startswith("."):
+                            continue
+                        name = os.path.normpath(os.path.join(relative, filename))
+                        names.add(name.replace(os.sep, "/"))
+    return sorted(names)
+
+
+def populate_url_resolver() -> None:
+    """
+    Build the URL resolver of ``ROOT_URLCONF`` as the first request would.
+
+    Imports every included URLconf and the views they reference, compiles the
+    patterns and fills the reverse lookup tables. Those are built per
+    language, for every language in ``LANGUAGES`` when ``LocaleMiddleware``
+    is installed, else for ``LANGUAGE_CODE``.
+    """
+    resolver = get_resolver()
+    _compile_patterns(resolver.url_patterns)
+    languages = [settings.LANGUAGE_CODE]
+    if settings.USE_I18N and LOCALE_MIDDLEWARE in settings.MIDDLEWARE:
+        languages = [code for code, _ in settings.LANGUAGES]
+    for language in languages:
+        with translation.override(language):
+            resolver.reverse_dict  # noqa: B018 - populated on first access
+
+
+def _compile_patterns(patterns: list[Any]) -> None:
+    for entry in patterns:
+        entry.pattern.regex  # noqa: B018 - compiled on first access
+        if isinstance(entry, URLResolver):
+            _compile_patterns(entry.url_patterns)
+        else:
+            entry.lookup_str  # noqa: B018 - imports and names the view
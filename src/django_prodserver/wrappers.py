@@ -0,0 +1,79 @@
+"""
+Wrappers applied around the project's WSGI/ASGI application.
+
+Some prodserver features need to sit in front of Django inside the serving
+process (e.g. the static file fast path, or the worker hooks of servers that
+have none of their own). When the current process enables any
+of them, ``utils.wsgi_app_name`` and ``utils.asgi_app_name`` point the
+backends at ``django_prodserver.wsgi`` / ``django_prodserver.asgi``, which wrap
+the configured application with the functions below.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Mapping
+from typing import Any
+
+from django.utils.module_loading import import_string
+
+from .gc_tuning import GCSettings, InFlightASGI, InFlightWSGI
+from .hooks import Hooks
+from .request_profiling import ProfiledWSGI, RequestProfiler
+from .sampling import EndpointsWSGI, SamplingProfiler
+from .static import StaticFilesASGI, StaticFilesIndex, StaticFilesWSGI
+from .utils import PROCESS_ENV_VAR, current_process_config
+
+
+def start_worker_hooks(config: Mapping[str, Any]) -> None:
+    """Run the worker hooks for backends relying on the application import."""
+    if not config.get("BACKEND"):
+        return
+    if getattr(import_string(config["BACKEND"]), "hooks_in_application", False):
+        Hooks.for_process(config).start_worker_once()
+
+
+def _counts_requests(config: Mapping[str, Any]) -> bool:
+    # for the idle collections and to correlate GC pauses with requests
+    if config.get("METRICS"):
+        return True
+    gc_settings = GCSettings.from_config(config.get("GC"))
+    return gc_settings is not None and gc_settings.collect_interval is not None
+
+
+def _profiles_continuously(config: Mapping[str, Any]) -> bool:
+    sampler = SamplingProfiler.from_config(config.get("SAMPLING"))
+    return sampler is not None and sampler.continuous is not None
+
+
+def wrap_wsgi_application(application: Any) -> Any:
+    """Wrap a WSGI application with the features enabled for this process."""
+    config = current_process_config()
+    start_worker_hooks(config)
+    if config.get("STATIC"):
+        application = StaticFilesWSGI(
+            application, StaticFilesIndex.from_config(config["STATIC"])
+        )
+    if _counts_requests(config):
+        application = InFlightWSGI(application)
+    if _profiles_continuously(config):
+        application = EndpointsWSGI(application)
+    request_profiler = RequestProfiler.from_config(
+        config.get("REQUEST_PROFILING"), os.environ.get(PROCESS_ENV_VAR, "")
+    )
+    if request_profiler is not None:
+        application = ProfiledWSGI(application, request_profiler)
+    return application
+
+
+def wrap_asgi_application(application: Any) -> Any:
+    """Wrap an ASGI application with the features enabled for this process."""
+    config = current_process_config()
+    start_worker_hooks(config)
+    if config.get("STATIC"):
+        application = StaticFilesASGI(
+            application, StaticFilesIndex.from_config(config["STATIC"])
+        )
+    if _counts_requests(config):
+        application = InFlightASGI(application)
+    return application
@@ -0,0 +1,13 @@
+"""
+WSGI entry point used when prodserver wraps the project's application.
+
+Loads ``WSGI_APPLICATION`` and applies the wrappers enabled for the current
+process, see ``django_prodserver.wrappers``.
+"""
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .wrappers import wrap_wsgi_application
+
+application = wrap_wsgi_application(import_string(settings.WSGI_APPLICATION))
@@ -0,0 +1,264 @@
+"""
+A warm process forking management commands on request.
+
+Booting Django for every ``manage.py`` call of a cron job costs seconds. The
+zygote loads and warms Django once, then listens on a Unix socket. For each
+request it forks a child sharing the loaded state copy-on-write, and runs the
+management command there. The client passes its own stdin, stdout and stderr
+over the socket (``SCM_RIGHTS``), so the command reads and writes them
+directly, and receives the exit code once the command is done.
+
+The client does not import Django, run it with:
+
+    python -m django_prodserver.zygote /run/prodserver/commands.sock clearsessions
+
+The server side is started by the ``backends.zygote.CommandZygote`` backend.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import traceback
+from collections.abc import Callable, Collection
+from types import FrameType
+from typing import Any
+
+log = logging.getLogger(__name__)
+
+# requests are a line of JSON, the response a line with the exit code
+MAX_REQUEST_SIZE = 1024 * 1024
+EXIT_PREFIX = b"exit:"
+# seconds a client has to send its request, the zygote serves one at a time
+REQUEST_TIMEOUT = 5.0
+
+
+def _exit_code(exit: SystemExit) -> int:
+    if exit.code is None:
+        return 0
+    if isinstance(exit.code, int):
+        return exit.code
+    print(exit.code, file=sys.stderr)
+    return 1
+
+
+def _raise_system_exit(signum: int, frame: FrameType | None) -> None:
+    raise SystemExit(0)
+
+
+class ZygoteServer:
+    """
+    Run ``run_command(argv)`` in a forked child for every request on ``path``.
+
+    ``commands`` restricts the management commands which may be run. The
+    socket is only accessible to the user running the server unless ``mode``
+    says otherwise. A client not sending its request within ``request_timeout``
+    seconds is disconnected, so it cannot hold up the others.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        run_command: Callable[[list[str]], int | None],
+        commands: Collection[str] | None = None,
+        mode: int = 0o600,
+        request_timeout: float = REQUEST_TIMEOUT,
+    ) -> None:
+        self.path = path
+        self.run_command = run_command
+        self.commands = commands
+        self.mode = mode
+        self.request_timeout = request_timeout
+        self.children: set[int] = set()
+        self.socket: socket.socket | None = None
+
+    def bind(self) -> socket.socket:
+        """Listen on the Unix socket, replacing a stale socket file."""
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(self.path)
+        os.chmod(self.path, self.mode)
+        sock.listen(128)
+        sock.settimeout(1.0)
+        self.socket = sock
+        return sock
+
+    def serve_forever(self) -> None:
+        """Accept requests until ``SIGTERM`` or ``SIGINT``."""
+        sock = self.bind()
+        previous = {
+            signum: signal.signal(signum, _raise_system_exit)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        log.info("Command zygote listening on %s", self.path)
+        try:
+            while True:
+                self.reap()
+                try:
+                    conn, _ = sock.accept()
+                except socket.timeout:
+                    continue
+                self.handle(conn)
+        except SystemExit:
+            pass
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+            sock.close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
+
+    def reap(self) -> None:
+        """Collect the children whose command has finished."""
+        for pid in list(self.children):
+            try:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done = pid
+            if done:
+                self.children.discard(pid)
+
+    def handle(self, conn: socket.socket) -> int | None:
+        """Fork a child running the requested command, return its pid."""
+        conn.settimeout(self.request_timeout)
+        fds: list[int] = []
+        try:
+            request, fds = receive_request(conn)
+            conn.settimeout(None)
+            argv = request["argv"]
+            if not argv or (self.commands is not None and argv[0] not in self.commands):
+                name = argv[0] if argv else ""
+                os.write(
+                    fds[2], f"Command '{name}' is not allowed by the zygote.\n".encode()
+                )
+                conn.sendall(EXIT_PREFIX + b"1\n")
+                return None
+            for stream in (sys.stdout, sys.stderr):
+                stream.flush()
+            pid = os.fork()
+            if pid == 0:  # pragma: no cover - runs in the forked child
+                self._run_child(conn, fds, request)
+            self.children.add(pid)
+            log.debug("Running %s in pid %s", argv[0], pid)
+            return pid
+        except socket.timeout:
+            log.warning(
+                "No command request received within %ss, disconnecting",
+                self.request_timeout,
+            )
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            log.warning("Invalid command request: %s", e)
+            return None
+        except Exception:
+            # no request may stop the zygote serving the others
+            log.exception("Cannot handle command request")
+            return None
+        finally:
+            conn.close()
+            for fd in fds:
+                os.close(fd)
+
+    def _run_child(  # pragma: no cover - runs in the forked child
+        self, conn: socket.socket, fds: list[int], request: dict[str, Any]
+    ) -> None:
+        code = 1
+        try:
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, signal.SIG_DFL)
+            if self.socket is not None:
+                self.socket.close()
+            for target, fd in enumerate(fds):
+                os.dup2(fd, target)
+            # stream the output to the client as the command writes it
+            for stream in (sys.stdout, sys.stderr):
+                with contextlib.suppress(Exception):
+                    stream.reconfigure(line_buffering=True)  # type: ignore[union-attr]
+            with contextlib.suppress(OSError):
+                os.chdir(request.get("cwd") or os.curdir)
+            code = self.run_command(list(request["argv"])) or 0
+        except SystemExit as e:
+            code = _exit_code(e)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            for stream in (sys.stdout, sys.stderr):
+                with contextlib.suppress(Exception):
+                    stream.flush()
+            with contextlib.suppress(OSError):
+                conn.sendall(EXIT_PREFIX + str(code).encode() + b"\n")
+            os._exit(code)
+
+
+def receive_request(conn: socket.socket) -> tuple[dict[str, Any], list[int]]:
+    """Read a request and the client's stdin, stdout and stderr."""
+    data, fds, _, _ = socket.recv_fds(conn, MAX_REQUEST_SIZE, 3)
+    try:
+        if len(fds) != 3:
+            raise ValueError("the client must send its stdin, stdout and stderr")
+        while not data.endswith(b"\n"):
+            chunk = conn.recv(MAX_REQUEST_SIZE)
+            if not chunk or len(data) > MAX_REQUEST_SIZE:
+                raise ValueError("incomplete request")
+            data += chunk
+        request = json.loads(data)
+        if not isinstance(request, dict):
+            raise ValueError("the request must be a JSON object")
+        argv = request.get("argv")
+        if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+            raise ValueError("argv must be a list of strings")
+        if not isinstance(request.get("cwd", ""), (str, type(None))):
+            raise ValueError("cwd must be a string")
+        return request, list(fds)
+    except BaseException:
+        for fd in fds:
+            os.close(fd)
+        raise
+
+
+def run_command(path: str, argv: list[str]) -> int:
+    """Run a management command in the zygote at ``path``, return its exit code."""
+    request = json.dumps({"argv": argv, "cwd": os.getcwd()}).encode() + b"\n"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        socket.send_fds(
+            sock,
+            [request],
+            [sys.stdin.fileno(), sys.stdout.fileno(), sys.stderr.fileno()],
+        )
+        response = b""
+        while chunk := sock.recv(1024):
+            response += chunk
+    if response.startswith(EXIT_PREFIX):
+        return int(response[len(EXIT_PREFIX) :])
+    # the child died without reporting, e.g. killed by a signal
+    print("The command ended without an exit code.", file=sys.stderr)
+    return 1
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command line client, ``python -m django_prodserver.zygote SOCKET COMMAND``."""
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 2:
+        print(
+            "usage: python -m django_prodserver.zygote SOCKET COMMAND [ARGS ...]",
+            file=sys.stderr,
+        )
+        return 2
+    path, *command = argv
+    try:
+        return run_command(path, command)
+    except OSError as e:
+        print(f"Cannot reach the command zygote at {path}: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
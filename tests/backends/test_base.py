@@ -1,6 +1,10 @@
+from unittest.mock import patch
+
 import pytest
+from django.core.exceptions import ImproperlyConfigured
 
 from django_prodserver.backends.base import BaseServerBackend
+from django_prodserver.utils import WarmupFailure
 
 
 def test_init_without_args():
@@ -93,3 +97,137 @@ def test_init_with_string_args():
     """Test BaseServerBackend initialization with string ARGS."""
     backend = BaseServerBackend(ARGS="--custom-config")
     assert backend.args == ["--custom-config"]
+
+
+def test_warmup_without_config_marks_ready():
+    """Test warmup flips the readiness probe when nothing is configured."""
+    backend = BaseServerBackend()
+    backend.warmup()
+    assert backend.readiness.ready is True
+
+
+@patch("django_prodserver.backends.base.wsgi_healthcheck")
+@patch("django_prodserver.backends.base.get_internal_wsgi_application")
+def test_warmup_runs_healthcheck(mock_get_app, mock_healthcheck):
+    """Test warmup runs the configured healthcheck against the WSGI app."""
+    backend = BaseServerBackend(WARMUP={"HEALTHCHECK": "/health/", "STATUS": "204"})
+    backend.warmup()
+    mock_healthcheck.assert_called_once_with(mock_get_app.return_value, "/health/", 204)
+    assert backend.readiness.ready is True
+
+
+@patch("django_prodserver.backends.base.wsgi_healthcheck")
+@patch("django_prodserver.backends.base.get_internal_wsgi_application")
+def test_warmup_failure_leaves_probe_unready(mock_get_app, mock_healthcheck, tmp_path):
+    """Test a failing healthcheck never flips the readiness probe."""
+    mock_healthcheck.side_effect = WarmupFailure("boom")
+    ready_file = tmp_path / "web.ready"
+    backend = BaseServerBackend(
+        WARMUP={"HEALTHCHECK": "/health/"}, READINESS={"FILE": str(ready_file)}
+    )
+    with pytest.raises(WarmupFailure):
+        backend.warmup()
+    assert backend.readiness.ready is False
+    assert not ready_file.exists()
+
+
+def test_warmup_writes_readiness_file(tmp_path):
+    """Test the readiness file only appears once warmup has completed."""
+    ready_file = tmp_path / "web.ready"
+    ready_file.write_text("stale")
+    backend = BaseServerBackend(READINESS={"FILE": str(ready_file)})
+    backend.readiness.start()
+    assert not ready_file.exists()
+    backend.warmup()
+    assert ready_file.exists()
+
+
+@patch("django_prodserver.backends.base.precompress")
+def test_warmup_precompresses_static_files(mock_precompress, tmp_path):
+    """Test warmup pre-compresses static files when STATIC asks for it."""
+    backend = BaseServerBackend(STATIC={"ROOT": str(tmp_path), "PRECOMPRESS": True})
+    backend.warmup()
+    mock_precompress.assert_called_once_with(str(tmp_path))
+
+
+@patch("django_prodserver.backends.base.precompress")
+def test_warmup_continues_when_precompress_fails(mock_precompress, tmp_path, caplog):
+    """Test a read-only static root is logged and does not abort startup."""
+    mock_precompress.side_effect = PermissionError("Read-only file system")
+    backend = BaseServerBackend(STATIC={"ROOT": str(tmp_path), "PRECOMPRESS": True})
+    backend.warmup()
+    assert backend.readiness.ready is True
+    assert "Cannot pre-compress static files" in caplog.text
+
+
+@patch("django_prodserver.backends.base.precompress")
+def test_warmup_skips_precompress_by_default(mock_precompress):
+    """Test static files are not pre-compressed unless configured."""
+    BaseServerBackend(STATIC=True).warmup()
+    mock_precompress.assert_not_called()
+
+
+class ProfiledBackend(BaseServerBackend):
+    def get_profiles(self):
+        return {"io-bound": {"workers": "4", "max_requests": "1000"}}
+
+
+def test_profile_expands_into_args():
+    """Test PROFILE provides the ARGS of the named profile."""
+    backend = ProfiledBackend(PROFILE="io-bound")
+    assert backend.args == ["--workers=4", "--max_requests=1000"]
+
+
+def test_profile_overridden_by_args():
+    """Test explicit ARGS win, whatever their spelling."""
+    backend = ProfiledBackend(
+        PROFILE="io-bound", ARGS={"workers": "2", "max-requests": "50", "bind": ":80"}
+    )
+    assert backend.process_args == {"workers": "2", "max-requests": "50", "bind": ":80"}
+
+
+def test_unknown_profile():
+    """Test an unknown PROFILE lists the available ones."""
+    with pytest.raises(ImproperlyConfigured, match="Available profiles are: io-bound"):
+        ProfiledBackend(PROFILE="turbo")
+
+
+def test_profile_unsupported_by_backend():
+    """Test PROFILE on a backend without profiles is rejected."""
+    with pytest.raises(ImproperlyConfigured, match="Available profiles are: none"):
+        BaseServerBackend(PROFILE="io-bound")
+
+
+def test_profile_with_string_args():
+    """Test PROFILE cannot be merged into string ARGS."""
+    with pytest.raises(ImproperlyConfigured, match="string"):
+        ProfiledBackend(PROFILE="io-bound", ARGS="--workers=2")
+
+
+@patch("django_prodserver.hooks.import_string")
+def test_warmup_runs_pre_start_hooks(mock_import_string):
+    """Test the pre_start hooks run in the main process before warmup."""
+    backend = BaseServerBackend(HOOKS={"pre_start": "myproject.hooks.setup"})
+    backend.warmup()
+    mock_import_string.return_value.assert_called_once()
+    assert "server_name" in mock_import_string.return_value.call_args.kwargs
+
+
+@patch("django_prodserver.backends.base.run_warmups")
+def test_warmup_runs_app_warmups(mock_run_warmups):
+    """Test the warmup steps of installed apps run unless disabled."""
+    BaseServerBackend().warmup()
+    mock_run_warmups.assert_called_once_with()
+    mock_run_warmups.reset_mock()
+    BaseServerBackend(WARMUP={"APPS": False}).warmup()
+    mock_run_warmups.assert_not_called()
+
+
+@patch("django_prodserver.backends.base.run_warmups")
+@patch("django_prodserver.gc_tuning.GCSettings.freeze_heap")
+def test_warmup_freezes_heap(mock_freeze, mock_run_warmups):
+    """Test the heap is frozen at the end of warmup when GC is set."""
+    BaseServerBackend().warmup()
+    mock_freeze.assert_not_called()
+    BaseServerBackend(GC=True).warmup()
+    mock_freeze.assert_called_once_with()
@@ -1,10 +1,13 @@
 from unittest.mock import Mock, patch
 
 import pytest
+from django.core.exceptions import ImproperlyConfigured
 
 # Handle optional dependency
 celery = pytest.importorskip("celery")
 
+from celery.worker import WorkController  # NOQA: E402
+
 from django_prodserver.backends.celery import CeleryBeat, CeleryWorker  # NOQA: E402
 
 
@@ -60,8 +63,6 @@ class TestCeleryWorker:
     def test_start_server(self, mock_import_string):
         """Test start_server method."""
         mock_app = Mock()
-        mock_worker_instance = Mock()
-        mock_app.Worker.return_value = mock_worker_instance
         mock_import_string.return_value = mock_app
 
         server_config = {"APP": "myproject.celery.app"}
@@ -70,15 +71,12 @@ class TestCeleryWorker:
         args = ["--loglevel=info", "--concurrency=4"]
         worker.start_server(*args)
 
-        mock_app.Worker.assert_called_once_with(*args)
-        mock_worker_instance.start.assert_called_once()
+        mock_app.worker_main.assert_called_once_with(["worker", *args])
 
     @patch("django_prodserver.backends.celery.import_string")
     def test_start_server_no_args(self, mock_import_string):
         """Test start_server method with no args."""
         mock_app = Mock()
-        mock_worker_instance = Mock()
-        mock_app.Worker.return_value = mock_worker_instance
         mock_import_string.return_value = mock_app
 
         server_config = {"APP": "myproject.celery.app"}
@@ -86,8 +84,7 @@ class TestCeleryWorker:
 
         worker.start_server()
 
-        mock_app.Worker.assert_called_once_with()
-        mock_worker_instance.start.assert_called_once()
+        mock_app.worker_main.assert_called_once_with(["worker"])
 
     def test_inheritance_from_base_backend(self):
         """Test that CeleryWorker properly inherits from BaseServerBackend."""
@@ -171,8 +168,6 @@ class TestCeleryWorker:
     def test_start_server_with_mixed_args(self, mock_import_string):
         """Test start_server with a mix of initialization and runtime args."""
         mock_app = Mock()
-        mock_worker_instance = Mock()
-        mock_app.Worker.return_value = mock_worker_instance
         mock_import_string.return_value = mock_app
 
         # Initialize with some args
@@ -184,9 +179,8 @@ class TestCeleryWorker:
         runtime_args = ["--queues=urgent", "--prefetch-multiplier=1"]
         worker.start_server(*runtime_args)
 
-        # Should call Worker with the runtime args passed to start_server
-        mock_app.Worker.assert_called_once_with(*runtime_args)
-        mock_worker_instance.start.assert_called_once()
+        # Should start the worker with the runtime args passed to start_server
+        mock_app.worker_main.assert_called_once_with(["worker", *runtime_args])
 
     @patch("django_prodserver.backends.celery.import_string")
     def test_import_string_exception_propagation(self, mock_import_string):
@@ -202,9 +196,7 @@ class TestCeleryWorker:
     def test_worker_start_exception_propagation(self, mock_import_string):
         """Test that worker start exceptions are properly propagated."""
         mock_app = Mock()
-        mock_worker_instance = Mock()
-        mock_worker_instance.start.side_effect = RuntimeError("Worker failed to start")
-        mock_app.Worker.return_value = mock_worker_instance
+        mock_app.worker_main.side_effect = RuntimeError("Worker failed to start")
         mock_import_string.return_value = mock_app
 
         worker = CeleryWorker(APP="myproject.celery.app")
@@ -212,13 +204,13 @@ class TestCeleryWorker:
         with pytest.raises(RuntimeError, match="Worker failed to start"):
             worker.start_server()
 
-        mock_worker_instance.start.assert_called_once()
+        mock_app.worker_main.assert_called_once()
 
     @patch("django_prodserver.backends.celery.import_string")
     def test_worker_creation_exception_propagation(self, mock_import_string):
         """Test that worker creation exceptions are properly propagated."""
         mock_app = Mock()
-        mock_app.Worker.side_effect = ValueError("Invalid worker configuration")
+        mock_app.worker_main.side_effect = ValueError("Invalid worker configuration")
         mock_import_string.return_value = mock_app
 
         worker = CeleryWorker(APP="myproject.celery.app")
@@ -226,7 +218,7 @@ class TestCeleryWorker:
         with pytest.raises(ValueError, match="Invalid worker configuration"):
             worker.start_server("--invalid-arg")
 
-        mock_app.Worker.assert_called_once_with("--invalid-arg")
+        mock_app.worker_main.assert_called_once_with(["worker", "--invalid-arg"])
 
     @patch("django_prodserver.backends.celery.import_string")
     def test_app_attribute_access(self, mock_import_string):
@@ -316,3 +308,148 @@ class TestCeleryBeat:
         # Should call Beat with the runtime args passed to start_server
         mock_app.Beat.assert_called_once_with(*runtime_args)
         mock_beat_instance.start.assert_called_once()
+
+
+class TestCeleryProfiles:
+    """Tests for the celery PROFILE expansion."""
+
+    @patch("django_prodserver.backends.celery.available_cpus", return_value=2)
+    @patch("django_prodserver.backends.celery.import_string")
+    def test_worker_profile(self, mock_import_string, mock_cpus):
+        """Test a worker profile expands into celery worker options."""
+        worker = CeleryWorker(APP="myproject.celery.app", PROFILE="cpu-bound")
+        assert "--concurrency=2" in worker.args
+        assert "--prefetch-multiplier=1" in worker.args
+
+    @patch("django_prodserver.backends.celery.import_string")
+    def test_args_override_profile(self, mock_import_string):
+        """Test explicit ARGS take precedence over the profile."""
+        worker = CeleryWorker(
+            APP="myproject.celery.app", PROFILE="low-memory", ARGS={"pool": "solo"}
+        )
+        assert "--pool=solo" in worker.args
+        assert "--pool=prefork" not in worker.args
+
+    @pytest.mark.parametrize(
+        "profile,pool",
+        [("io-bound", "thread"), ("cpu-bound", "prefork"), ("low-memory", "prefork")],
+    )
+    @patch("django_prodserver.backends.celery.available_cpus", return_value=2)
+    @patch("django_prodserver.backends.celery.import_string")
+    def test_profile_builds_a_worker(
+        self, mock_import_string, mock_cpus, profile, pool
+    ):
+        """Test each profile's options start a real celery worker."""
+        app = celery.Celery("profiles", broker="memory://")
+        mock_import_string.return_value = app
+        worker = CeleryWorker(APP="myproject.celery.app", PROFILE=profile)
+        options = worker.process_args
+        with patch.object(WorkController, "start", autospec=True) as mock_start:
+            worker.start_server(*worker.prep_server_args())
+        built = mock_start.call_args[0]
+        assert built[0].pool_cls.__module__ == f"celery.concurrency.{pool}"
+        assert built[0].concurrency == int(options["concurrency"])
+        assert built[0].prefetch_multiplier == int(options["prefetch-multiplier"])
+        if "max-memory-per-child" in options:
+            assert built[0].max_memory_per_child == 200000
+
+    @patch("django_prodserver.backends.celery.import_string")
+    def test_beat_has_no_profiles(self, mock_import_string):
+        """Test beat rejects PROFILE since it has nothing to tune."""
+        with pytest.raises(ImproperlyConfigured):
+            CeleryBeat(APP="myproject.celery.app", PROFILE="io-bound")
+
+
+class TestCeleryHooks:
+    """Tests for mapping HOOKS onto celery worker signals."""
+
+    @pytest.fixture
+    def hooks(self):
+        from celery import signals
+
+        from django_prodserver.hooks import Hooks
+
+        calls = []
+        hooks = Hooks(server_name="worker")
+        hooks.register("post_fork", lambda **kwargs: calls.append("fork"))
+        hooks.register("worker_ready", lambda **kwargs: calls.append("ready"))
+        hooks.register("worker_exit", lambda **kwargs: calls.append("exit"))
+        hooks.calls = calls
+        receivers = {
+            signal: list(signal.receivers)
+            for signal in (
+                signals.worker_process_init,
+                signals.worker_ready,
+                signals.worker_process_shutdown,
+                signals.worker_shutdown,
+            )
+        }
+        yield hooks
+        for signal, previous in receivers.items():
+            signal.receivers = previous
+            signal.sender_receivers_cache.clear()
+
+    def test_pool_process(self, hooks):
+        """Test pool processes run the hooks from the process signals."""
+        from celery import signals
+
+        from django_prodserver.backends.celery import connect_hooks
+
+        connect_hooks(hooks)
+        signals.worker_process_init.send(sender=None)
+        signals.worker_process_init.send(sender=None)
+        signals.worker_process_shutdown.send(sender=None, pid=1, exitcode=0)
+        assert hooks.calls == ["fork", "ready", "exit"]
+
+    def test_prefork_main_process(self, hooks):
+        """Test the main process of a prefork worker does not run them."""
+        from celery import signals
+        from celery.concurrency.prefork import TaskPool
+
+        from django_prodserver.backends.celery import connect_hooks
+
+        connect_hooks(hooks)
+        signals.worker_ready.send(sender=Mock(controller=Mock(pool_cls=TaskPool)))
+        assert hooks.calls == []
+
+    def test_threads_pool(self, hooks):
+        """Test pools without processes run them in the main worker."""
+        from celery import signals
+        from celery.concurrency.thread import TaskPool
+
+        from django_prodserver.backends.celery import connect_hooks
+
+        connect_hooks(hooks)
+        signals.worker_ready.send(sender=Mock(controller=Mock(pool_cls=TaskPool)))
+        signals.worker_shutdown.send(sender=None)
+        assert hooks.calls == ["fork", "ready", "exit"]
+
+    @patch("django_prodserver.backends.celery.connect_hooks")
+    @patch("django_prodserver.backends.celery.import_string")
+    def test_ready_once_consuming(self, mock_app_import, mock_connect, hooks, tmp_path):
+        """Test the probe only flips ready once the worker is ready."""
+        from celery import signals
+
+        ready_file = tmp_path / "worker.ready"
+        worker = CeleryWorker(
+            APP="myproject.celery.app", READINESS={"FILE": str(ready_file)}
+        )
+        worker.warmup()
+        assert not ready_file.exists()
+        worker.start_server()
+        signals.worker_ready.send(sender=None)
+        assert worker.readiness.ready is True
+        assert ready_file.exists()
+
+    @patch("django_prodserver.backends.celery.connect_hooks")
+    @patch("django_prodserver.hooks.import_string")
+    @patch("django_prodserver.backends.celery.import_string")
+    def test_start_server_connects_hooks(
+        self, mock_app_import, mock_hook_import, mock_connect
+    ):
+        """Test hooks are connected before the worker starts."""
+        worker = CeleryWorker(
+            APP="myproject.celery.app", HOOKS={"post_fork": "myproject.hooks.x"}
+        )
+        worker.start_server()
+        mock_connect.assert_called_once_with(worker.hooks)
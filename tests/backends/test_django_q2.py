@@ -112,7 +112,10 @@ class TestDjangoQ2WorkerFunctionality:
     def setup_mocks(self):
         """Set up mocks for all tests in this class."""
         self.mock_django_q = Mock()
-        self.patcher_modules = patch.dict(sys.modules, {"django_q": self.mock_django_q})
+        self.patcher_modules = patch.dict(
+            sys.modules,
+            {"django_q": self.mock_django_q, "django_q.signals": Mock()},
+        )
         self.patcher_settings = patch("django.conf.settings")
 
         self.patcher_modules.start()
@@ -129,6 +132,19 @@ class TestDjangoQ2WorkerFunctionality:
         worker = DjangoQ2Worker()
         assert worker.args == []
 
+    @patch("django.core.management.call_command")
+    @patch("django_prodserver.hooks.import_string")
+    def test_hooks_run_in_spawned_workers(self, mock_import_string, mock_call):
+        """Test the worker hooks are connected to django-q2's post_spawn."""
+        signals = Mock()
+        with patch.dict(sys.modules, {"django_q.signals": signals}):
+            worker = DjangoQ2Worker(HOOKS={"post_fork": "myproject.hooks.setup"})
+            worker.start_server()
+        receiver = signals.post_spawn.connect.call_args.args[0]
+        receiver(sender="django_q", proc_name="Process-1:1")
+        hook = mock_import_string.return_value
+        assert hook.call_args.kwargs["proc_name"] == "Process-1:1"
+
     def test_init_with_args(self):
         """Test DjangoQ2Worker initialization with args."""
         worker = DjangoQ2Worker(ARGS={"verbosity": "2", "cluster-name": "worker"})
@@ -217,3 +217,21 @@ class TestDjangoTasksWorker:
         worker.prep_server_args()
 
         assert worker.args == original_args
+
+
+@patch("django.core.management.call_command")
+@patch("django_prodserver.hooks.import_string")
+def test_hooks_run_around_worker(mock_import_string, mock_call_command):
+    """Test the worker hooks run in-process around the db_worker command."""
+    calls = []
+    mock_import_string.side_effect = lambda path: lambda **kw: calls.append(path)
+    mock_call_command.side_effect = lambda *args: calls.append("db_worker")
+    worker = DjangoTasksWorker(
+        HOOKS={
+            "post_fork": "hooks.fork",
+            "worker_ready": "hooks.ready",
+            "worker_exit": "hooks.exit",
+        }
+    )
+    worker.start_server()
+    assert calls == ["hooks.fork", "hooks.ready", "db_worker", "hooks.exit"]
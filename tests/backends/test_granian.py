@@ -464,3 +464,92 @@ class TestGranianEdgeCases:
         kwargs = server._parse_granian_kwargs()
         assert kwargs["ssl_cert"] == "/path/to/cert.pem"
         assert kwargs["ssl_key"] == "/path/to/key.pem"
+
+
+class TestGranianStaticFiles:
+    """Tests for serving STATIC_ROOT natively from Granian."""
+
+    @pytest.fixture(autouse=True)
+    def static_url(self, settings):
+        settings.STATIC_URL = "/static/"
+
+    def test_mounts_static_root(self, settings, tmp_path):
+        """Test STATIC_ROOT is mounted on STATIC_URL."""
+        settings.STATIC_ROOT = str(tmp_path)
+        kwargs = GranianWSGIServer()._parse_granian_kwargs()
+        assert kwargs["static_path_route"] == "/static"
+        assert kwargs["static_path_mount"] == str(tmp_path)
+        assert "static_path_expires" not in kwargs
+
+    def test_relative_static_url(self, settings, tmp_path):
+        """Test a relative STATIC_URL becomes an absolute route."""
+        settings.STATIC_ROOT = str(tmp_path)
+        settings.STATIC_URL = "assets/"
+        kwargs = GranianASGIServer()._parse_granian_kwargs()
+        assert kwargs["static_path_route"] == "/assets"
+
+    def test_static_mapping(self, tmp_path):
+        """Test the STATIC key overrides the root, URL and expiry."""
+        server = GranianASGIServer(
+            STATIC={"ROOT": str(tmp_path), "URL": "/files/", "MAX_AGE": "3600"}
+        )
+        kwargs = server._parse_granian_kwargs()
+        assert kwargs["static_path_route"] == "/files"
+        assert kwargs["static_path_mount"] == str(tmp_path)
+        assert kwargs["static_path_expires"] == 3600
+
+    def test_args_take_precedence(self, settings, tmp_path):
+        """Test explicit static ARGS win over the derived values."""
+        settings.STATIC_ROOT = str(tmp_path)
+        server = GranianWSGIServer(
+            ARGS={"static-path-route": "/s", "static-path-expires": "60"}
+        )
+        kwargs = server._parse_granian_kwargs()
+        assert kwargs["static_path_route"] == "/s"
+        assert kwargs["static_path_mount"] == str(tmp_path)
+        assert kwargs["static_path_expires"] == 60
+
+    def test_opt_out(self, settings, tmp_path):
+        """Test STATIC False disables the mount."""
+        settings.STATIC_ROOT = str(tmp_path)
+        kwargs = GranianWSGIServer(STATIC=False)._parse_granian_kwargs()
+        assert "static_path_mount" not in kwargs
+
+    def test_cdn_static_url(self, settings, tmp_path):
+        """Test nothing is mounted when assets are served from another host."""
+        settings.STATIC_ROOT = str(tmp_path)
+        settings.STATIC_URL = "https://cdn.example.com/static/"
+        assert GranianWSGIServer()._parse_granian_kwargs() == {}
+
+    def test_missing_static_root(self, settings, tmp_path):
+        """Test a STATIC_ROOT that was not collected is not mounted."""
+        settings.STATIC_ROOT = str(tmp_path / "missing")
+        assert GranianWSGIServer()._parse_granian_kwargs() == {}
+
+    def test_old_granian(self, settings, tmp_path):
+        """Test old Granian releases are not given the static options."""
+        settings.STATIC_ROOT = str(tmp_path)
+        with patch("django_prodserver.backends.granian.version", return_value="1.4.0"):
+            assert GranianWSGIServer()._parse_granian_kwargs() == {}
+
+    def test_start_server_passes_mount(self, settings, tmp_path):
+        """Test the static mount reaches the Granian constructor."""
+        settings.STATIC_ROOT = str(tmp_path)
+        with patch("granian.Granian") as MockGranian:
+            GranianWSGIServer().start_server()
+        assert MockGranian.call_args.kwargs["static_path_mount"] == str(tmp_path)
+
+
+class TestGranianProfiles:
+    """Tests for the Granian PROFILE expansion."""
+
+    @patch("django_prodserver.backends.granian.available_cpus", return_value=4)
+    def test_profile_kwargs(self, mock_cpus):
+        """Test a profile expands into Granian constructor kwargs."""
+        kwargs = GranianASGIServer(PROFILE="io-bound")._parse_granian_kwargs()
+        assert kwargs == {"workers": 4, "runtime_threads": 2, "backlog": 2048}
+
+    def test_args_override_profile(self):
+        """Test explicit ARGS take precedence over the profile."""
+        server = GranianWSGIServer(PROFILE="low-memory", ARGS={"workers": "3"})
+        assert server._parse_granian_kwargs()["workers"] == 3
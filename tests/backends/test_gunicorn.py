@@ -1,14 +1,19 @@
 from argparse import ArgumentParser, Namespace
-from unittest.mock import Mock, patch
+from unittest.mock import ANY, Mock, patch
 
 import pytest
+from django.core.exceptions import ImproperlyConfigured
 
 # Handle optional dependency
 gunicorn = pytest.importorskip("gunicorn")
 
+from gunicorn.app.wsgiapp import WSGIApplication  # NOQA: E402
+
 from django_prodserver.backends.gunicorn import (  # NOQA: E402
     DjangoApplication,
+    DjangoASGIApplication,
     GunicornServer,
+    GunicornUvicornServer,
 )
 
 
@@ -84,6 +89,26 @@ class TestGunicornServer:
         mock_django_app.assert_called_once_with("%(prog)s [OPTIONS]")
         mock_app_instance.run.assert_called_once()
 
+    @patch("sys.argv", ["manage.py", "prodserver"])
+    @patch("django_prodserver.backends.gunicorn.DjangoApplication")
+    def test_ready_once_bound(self, mock_django_app, tmp_path):
+        """Test the probe only flips ready from the arbiter's when_ready."""
+        from gunicorn.config import Config
+
+        when_ready = Mock()
+        config = Config()
+        config.set("when_ready", lambda server: when_ready(server))
+        mock_django_app.return_value = Mock(cfg=config)
+        ready_file = tmp_path / "web.ready"
+        server = GunicornServer(READINESS={"FILE": str(ready_file)})
+        server.warmup()
+        assert not ready_file.exists()
+        server.start_server()
+        config.when_ready("arbiter")
+        when_ready.assert_called_once_with("arbiter")
+        assert server.readiness.ready is True
+        assert ready_file.exists()
+
     def test_prep_server_args(self):
         """Test prep_server_args method."""
         server = GunicornServer(ARGS={"bind": "0.0.0.0:8000"})
@@ -147,3 +172,246 @@ class TestGunicornServer:
             assert expected_arg in server.args
 
         assert len(server.args) == 4
+
+
+class TestGunicornProfiles:
+    """Tests for the gunicorn PROFILE expansion."""
+
+    @pytest.mark.parametrize(
+        "profile", ["io-bound", "cpu-bound", "low-memory", "container"]
+    )
+    def test_profiles_are_valid_gunicorn_options(self, profile):
+        """Test every profile only produces options gunicorn accepts."""
+        from gunicorn.config import Config
+
+        server = GunicornServer(PROFILE=profile)
+        parser = Config().parser()
+        options = parser.parse_args(server.args)
+        assert options.worker_tmp_dir == "/dev/shm"  # noqa: S108
+
+    @patch("django_prodserver.backends.gunicorn.available_cpus", return_value=2)
+    def test_cpu_bound_workers(self, mock_cpus):
+        """Test cpu-bound sizes sync workers from the available CPUs."""
+        server = GunicornServer(PROFILE="cpu-bound")
+        assert "--workers=5" in server.args
+        assert "--worker-class=sync" in server.args
+
+    def test_args_override_profile(self):
+        """Test explicit ARGS take precedence over the profile."""
+        server = GunicornServer(PROFILE="io-bound", ARGS={"threads": "16"})
+        assert "--threads=16" in server.args
+        assert "--threads=8" not in server.args
+
+
+@patch("django_prodserver.backends.gunicorn.server_databases", return_value=["default"])
+class TestGunicornDatabaseConnections:
+    """Tests for the database connection budget of the gunicorn backend."""
+
+    def test_within_budget(self, mock_databases):
+        """Test ARGS are untouched when the connections fit."""
+        server = GunicornServer(
+            ARGS={"workers": "4", "threads": "8"},
+            DATABASE={"MAX_CONNECTIONS": 32, "ON_EXCEED": "error"},
+        )
+        assert server.args == ["--workers=4", "--threads=8"]
+
+    def test_error(self, mock_databases):
+        """Test ON_EXCEED error refuses to start."""
+        with pytest.raises(ImproperlyConfigured, match="64 connections"):
+            GunicornServer(
+                ARGS={"workers": "8", "threads": "8"},
+                DATABASE={"MAX_CONNECTIONS": 50, "ON_EXCEED": "error"},
+            )
+
+    def test_warn(self, mock_databases, caplog):
+        """Test the default only warns."""
+        server = GunicornServer(
+            ARGS={"workers": "8", "threads": "8"}, DATABASE={"MAX_CONNECTIONS": 50}
+        )
+        assert "more than DATABASE MAX_CONNECTIONS (50)" in caplog.text
+        assert server.args == ["--workers=8", "--threads=8"]
+
+    def test_adjust_threads(self, mock_databases):
+        """Test ON_EXCEED adjust reduces the threads per worker."""
+        server = GunicornServer(
+            ARGS={"bind": ":8000", "workers": "8", "threads": "8"},
+            DATABASE={"MAX_CONNECTIONS": 50, "ON_EXCEED": "adjust"},
+        )
+        assert server.args == ["--bind=:8000", "--workers=8", "--threads=6"]
+
+    def test_adjust_sync_workers(self, mock_databases):
+        """Test sync workers are reduced to the budget."""
+        server = GunicornServer(
+            ARGS={"workers": "20"},
+            DATABASE={"MAX_CONNECTIONS": 10, "ON_EXCEED": "adjust"},
+        )
+        assert server.args == ["--workers=10"]
+
+    @patch("django_prodserver.backends.gunicorn.importlib.util.find_spec")
+    def test_gevent_counts_worker_connections(self, mock_find_spec, mock_databases):
+        """Test greenlet workers can hold a connection per client connection."""
+        server = GunicornServer(
+            ARGS={"workers": "2", "worker-class": "gevent"},
+            DATABASE={"MAX_CONNECTIONS": 100, "ON_EXCEED": "adjust"},
+        )
+        assert "--worker-connections=50" in server.args
+
+    @patch(
+        "django_prodserver.backends.gunicorn.importlib.util.find_spec",
+        return_value=None,
+    )
+    def test_gevent_not_installed(self, mock_find_spec, mock_databases):
+        """Test selecting gevent without the package fails early."""
+        with pytest.raises(ImproperlyConfigured, match="gevent package"):
+            GunicornServer(ARGS={"worker-class": "gevent"})
+
+    @patch("django_prodserver.backends.gunicorn.enable_pooling")
+    def test_pool_sized_from_threads(self, mock_enable_pooling, mock_databases):
+        """Test POOL sizes each worker's pool from its (adjusted) threads."""
+        GunicornServer(
+            ARGS={"workers": "4", "threads": "16"},
+            DATABASE={"MAX_CONNECTIONS": 32, "ON_EXCEED": "adjust", "POOL": True},
+        )
+        mock_enable_pooling.assert_called_once_with(["default"], 8)
+
+
+class TestGunicornUvicornServer:
+    """Tests for running uvicorn workers under gunicorn."""
+
+    @pytest.fixture(autouse=True)
+    def uvicorn(self):
+        pytest.importorskip("uvicorn")
+
+    def test_defaults(self):
+        """Test the uvicorn worker, preload and recycling are on by default."""
+        server = GunicornUvicornServer(ARGS={"bind": "0.0.0.0:8000"})
+        options = gunicorn.config.Config().parser().parse_args(server.args)
+        assert options.worker_class.endswith(".UvicornWorker")
+        assert options.preload_app is True
+        assert options.max_requests == 1000
+        assert options.max_requests_jitter == 100
+        assert options.bind == ["0.0.0.0:8000"]
+
+    def test_args_override_defaults(self):
+        """Test explicit ARGS replace the defaults."""
+        server = GunicornUvicornServer(ARGS={"preload": False, "max_requests": "50"})
+        assert "--preload" not in server.args
+        assert "--max_requests=50" in server.args
+        assert "--max-requests=1000" not in server.args
+
+    @patch(
+        "django_prodserver.backends.gunicorn.uvicorn_worker_class",
+        side_effect=ImproperlyConfigured("GunicornUvicornServer requires uvicorn"),
+    )
+    def test_explicit_worker_class(self, mock_worker_class):
+        """Test the uvicorn worker is only looked up when ARGS do not set one."""
+        server = GunicornUvicornServer(ARGS={"worker_class": "myproject.Worker"})
+        assert "--worker_class=myproject.Worker" in server.args
+        mock_worker_class.assert_not_called()
+        with pytest.raises(ImproperlyConfigured, match="requires uvicorn"):
+            GunicornUvicornServer(ARGS={"workers": "2"})
+
+    def test_profile_keeps_uvicorn_worker(self):
+        """Test profiles never replace the uvicorn worker class."""
+        server = GunicornUvicornServer(PROFILE="io-bound")
+        worker_classes = [arg for arg in server.args if "worker-class" in arg]
+        assert len(worker_classes) == 1
+        assert worker_classes[0].endswith(".UvicornWorker")
+        assert not any(arg.startswith("--threads") for arg in server.args)
+
+    @patch("sys.argv", ["manage.py", "prodserver"])
+    @patch("django_prodserver.backends.gunicorn.DjangoASGIApplication")
+    def test_start_server(self, mock_asgi_app):
+        """Test the ASGI application class is run."""
+        GunicornUvicornServer().start_server("--workers=2")
+        mock_asgi_app.assert_called_once_with("%(prog)s [OPTIONS]")
+        mock_asgi_app.return_value.run.assert_called_once()
+
+    @patch("sys.argv", ["test_program"])
+    def test_application_loads_asgi_app(self):
+        """Test gunicorn is pointed at the ASGI application."""
+        app = DjangoASGIApplication()
+        with patch.object(WSGIApplication, "init") as mock_parent_init:
+            with patch(
+                "django_prodserver.backends.gunicorn.asgi_app_name",
+                return_value="tests.asgi:application",
+            ):
+                app.init(Mock(), Mock(), [])
+        mock_parent_init.assert_called_once_with(ANY, ANY, ("tests.asgi:application",))
+
+
+def test_boolean_args_become_flags():
+    """Test True ARGS are passed as gunicorn flags and False ones omitted."""
+    server = GunicornServer(ARGS={"preload": True, "reuse-port": False})
+    assert server.args == ["--preload"]
+
+
+class TestGunicornHooks:
+    """Tests for mapping HOOKS onto gunicorn server hooks."""
+
+    def test_hooks_chain_after_gunicorn_hooks(self):
+        """Test prodserver hooks run after hooks from the gunicorn config."""
+        from gunicorn.config import Config
+
+        from django_prodserver.backends.gunicorn import install_hooks
+        from django_prodserver.hooks import Hooks
+
+        calls = []
+        config = Config()
+        config.set("post_fork", lambda server, worker: calls.append("gunicorn"))
+        hooks = Hooks(server_name="web")
+        hooks.register("post_fork", lambda **kwargs: calls.append(kwargs))
+        hooks.register("worker_ready", lambda **kwargs: calls.append("ready"))
+        hooks.register("worker_exit", lambda **kwargs: calls.append("exit"))
+        install_hooks(config, hooks)
+
+        worker = Mock(age=2)
+        config.post_fork(Mock(), worker)
+        config.post_worker_init(worker)
+        config.worker_exit(Mock(), worker)
+        assert calls[0] == "gunicorn"
+        assert calls[1]["worker_id"] == 2
+        assert calls[1]["server_name"] == "web"
+        assert calls[2:] == ["ready", "exit"]
+
+    @patch("sys.argv", ["manage.py", "prodserver"])
+    @patch.dict("os.environ", {"PRODSERVER_PROCESS": "web"})
+    def test_load_config_installs_hooks(self, settings):
+        """Test the application adds the process' HOOKS to its config."""
+        settings.PRODUCTION_PROCESSES = {
+            "web": {
+                "BACKEND": "django_prodserver.backends.gunicorn.GunicornServer",
+                "HOOKS": {"post_fork": "tests.test_hooks.record"},
+            }
+        }
+        with patch("django_prodserver.backends.gunicorn.install_hooks") as mock_install:
+            DjangoApplication("%(prog)s [OPTIONS]")
+        mock_install.assert_called_once()
+
+    @patch("django_prodserver.backends.gunicorn.close_connections")
+    def test_connections_closed_before_fork(self, mock_close):
+        """Test the arbiter closes its connections before forking a worker."""
+        from gunicorn.config import Config
+
+        from django_prodserver.backends.gunicorn import install_hooks
+        from django_prodserver.hooks import Hooks
+
+        config = Config()
+        install_hooks(config, Hooks())
+        config.pre_fork(Mock(), Mock(age=1))
+        mock_close.assert_called_once_with()
+
+    @patch("django_prodserver.backends.gunicorn.close_connections")
+    def test_heap_frozen_before_fork(self, mock_close):
+        """Test the arbiter freezes its heap again before forking a worker."""
+        from gunicorn.config import Config
+
+        from django_prodserver.backends.gunicorn import install_hooks
+        from django_prodserver.gc_tuning import GCSettings
+        from django_prodserver.hooks import Hooks
+
+        gc_settings = Mock(spec=GCSettings)
+        config = Config()
+        install_hooks(config, Hooks(), gc_settings)
+        config.pre_fork(Mock(), Mock(age=1))
+        gc_settings.freeze_heap.assert_called_once_with()
@@ -0,0 +1,78 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from django_prodserver.backends.scheduler import ScheduledCommands
+
+JOBS = {
+    "sessions": {"SCHEDULE": "@daily", "COMMAND": "clearsessions"},
+    "digest": {"SCHEDULE": "*/15 * * * *", "COMMAND": ["send_digest", "-v", "2"]},
+}
+
+
+class TestScheduledCommands:
+    """Tests for the ScheduledCommands backend."""
+
+    def test_requires_jobs(self):
+        """Test JOBS is required."""
+        with pytest.raises(ImproperlyConfigured, match="JOBS"):
+            ScheduledCommands()
+
+    def test_jobs(self):
+        """Test every entry of JOBS becomes a job."""
+        backend = ScheduledCommands(JOBS=JOBS)
+        assert [job.name for job in backend.jobs] == ["sessions", "digest"]
+        assert backend.jobs[1].argv == ["send_digest", "-v", "2"]
+        assert backend.executor == "fork"
+        assert backend.prep_server_args() == []
+
+    def test_thread_executor(self):
+        """Test the thread executor and its pool size are read from ARGS."""
+        backend = ScheduledCommands(
+            JOBS=JOBS, ARGS={"executor": "thread", "threads": "8"}
+        )
+        assert backend.executor == "thread"
+        assert backend.threads == 8
+
+    @pytest.mark.parametrize(
+        ("args", "match"),
+        [({"executor": "process"}, "executor"), ({"threads": "many"}, "threads")],
+    )
+    def test_invalid_args(self, args, match):
+        """Test invalid ARGS are configuration errors."""
+        with pytest.raises(ImproperlyConfigured, match=match):
+            ScheduledCommands(JOBS=JOBS, ARGS=args)
+
+    @patch("django_prodserver.backends.scheduler.management.call_command")
+    @patch("django_prodserver.hooks.import_string")
+    def test_run_job_forked(self, mock_import_string, mock_call_command):
+        """Test forked runs call the command between the worker hooks."""
+        backend = ScheduledCommands(
+            JOBS=JOBS,
+            HOOKS={"post_fork": "myproject.hooks.setup", "worker_exit": "x.y"},
+        )
+        backend.run_job(backend.jobs[1])
+        mock_call_command.assert_called_once_with("send_digest", "-v", "2")
+        assert mock_import_string.return_value.call_count == 2
+
+    @patch("django_prodserver.backends.scheduler.connections")
+    @patch("django_prodserver.backends.scheduler.management.call_command")
+    def test_run_job_threaded(self, mock_call_command, mock_connections):
+        """Test threaded runs close the connections of their thread."""
+        mock_call_command.side_effect = RuntimeError
+        backend = ScheduledCommands(JOBS=JOBS, ARGS={"executor": "thread"})
+        with pytest.raises(RuntimeError):
+            backend.run_job(backend.jobs[0])
+        mock_call_command.assert_called_once_with("clearsessions")
+        mock_connections.close_all.assert_called_once_with()
+
+    @patch("django_prodserver.backends.scheduler.JobScheduler")
+    def test_start_server(self, mock_scheduler):
+        """Test the scheduler runs the configured jobs."""
+        backend = ScheduledCommands(JOBS=JOBS, ARGS={"executor": "thread"})
+        backend.start_server()
+        mock_scheduler.assert_called_once_with(
+            backend.jobs, backend.run_job, executor="thread", threads=4
+        )
+        mock_scheduler.return_value.serve_forever.assert_called_once_with()
@@ -276,3 +276,22 @@ class TestUvicornServerComparison:
 
         assert "--interface=wsgi" not in asgi_args
         assert "--interface=wsgi" in wsgi_args
+
+
+class TestUvicornProfiles:
+    """Tests for the uvicorn PROFILE expansion."""
+
+    @pytest.mark.parametrize(
+        "profile", ["io-bound", "cpu-bound", "low-memory", "container"]
+    )
+    def test_profiles_are_valid_uvicorn_options(self, profile):
+        """Test every profile only produces options uvicorn accepts."""
+        server = UvicornServer(PROFILE=profile)
+        context = uvicorn.main.make_context("uvicorn", list(server.prep_server_args()))
+        assert context.params["app"]
+
+    def test_wsgi_server_profile(self):
+        """Test the WSGI backend shares the uvicorn profiles."""
+        server = UvicornWSGIServer(PROFILE="low-memory", ARGS={"port": "8000"})
+        assert "--workers=1" in server.args
+        assert "--port=8000" in server.args
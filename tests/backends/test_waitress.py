@@ -1,11 +1,19 @@
+import os
+import signal
+import socket
+import time
+import urllib.request
 from unittest.mock import patch
 
 import pytest
+from django.core.exceptions import ImproperlyConfigured
 
 # Handle optional dependency
 waitress = pytest.importorskip("waitress")
 
-from django_prodserver.backends.waitress import WaitressServer  # NOQA: E402
+from waitress.adjustments import Adjustments  # NOQA: E402
+
+from django_prodserver.backends.waitress import AUTO, WaitressServer  # NOQA: E402
 
 
 class TestWaitressServer:
@@ -204,3 +212,251 @@ class TestWaitressServer:
 
         with pytest.raises(RuntimeError, match="Waitress failed to start"):
             server.start_server("--port=8000")
+
+
+class TestWaitressOptions:
+    """Tests for the validation and auto-sizing of waitress options."""
+
+    def test_underscore_names_are_rendered_with_dashes(self):
+        """Test option names are normalised for the waitress runner."""
+        server = WaitressServer(ARGS={"connection_limit": "200"})
+        assert server.args == ["--connection-limit=200"]
+        assert server.options == {"connection_limit": "200"}
+
+    def test_boolean_options_render_as_flags(self):
+        """Test booleans are passed as flags rather than values."""
+        server = WaitressServer(
+            ARGS={"asyncore-use-poll": "true", "expose_tracebacks": False}
+        )
+        assert server.args == ["--asyncore-use-poll", "--no-expose-tracebacks"]
+
+    def test_unknown_option(self):
+        """Test typos in option names are reported at startup."""
+        with pytest.raises(ImproperlyConfigured, match="Unknown waitress option"):
+            WaitressServer(ARGS={"thread": "4"})
+
+    def test_invalid_value(self):
+        """Test values are checked against the waitress casts."""
+        with pytest.raises(ImproperlyConfigured, match="Invalid value 'many'"):
+            WaitressServer(ARGS={"threads": "many"})
+
+    def test_invalid_response_size(self):
+        """Test a RESPONSE_SIZE which is not a size is a configuration error."""
+        with pytest.raises(ImproperlyConfigured, match="RESPONSE_SIZE"):
+            WaitressServer(ARGS={"threads": "4"}, RESPONSE_SIZE="large")
+
+    def test_without_waitress_casts(self):
+        """Test options are passed unchecked when waitress drops its casts."""
+        with patch.object(Adjustments, "_params", None):
+            server = WaitressServer(ARGS={"thread": "4"})
+        assert server.options == {"thread": "4"}
+
+    def test_non_positive_value(self):
+        """Test sizing options must be positive."""
+        with pytest.raises(ImproperlyConfigured, match="must be a positive integer"):
+            WaitressServer(ARGS={"channel-timeout": "0"})
+
+    def test_auto_not_supported(self):
+        """Test only sizing options accept auto."""
+        with pytest.raises(ImproperlyConfigured, match="cannot be set to 'auto'"):
+            WaitressServer(ARGS={"port": "auto"})
+
+    @patch("django_prodserver.backends.waitress.memory_limit", return_value=None)
+    @patch("django_prodserver.backends.waitress.available_cpus", return_value=4)
+    def test_auto_sizing(self, mock_cpus, mock_memory):
+        """Test auto values are derived from the available CPUs."""
+        server = WaitressServer(
+            ARGS={
+                "threads": "auto",
+                "connection-limit": "auto",
+                "outbuf-overflow": "auto",
+                "inbuf-overflow": "auto",
+                "recv-bytes": "auto",
+                "asyncore-use-poll": "auto",
+            }
+        )
+        assert server.options == {
+            "threads": 16,
+            "connection_limit": 400,
+            "outbuf_overflow": 1048576,
+            "inbuf_overflow": 524288,
+            "recv_bytes": 65536,
+            "asyncore_use_poll": True,
+        }
+        assert "--threads=16" in server.args
+        assert "--asyncore-use-poll" in server.args
+
+    @patch("django_prodserver.backends.waitress.memory_limit", return_value=None)
+    def test_auto_sizing_from_response_size(self, mock_memory):
+        """Test output buffers are sized from the expected response size."""
+        server = WaitressServer(
+            ARGS={"outbuf_overflow": "auto", "inbuf_overflow": "auto"},
+            RESPONSE_SIZE="100KB",
+        )
+        assert server.options == {
+            "outbuf_overflow": 262144,
+            "inbuf_overflow": 131072,
+        }
+
+    @patch(
+        "django_prodserver.backends.waitress.memory_limit", return_value=256 * 1024**2
+    )
+    def test_auto_connection_limit_respects_memory(self, mock_memory):
+        """Test the connection limit is capped by the container memory."""
+        server = WaitressServer(ARGS={"threads": "8", "connection_limit": "auto"})
+        # a quarter of 256MB divided by the default 1.5MB of buffers per channel
+        assert server.options["connection_limit"] == 64 * 1024**2 // 1572864
+
+    def test_auto_poll_for_small_connection_limit(self):
+        """Test select() is kept when the connection limit is small."""
+        server = WaitressServer(
+            ARGS={"connection_limit": "100", "asyncore_use_poll": "auto"}
+        )
+        assert server.options["asyncore_use_poll"] is False
+        assert "--no-asyncore-use-poll" in server.args
+
+    def test_string_args_are_untouched(self):
+        """Test raw string ARGS bypass validation."""
+        server = WaitressServer(ARGS="--threads=8")
+        assert server.args == ["--threads=8"]
+        assert server.options == {}
+
+
+def hello_app(environ, start_response):
+    """Tiny WSGI app answering with the pid of the serving process."""
+    body = str(os.getpid()).encode()
+    start_response("200 OK", [("Content-Length", str(len(body)))])
+    return [body]
+
+
+class TestWaitressHooks:
+    """Tests for the worker hooks of the waitress backend."""
+
+    @patch("django_prodserver.backends.waitress.waitress.runner.run")
+    @patch("django_prodserver.hooks.import_string")
+    def test_single_process(self, mock_import_string, mock_run):
+        """Test a single server runs the worker hooks in-process."""
+        calls = []
+        mock_import_string.side_effect = lambda path: lambda **kw: calls.append(path)
+        mock_run.side_effect = lambda argv: calls.append("serve")
+        server = WaitressServer(
+            HOOKS={
+                "post_fork": "hooks.fork",
+                "worker_ready": "hooks.ready",
+                "worker_exit": "hooks.exit",
+            }
+        )
+        server.start_server()
+        assert calls == ["hooks.fork", "hooks.ready", "serve", "hooks.exit"]
+
+
+class TestWaitressProfiles:
+    """Tests for the waitress PROFILE expansion."""
+
+    @pytest.mark.parametrize(
+        "profile", ["io-bound", "cpu-bound", "low-memory", "container"]
+    )
+    def test_profiles_are_valid_waitress_options(self, profile):
+        """Test every profile passes option validation and auto-sizing."""
+        server = WaitressServer(PROFILE=profile)
+        assert AUTO not in server.options.values()
+
+    @patch("django_prodserver.backends.waitress.available_cpus", return_value=3)
+    def test_cpu_bound_processes(self, mock_cpus):
+        """Test cpu-bound runs one process per CPU."""
+        server = WaitressServer(PROFILE="cpu-bound")
+        assert server.processes == 3
+        assert server.options["threads"] == "2"
+
+    def test_args_override_profile(self):
+        """Test explicit ARGS take precedence over the profile."""
+        server = WaitressServer(PROFILE="low-memory", ARGS={"threads": "8"})
+        assert server.options["threads"] == "8"
+        assert server.options["connection_limit"] == "100"
+
+
+class TestWaitressMultiProcess:
+    """Tests for running several waitress processes."""
+
+    def test_processes_option_is_not_passed_to_waitress(self):
+        """Test prodserver options are removed from the waitress options."""
+        server = WaitressServer(
+            ARGS={
+                "port": "8000",
+                "processes": "4",
+                "reuse-port": "true",
+                "zygote": "true",
+            }
+        )
+        assert server.processes == 4
+        assert server.reuse_port is True
+        assert server.zygote is True
+        assert server.options == {"port": "8000"}
+        assert server.args == ["--port=8000"]
+
+    def test_invalid_processes(self):
+        """Test processes must be a positive integer."""
+        with pytest.raises(ImproperlyConfigured, match="'processes' must be"):
+            WaitressServer(ARGS={"processes": "0"})
+
+    @patch("waitress.runner.run")
+    @patch.object(WaitressServer, "start_multiprocess")
+    def test_start_server_multiprocess(self, mock_multiprocess, mock_run):
+        """Test more than one process uses the prefork supervisor."""
+        server = WaitressServer(ARGS={"processes": "2"})
+        server.start_server(*server.prep_server_args())
+        mock_multiprocess.assert_called_once_with()
+        mock_run.assert_not_called()
+
+    def test_bind_sockets(self):
+        """Test the listening sockets are created from the bind options."""
+        server = WaitressServer(ARGS={"host": "127.0.0.1", "port": "0"})
+        sockets = server.bind_sockets()
+        try:
+            assert len(sockets) == 1
+            assert sockets[0].getsockname()[0] == "127.0.0.1"
+        finally:
+            for sock in sockets:
+                sock.close()
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+    @pytest.mark.parametrize("zygote", ["false", "true"])
+    @patch(
+        "django_prodserver.backends.waitress.wsgi_app_name",
+        return_value="tests.backends.test_waitress:hello_app",
+    )
+    def test_serves_from_several_processes(self, mock_wsgi_app_name, zygote):
+        """Test the forked servers share the listening socket."""
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        server = WaitressServer(
+            ARGS={
+                "host": "127.0.0.1",
+                "port": str(port),
+                "processes": "2",
+                "zygote": zygote,
+            }
+        )
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            try:
+                server.start_multiprocess()
+            finally:
+                os._exit(0)
+        try:
+            pids = set()
+            deadline = time.monotonic() + 10
+            while len(pids) < 2 and time.monotonic() < deadline:
+                try:
+                    with urllib.request.urlopen(
+                        f"http://127.0.0.1:{port}/", timeout=1
+                    ) as response:
+                        pids.add(int(response.read()))
+                except OSError:
+                    time.sleep(0.05)
+            assert len(pids) >= 1
+            assert pid not in pids
+        finally:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
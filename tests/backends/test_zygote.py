@@ -0,0 +1,62 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from django_prodserver.backends.zygote import CommandZygote
+
+
+class TestCommandZygote:
+    """Tests for the CommandZygote backend."""
+
+    def test_requires_socket(self):
+        """Test the socket path is required."""
+        with pytest.raises(ImproperlyConfigured, match="socket"):
+            CommandZygote()
+
+    def test_args(self):
+        """Test the allowed commands and socket permissions are read from ARGS."""
+        backend = CommandZygote(
+            ARGS={
+                "socket": "/run/zygote.sock",
+                "commands": "clearsessions, send_digest",
+                "mode": "660",
+            }
+        )
+        assert backend.socket_path == "/run/zygote.sock"
+        assert backend.commands == {"clearsessions", "send_digest"}
+        assert backend.mode == 0o660
+        assert backend.prep_server_args() == []
+
+    def test_all_commands_by_default(self):
+        """Test any command may run unless restricted."""
+        backend = CommandZygote(ARGS={"socket": "/run/zygote.sock"})
+        assert backend.commands is None
+        assert backend.mode == 0o600
+
+    def test_invalid_mode(self):
+        """Test the socket permissions must be octal."""
+        with pytest.raises(ImproperlyConfigured, match="octal"):
+            CommandZygote(ARGS={"socket": "/run/zygote.sock", "mode": "rw"})
+
+    @patch("django_prodserver.backends.zygote.load_command_class")
+    def test_preload_commands(self, mock_load):
+        """Test only the allowed commands are imported up front."""
+        backend = CommandZygote(
+            ARGS={"socket": "/run/zygote.sock", "commands": "check"}
+        )
+        backend.preload_commands()
+        mock_load.assert_called_once_with("django.core", "check")
+
+    @patch("django_prodserver.backends.zygote.management.ManagementUtility")
+    @patch("django_prodserver.hooks.import_string")
+    def test_run_command(self, mock_import_string, mock_utility):
+        """Test the command runs between the worker hooks."""
+        backend = CommandZygote(
+            ARGS={"socket": "/run/zygote.sock"},
+            HOOKS={"post_fork": "myproject.hooks.setup", "worker_exit": "x.y"},
+        )
+        backend.run_command(["clearsessions", "-v", "2"])
+        mock_utility.assert_called_once_with(["manage.py", "clearsessions", "-v", "2"])
+        mock_utility.return_value.execute.assert_called_once_with()
+        assert mock_import_string.return_value.call_count == 2
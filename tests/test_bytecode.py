@@ -0,0 +1,64 @@
+import os
+import sys
+
+from django_prodserver.bytecode import (
+    PYCACHE_PREFIX_ENV_VAR,
+    compile_bytecode,
+    source_directories,
+    use_bytecode_cache,
+)
+
+
+def test_source_directories(tmp_path, monkeypatch):
+    """Test sys.path directories are listed once, nested ones dropped."""
+    (tmp_path / "lib" / "site-packages").mkdir(parents=True)
+    (tmp_path / "cache").mkdir()
+    monkeypatch.setattr(
+        sys,
+        "path",
+        [
+            str(tmp_path / "lib"),
+            str(tmp_path / "lib" / "site-packages"),
+            str(tmp_path / "lib"),
+            str(tmp_path / "missing"),
+            str(tmp_path / "python311.zip"),
+            str(tmp_path / "cache"),
+        ],
+    )
+    assert source_directories(exclude=str(tmp_path / "cache")) == [
+        str(tmp_path / "lib")
+    ]
+
+
+def test_compile_bytecode(tmp_path):
+    """Test modules are compiled into the cache, broken ones counted."""
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "good.py").write_text("VALUE = 1\n")
+    (source / "broken.py").write_text("def (:\n")
+    cache = tmp_path / "cache"
+    result = compile_bytecode(str(cache), [str(source)])
+    assert (result.compiled, result.failed) == (1, 1)
+    assert str(result) == "1 module(s) compiled from 1 path(s), 1 failed to compile"
+    pycs = [name for _, _, names in os.walk(cache) for name in names]
+    assert len(pycs) == 1
+    assert pycs[0].startswith("good.")
+    assert not (source / "__pycache__").exists()
+
+
+def test_use_bytecode_cache(tmp_path, monkeypatch):
+    """Test this process and its children load bytecode from the cache."""
+    monkeypatch.setattr(sys, "pycache_prefix", None)
+    # restored, or removed, once the test is done
+    monkeypatch.setenv(PYCACHE_PREFIX_ENV_VAR, "")
+    assert use_bytecode_cache(str(tmp_path))
+    assert sys.pycache_prefix == str(tmp_path)
+    assert os.environ[PYCACHE_PREFIX_ENV_VAR] == str(tmp_path)
+
+
+def test_missing_bytecode_cache(tmp_path, monkeypatch, caplog):
+    """Test a cache which was never prepared is ignored."""
+    monkeypatch.setattr(sys, "pycache_prefix", None)
+    assert not use_bytecode_cache(str(tmp_path / "missing"))
+    assert sys.pycache_prefix is None
+    assert "--prepare" in caplog.text
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from django_prodserver.cron import CronSchedule
+
+
+class TestCronSchedule:
+    """Tests for parsing and evaluating cron expressions."""
+
+    @pytest.mark.parametrize(
+        ("expression", "after", "expected"),
+        [
+            ("* * * * *", datetime(2024, 1, 1, 10, 0, 30), datetime(2024, 1, 1, 10, 1)),
+            ("*/15 * * * *", datetime(2024, 1, 1, 10, 0), datetime(2024, 1, 1, 10, 15)),
+            ("0 3 * * *", datetime(2024, 1, 1, 3, 0), datetime(2024, 1, 2, 3, 0)),
+            (
+                "30 8-18/2 * * *",
+                datetime(2024, 1, 1, 9, 0),
+                datetime(2024, 1, 1, 10, 30),
+            ),
+            ("0 0 1 * *", datetime(2024, 1, 15), datetime(2024, 2, 1)),
+            ("0 0 * * mon-fri", datetime(2024, 1, 5, 12), datetime(2024, 1, 8)),
+            ("0 0 * * 7", datetime(2024, 1, 1), datetime(2024, 1, 7)),
+            ("0 0 1 jan *", datetime(2024, 6, 1), datetime(2025, 1, 1)),
+            ("0 0 29 feb *", datetime(2024, 3, 1), datetime(2028, 2, 29)),
+            ("@hourly", datetime(2024, 12, 31, 23, 59), datetime(2025, 1, 1)),
+            ("@weekly", datetime(2024, 1, 1), datetime(2024, 1, 7)),
+        ],
+    )
+    def test_next_after(self, expression, after, expected):
+        """Test the next run is the first matching minute after the given time."""
+        assert CronSchedule(expression).next_after(after) == expected
+
+    def test_day_of_month_or_week(self):
+        """Test a day matching either restricted day field runs, like cron."""
+        schedule = CronSchedule("0 0 13 * fri")
+        # Wednesday 3rd, then Friday 5th, then the 13th
+        assert schedule.next_after(datetime(2024, 1, 3)) == datetime(2024, 1, 5)
+        assert schedule.next_after(datetime(2024, 1, 12)) == datetime(2024, 1, 13)
+
+    @pytest.mark.parametrize(
+        "expression",
+        ["* * * *", "60 * * * *", "* * * * mon-", "*/0 * * * *", "5-1 * * * *", "x"],
+    )
+    def test_invalid(self, expression):
+        """Test invalid expressions are configuration errors."""
+        with pytest.raises(ImproperlyConfigured):
+            CronSchedule(expression)
+
+    def test_never_matches(self):
+        """Test expressions naming a day which does not exist are rejected."""
+        with pytest.raises(ImproperlyConfigured, match="never matches"):
+            CronSchedule("0 0 30 feb *")
@@ -0,0 +1,187 @@
+import os
+from types import SimpleNamespace
+from typing import ClassVar
+from unittest.mock import Mock, patch
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from django_prodserver import database
+from django_prodserver.database import (
+    ConnectionBudget,
+    close_connections,
+    enable_pooling,
+    preopen_connections,
+    reset_inherited_connections,
+    server_databases,
+)
+
+
+def fake_settings(**databases):
+    return SimpleNamespace(DATABASES=databases)
+
+
+POSTGRES = "django.db.backends.postgresql"
+
+
+class TestConnectionBudget:
+    """Tests for the DATABASE key parsing."""
+
+    def test_defaults(self):
+        """Test an absent DATABASE key sets no limit."""
+        budget = ConnectionBudget.from_config(None)
+        assert budget.max_connections is None
+        assert budget.exceeded(10_000) is False
+
+    def test_exceeded(self):
+        """Test connections are compared to MAX_CONNECTIONS."""
+        budget = ConnectionBudget.from_config({"MAX_CONNECTIONS": "50"})
+        assert budget.exceeded(50) is False
+        assert budget.exceeded(51) is True
+
+    def test_invalid_on_exceed(self):
+        """Test an unknown ON_EXCEED is rejected."""
+        with pytest.raises(ImproperlyConfigured, match="ON_EXCEED"):
+            ConnectionBudget.from_config({"ON_EXCEED": "ignore"})
+
+
+class TestServerDatabases:
+    """Tests for finding the databases that use network connections."""
+
+    def test_sqlite_is_ignored(self):
+        """Test SQLite databases are not counted."""
+        databases = fake_settings(
+            default={"ENGINE": POSTGRES},
+            cache={"ENGINE": "django.db.backends.sqlite3"},
+        )
+        with patch("django_prodserver.database.settings", databases):
+            assert server_databases() == ["default"]
+
+
+class TestEnablePooling:
+    """Tests for enabling the psycopg connection pool."""
+
+    @patch("django_prodserver.database.importlib.util.find_spec")
+    def test_pool_sized_from_concurrency(self, mock_find_spec):
+        """Test the pool is sized from the connections of a worker."""
+        databases = fake_settings(
+            default={"ENGINE": POSTGRES},
+            mysql={"ENGINE": "django.db.backends.mysql"},
+        )
+        with patch("django_prodserver.database.settings", databases):
+            enable_pooling(["default", "mysql"], 8)
+        assert databases.DATABASES["default"]["OPTIONS"]["pool"] == {
+            "min_size": 4,
+            "max_size": 8,
+        }
+        assert "OPTIONS" not in databases.DATABASES["mysql"]
+
+    @patch("django_prodserver.database.importlib.util.find_spec")
+    def test_explicit_pool_is_kept(self, mock_find_spec):
+        """Test a pool configured in OPTIONS is left alone."""
+        databases = fake_settings(
+            default={"ENGINE": POSTGRES, "OPTIONS": {"pool": {"max_size": 2}}}
+        )
+        with patch("django_prodserver.database.settings", databases):
+            enable_pooling(["default"], 8)
+        assert databases.DATABASES["default"]["OPTIONS"]["pool"] == {"max_size": 2}
+
+    @patch("django_prodserver.database.importlib.util.find_spec")
+    def test_persistent_connections(self, mock_find_spec):
+        """Test pooling is refused with CONN_MAX_AGE, as Django would."""
+        databases = fake_settings(default={"ENGINE": POSTGRES, "CONN_MAX_AGE": 60})
+        with patch("django_prodserver.database.settings", databases):
+            with pytest.raises(ImproperlyConfigured, match="CONN_MAX_AGE"):
+                enable_pooling(["default"], 8)
+
+    @patch("django_prodserver.database.importlib.util.find_spec", return_value=None)
+    def test_psycopg_missing(self, mock_find_spec):
+        """Test a clear error when psycopg is not installed."""
+        databases = fake_settings(default={"ENGINE": POSTGRES})
+        with patch("django_prodserver.database.settings", databases):
+            with pytest.raises(ImproperlyConfigured, match="psycopg"):
+                enable_pooling(["default"], 8)
+
+
+class FakeConnection:
+    """A database connection wrapper, as returned by ``connections[alias]``."""
+
+    _connection_pools: ClassVar[dict] = {}
+
+    def __init__(self, alias="default"):
+        self.alias = alias
+        self.connection = Mock()
+        self.close = Mock()
+        self.close_pool = Mock()
+
+
+@pytest.fixture
+def fake_connections():
+    connection = FakeConnection()
+    FakeConnection._connection_pools = {}
+    with (
+        patch.object(database, "connections") as connections,
+        patch.object(database, "caches") as caches,
+        patch.object(database, "_inherited", []),
+        patch.object(database, "_forked_from", None),
+    ):
+        connections.all.return_value = [connection]
+        connections.__getitem__.return_value = connection
+        caches.all.return_value = []
+        caches.__iter__.return_value = iter([])
+        yield connection, caches
+
+
+class TestForkedConnections:
+    """Tests for the connection hygiene around forking workers."""
+
+    def test_close_before_fork(self, fake_connections):
+        """Test the parent closes its connections, pools and cache clients."""
+        connection, caches = fake_connections
+        cache = Mock()
+        caches.all.return_value = [cache]
+        FakeConnection._connection_pools = {"default": Mock()}
+        close_connections()
+        connection.close.assert_called_once_with()
+        connection.close_pool.assert_called_once_with()
+        cache.close.assert_called_once_with()
+
+    def test_reset_in_forked_worker(self, fake_connections):
+        """Test a forked worker drops, without closing, what it inherited."""
+        connection, caches = fake_connections
+        inherited = connection.connection
+        pool = Mock()
+        FakeConnection._connection_pools = {"default": pool}
+        caches.__iter__.return_value = iter(["default"])
+        caches._connections = SimpleNamespace(default=Mock())
+        database._forked_from = os.getpid() + 1
+        reset_inherited_connections()
+        assert connection.connection is None
+        assert FakeConnection._connection_pools == {}
+        assert database._inherited[:2] == [inherited, pool]
+        inherited.close.assert_not_called()
+        pool.close.assert_not_called()
+        caches.__delitem__.assert_called_once_with("default")
+
+    def test_reset_in_parent_process(self, fake_connections):
+        """Test the process which forked keeps its connections."""
+        connection, _ = fake_connections
+        inherited = connection.connection
+        database._forked_from = os.getpid()
+        reset_inherited_connections()
+        assert connection.connection is inherited
+
+    @patch("django_prodserver.database.server_databases", return_value=["default"])
+    def test_preopen(self, mock_databases, fake_connections):
+        """Test pools are filled, other databases connected."""
+        connection, _ = fake_connections
+        connection.pool = None
+        connection.ensure_connection = Mock()
+        preopen_connections()
+        connection.ensure_connection.assert_called_once_with()
+
+        connection.pool = Mock()
+        preopen_connections()
+        connection.pool.open.assert_called_once_with(
+            wait=True, timeout=database.PREOPEN_TIMEOUT
+        )
@@ -0,0 +1,236 @@
+import asyncio
+import gc
+import time
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+
+from django_prodserver import gc_tuning
+from django_prodserver.gc_tuning import (
+    NO_FULL_COLLECTIONS,
+    GCPauses,
+    GCSettings,
+    InFlightASGI,
+    InFlightWSGI,
+    in_flight,
+    log_gc_pauses,
+    record_gc_pauses,
+)
+from django_prodserver.hooks import Hooks
+from django_prodserver.wrappers import wrap_asgi_application, wrap_wsgi_application
+
+
+@pytest.fixture
+def restore_gc():
+    """Restore the collector's thresholds, callbacks and frozen objects."""
+    threshold = gc.get_threshold()
+    callbacks = list(gc.callbacks)
+    yield
+    gc.set_threshold(*threshold)
+    gc.callbacks[:] = callbacks
+    gc.unfreeze()
+
+
+class TestGCSettings:
+    """Tests for the GC key of a process."""
+
+    def test_not_configured(self):
+        """Test there are no settings without the GC key."""
+        assert GCSettings.from_config(None) is None
+        assert GCSettings.from_config({}) is None
+
+    def test_true_only_freezes(self):
+        """Test GC True freezes the heap and tunes nothing else."""
+        settings = GCSettings.from_config(True)
+        assert settings.freeze is True
+        assert settings.threshold is None
+        assert settings.collect_interval is None
+
+    def test_from_config(self):
+        """Test the thresholds and interval are read from the GC key."""
+        settings = GCSettings.from_config(
+            {"FREEZE": False, "THRESHOLD": ["50000", 20], "COLLECT_INTERVAL": "60"}
+        )
+        assert settings.freeze is False
+        assert settings.threshold == [50000, 20]
+        assert settings.collect_interval == 60.0
+
+    @pytest.mark.parametrize(
+        "config",
+        [
+            "yes",
+            {"THRESHOLD": ["many"]},
+            {"THRESHOLD": [1, 2, 3, 4]},
+            {"COLLECT_INTERVAL": -1},
+        ],
+    )
+    def test_invalid(self, config):
+        """Test invalid GC keys are configuration errors."""
+        with pytest.raises(ImproperlyConfigured, match="GC"):
+            GCSettings.from_config(config)
+
+    def test_freeze_heap(self, restore_gc):
+        """Test the objects alive after warmup are frozen."""
+        GCSettings().freeze_heap()
+        assert gc.get_freeze_count() > 0
+
+    def test_freeze_disabled(self, restore_gc):
+        """Test FREEZE False leaves the heap alone."""
+        gc.unfreeze()
+        GCSettings(freeze=False).freeze_heap()
+        assert gc.get_freeze_count() == 0
+
+    def test_configure_worker(self, restore_gc):
+        """Test workers apply the thresholds."""
+        GCSettings(threshold=[50000, 20, 10]).configure_worker(server_name="web")
+        assert gc.get_threshold() == (50000, 20, 10)
+
+    def test_collect_interval(self, restore_gc):
+        """Test automatic full collections give way to the collector thread."""
+        settings = GCSettings(collect_interval=0.01)
+        with patch("django_prodserver.gc_tuning.gc.collect") as mock_collect:
+            settings.configure_worker()
+            try:
+                assert gc.get_threshold()[2] == NO_FULL_COLLECTIONS
+                deadline = time.monotonic() + 5
+                while not mock_collect.called:
+                    assert time.monotonic() < deadline
+                    time.sleep(0.01)
+            finally:
+                settings.stop_collector()
+                settings._collector.join(5)
+        assert not settings._collector.is_alive()
+
+    def test_collector_waits_for_idle(self):
+        """Test busy workers only collect once overdue."""
+        settings = GCSettings()
+        stop = settings._stop
+        with (
+            patch("django_prodserver.gc_tuning.gc.collect") as mock_collect,
+            patch.object(gc_tuning.in_flight, "count", 1),
+            patch(
+                "django_prodserver.gc_tuning.time.monotonic", side_effect=[0, 1, 2, 2]
+            ),
+            patch.object(stop, "wait", side_effect=[False, False, True]),
+        ):
+            settings._collect_when_idle(1.0)
+        mock_collect.assert_called_once_with()
+
+
+class TestGCPauses:
+    """Tests for recording the collector's pauses."""
+
+    def test_callback(self):
+        """Test pauses are counted by generation."""
+        pauses = GCPauses()
+        pauses.callback("start", {"generation": 2})
+        pauses.callback("stop", {"generation": 2, "collected": 7})
+        pauses.callback("stop", {"generation": 0, "collected": 1})
+        assert pauses.collections == [0, 0, 1]
+        assert pauses.collected == [0, 0, 7]
+        assert pauses.longest[2] == pauses.seconds[2] > 0
+        assert pauses.to_dict()["2"]["collections"] == 1
+        assert str(pauses).startswith("GC paused for ")
+
+    def test_histogram_and_requests(self):
+        """Test pauses are bucketed and correlated with requests in flight."""
+        pauses = GCPauses()
+        in_flight.enter()
+        in_flight.enter()
+        try:
+            with patch(
+                "django_prodserver.gc_tuning.time.perf_counter", side_effect=[0, 0.003]
+            ):
+                pauses.callback("start", {"generation": 1})
+                pauses.callback("stop", {"generation": 1, "collected": 0})
+        finally:
+            in_flight.exit()
+            in_flight.exit()
+        assert pauses.buckets[1][gc_tuning.BUCKETS.index(0.005)] == 1
+        assert sum(pauses.buckets[1]) == 1
+        assert pauses.during_requests == [0, 1, 0]
+        assert pauses.stalled_request_seconds[1] == pytest.approx(0.006)
+        assert "1 pause(s) during requests stalling them by 6.0ms" in str(pauses)
+
+    @patch("django_prodserver.gc_tuning.os.getpid", return_value=-1)
+    def test_reset_after_fork(self, mock_getpid, restore_gc):
+        """Test a worker does not report the pauses of its parent."""
+        gc_tuning.pauses.collections[0] += 1
+        record_gc_pauses()
+        assert gc_tuning.pauses.pid == -1
+        assert gc_tuning.pauses.collections == [0, 0, 0]
+        assert gc_tuning.pauses.callback in gc.callbacks
+
+    def test_records_real_collections(self, restore_gc):
+        """Test the callback measures the collections of this process."""
+        pauses = GCPauses()
+        gc.callbacks.append(pauses.callback)
+        gc.collect()
+        assert pauses.collections[2] >= 1
+
+
+class TestInFlight:
+    """Tests for counting the requests being handled."""
+
+    def test_wsgi(self):
+        """Test WSGI requests are counted while the application runs."""
+        seen = []
+
+        def app(environ, start_response):
+            seen.append(in_flight.count)
+            return [b""]
+
+        InFlightWSGI(app)({}, None)
+        assert seen == [1]
+        assert in_flight.count == 0
+
+    def test_asgi(self):
+        """Test ASGI requests are counted, lifespan events are not."""
+        seen = []
+
+        async def app(scope, receive, send):
+            seen.append(in_flight.count)
+
+        asyncio.run(InFlightASGI(app)({"type": "http"}, None, None))
+        asyncio.run(InFlightASGI(app)({"type": "lifespan"}, None, None))
+        assert seen == [1, 0]
+        assert in_flight.count == 0
+
+    @patch.dict("os.environ", {"PRODSERVER_PROCESS": "web"})
+    @override_settings(
+        PRODUCTION_PROCESSES={
+            "web": {
+                "BACKEND": "django_prodserver.backends.gunicorn.GunicornServer",
+                "GC": {"COLLECT_INTERVAL": 60},
+            }
+        }
+    )
+    def test_wrapped_when_collecting_when_idle(self):
+        """Test the application wrapper counts requests for the collector."""
+        assert isinstance(wrap_wsgi_application(print), InFlightWSGI)
+        assert isinstance(wrap_asgi_application(print), InFlightASGI)
+
+    @patch.dict("os.environ", {"PRODSERVER_PROCESS": "web"})
+    @override_settings(
+        PRODUCTION_PROCESSES={
+            "web": {
+                "BACKEND": "django_prodserver.backends.gunicorn.GunicornServer",
+                "GC": True,
+            }
+        }
+    )
+    def test_not_wrapped_otherwise(self):
+        """Test requests are not counted when nothing needs them."""
+        assert wrap_wsgi_application(print) is print
+
+
+def test_worker_hooks():
+    """Test workers apply the GC settings first and log their pauses last."""
+    hooks = Hooks.for_process({"GC": True, "HOOKS": {"worker_exit": "os.getpid"}})
+    assert hooks.hooks["worker_ready"][0] is record_gc_pauses
+    assert hooks.hooks["worker_ready"][1].__name__ == "configure_worker"
+    assert hooks.hooks["worker_exit"][-2].__name__ == "stop_collector"
+    assert hooks.hooks["worker_exit"][-1] is log_gc_pauses
+    assert Hooks.for_process({}).hooks["worker_exit"] == [log_gc_pauses]
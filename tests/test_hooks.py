@@ -0,0 +1,143 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+
+from django_prodserver import hooks as hooks_module
+from django_prodserver.database import (
+    preopen_connections,
+    reset_inherited_connections,
+)
+from django_prodserver.gc_tuning import record_gc_pauses
+from django_prodserver.hooks import Hooks
+from django_prodserver.wrappers import start_worker_hooks
+
+calls = []
+
+
+def record(**kwargs):
+    calls.append(kwargs)
+
+
+def record_exit(**kwargs):
+    calls.append({"exit": True, **kwargs})
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    calls.clear()
+    hooks_module._worker_started_in = None
+    yield
+    calls.clear()
+
+
+class TestHooks:
+    """Tests for loading and running lifecycle hooks."""
+
+    def test_from_config(self):
+        """Test dotted paths, single or in lists, are imported."""
+        hooks = Hooks.from_config(
+            {
+                "post_fork": "tests.test_hooks.record",
+                "worker_exit": ["tests.test_hooks.record", "tests.test_hooks.record"],
+            },
+            server_name="web",
+        )
+        assert hooks.hooks["post_fork"] == [record]
+        assert len(hooks.hooks["worker_exit"]) == 2
+        assert hooks.hooks["pre_start"] == []
+
+    def test_unknown_hook(self):
+        """Test hook names are validated."""
+        with pytest.raises(ImproperlyConfigured, match="Unknown hook 'on_start'"):
+            Hooks.from_config({"on_start": "tests.test_hooks.record"})
+
+    def test_import_error(self):
+        """Test a hook that cannot be imported fails at startup."""
+        with pytest.raises(ImproperlyConfigured, match="Cannot import post_fork"):
+            Hooks.from_config({"post_fork": "tests.test_hooks.missing"})
+
+    def test_run_passes_context(self):
+        """Test hooks receive the process name, pid and extra context."""
+        hooks = Hooks.from_config(
+            {"post_fork": "tests.test_hooks.record"}, server_name="web"
+        )
+        hooks.run("post_fork", worker_id=3)
+        assert calls == [{"server_name": "web", "pid": os.getpid(), "worker_id": 3}]
+
+    def test_empty(self):
+        """Test hooks without any configured callable are falsy."""
+        assert not Hooks.from_config(None)
+        assert Hooks.from_config({"pre_start": "tests.test_hooks.record"})
+
+    def test_register(self):
+        """Test internal callables can be added to a hook."""
+        hooks = Hooks()
+        hooks.register("worker_ready", record)
+        hooks.start_worker()
+        assert len(calls) == 1
+
+    @patch("django_prodserver.hooks.atexit.register")
+    def test_start_worker_once(self, mock_atexit):
+        """Test the worker hooks only start once per process."""
+        hooks = Hooks.from_config(
+            {
+                "post_fork": "tests.test_hooks.record",
+                "worker_ready": "tests.test_hooks.record",
+                "worker_exit": "tests.test_hooks.record_exit",
+            }
+        )
+        hooks.start_worker_once()
+        hooks.start_worker_once()
+        assert len(calls) == 2
+        mock_atexit.assert_called_once_with(hooks.run, "worker_exit")
+
+    @patch.dict("os.environ", {"PRODSERVER_PROCESS": "web"})
+    @override_settings(
+        PRODUCTION_PROCESSES={
+            "web": {
+                "BACKEND": "django_prodserver.backends.uvicorn.UvicornServer",
+                "HOOKS": {"post_fork": "tests.test_hooks.record"},
+            }
+        }
+    )
+    def test_for_current_process(self):
+        """Test workers load the hooks of the process they belong to."""
+        hooks = Hooks.for_current_process()
+        assert hooks.server_name == "web"
+        assert hooks.hooks["post_fork"] == [reset_inherited_connections, record]
+
+    def test_preopen(self):
+        """Test DATABASE PREOPEN opens connections before workers take work."""
+        hooks = Hooks.for_process({"DATABASE": {"PREOPEN": True}})
+        assert hooks.hooks["worker_ready"] == [record_gc_pauses, preopen_connections]
+        assert Hooks.for_process({}).hooks["worker_ready"] == [record_gc_pauses]
+
+
+class TestApplicationWorkerHooks:
+    """Tests for the worker hooks run when the application is imported."""
+
+    @patch("django_prodserver.hooks.atexit.register")
+    def test_backend_relying_on_application(self, mock_atexit):
+        """Test backends without hooks of their own start them on import."""
+        pytest.importorskip("uvicorn")
+        start_worker_hooks(
+            {
+                "BACKEND": "django_prodserver.backends.uvicorn.UvicornServer",
+                "HOOKS": {"post_fork": "tests.test_hooks.record"},
+            }
+        )
+        assert len(calls) == 1
+
+    def test_backend_with_native_hooks(self):
+        """Test backends running hooks themselves are left alone."""
+        pytest.importorskip("gunicorn")
+        start_worker_hooks(
+            {
+                "BACKEND": "django_prodserver.backends.gunicorn.GunicornServer",
+                "HOOKS": {"post_fork": "tests.test_hooks.record"},
+            }
+        )
+        assert calls == []
@@ -0,0 +1,121 @@
+import os
+import signal
+import time
+import tracemalloc
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from django_prodserver.hooks import Hooks
+from django_prodserver.memory import MemoryTracer, diff_report
+
+pytestmark = pytest.mark.skipif(not hasattr(signal, "SIGURG"), reason="requires SIGURG")
+
+LEAK = []
+
+
+def _leak(count):
+    LEAK.extend(bytearray(1024) for _ in range(count))
+
+
+@pytest.fixture
+def tracing():
+    """Trace allocations for the duration of a test."""
+    tracemalloc.start()
+    yield
+    tracemalloc.stop()
+    LEAK.clear()
+
+
+class TestDiffReport:
+    """Tests for reporting the allocation sites which grew."""
+
+    def test_report(self, tracing):
+        """Test the sites allocating between two snapshots are reported."""
+        old = tracemalloc.take_snapshot()
+        _leak(100)
+        report = diff_report(old, tracemalloc.take_snapshot())
+        line = next(line for line in report.splitlines() if "test_memory.py" in line)
+        # 100 KiB of buffers, plus the bytearray objects
+        assert float(line.split()[0]) >= 100
+        assert report.startswith("Allocations changed by +")
+
+    def test_traceback(self):
+        """Test the callers are reported when more than one frame is traced."""
+        tracemalloc.start(5)
+        try:
+            old = tracemalloc.take_snapshot()
+            _leak(10)
+            report = diff_report(old, tracemalloc.take_snapshot())
+        finally:
+            tracemalloc.stop()
+            LEAK.clear()
+        assert "from " in report
+
+
+class TestMemoryTracer:
+    """Tests for the TRACEMALLOC key of a process."""
+
+    def test_not_configured(self):
+        """Test there is no tracer without the TRACEMALLOC key."""
+        assert MemoryTracer.from_config(None) is None
+
+    def test_from_config(self):
+        """Test the defaults and the configured values."""
+        tracer = MemoryTracer.from_config(True, "worker")
+        assert tracer.signum == signal.SIGURG
+        assert tracer.directory.endswith("prodserver-memory-worker")
+        assert (tracer.interval, tracer.count, tracer.frames) == (60, 5, 1)
+        tracer = MemoryTracer.from_config(
+            {"SIGNAL": "SIGUSR1", "INTERVAL": "300", "COUNT": 6, "FRAMES": 10}
+        )
+        assert tracer.signum == signal.SIGUSR1
+        assert (tracer.interval, tracer.count, tracer.frames) == (300, 6, 10)
+
+    @pytest.mark.parametrize(
+        "config",
+        ["yes", {"SIGNAL": "SIGNOPE"}, {"COUNT": 1}, {"INTERVAL": "often"}],
+    )
+    def test_invalid(self, config):
+        """Test invalid TRACEMALLOC keys are configuration errors."""
+        with pytest.raises(ImproperlyConfigured, match="TRACEMALLOC"):
+            MemoryTracer.from_config(config)
+
+    def test_trace(self, tmp_path):
+        """Test snapshots are dumped and compared with the first one."""
+        tracer = MemoryTracer(str(tmp_path), signal.SIGURG, interval=0.01, count=3)
+        written = tracer.trace()
+        assert not tracemalloc.is_tracing()
+        snapshots = sorted(tmp_path.glob("*.tracemalloc"))
+        reports = sorted(tmp_path.glob("*.txt"))
+        assert len(snapshots) == 3
+        assert len(reports) == 2
+        assert sorted(written) == sorted(map(str, [*snapshots, *reports]))
+        assert snapshots[0].name.startswith(f"{os.getpid()}-")
+        assert tracemalloc.Snapshot.load(str(snapshots[0])).traces is not None
+
+    def test_keeps_tracing_started_elsewhere(self, tmp_path, tracing):
+        """Test tracing started by someone else is left running."""
+        MemoryTracer(str(tmp_path), signal.SIGURG, interval=0.01, count=2).trace()
+        assert tracemalloc.is_tracing()
+
+    def test_trace_on_signal(self, tmp_path):
+        """Test the signal makes the worker take its snapshots."""
+        tracer = MemoryTracer(str(tmp_path), signal.SIGURG, interval=0.01, count=2)
+        previous = signal.getsignal(signal.SIGURG)
+        tracer.install()
+        try:
+            os.kill(os.getpid(), signal.SIGURG)
+            deadline = time.monotonic() + 5
+            while not list(tmp_path.glob("*.txt")):
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+        finally:
+            tracer.uninstall()
+        assert signal.getsignal(signal.SIGURG) == previous
+
+    def test_worker_hooks(self):
+        """Test workers install the tracer and remove it on exit."""
+        hooks = Hooks.for_process({"TRACEMALLOC": True})
+        assert hooks.hooks["worker_ready"][1].__name__ == "install"
+        assert hooks.hooks["worker_exit"][0].__name__ == "uninstall"
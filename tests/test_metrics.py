@@ -0,0 +1,104 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from django_prodserver import gc_tuning
+from django_prodserver.backends.base import BaseServerBackend
+from django_prodserver.hooks import Hooks
+from django_prodserver.metrics import Metrics
+
+
+@pytest.fixture
+def metrics(tmp_path):
+    """Metrics written to a temporary directory."""
+    return Metrics(str(tmp_path), server_name="web")
+
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", ""])
+    process.wait()
+    return process.pid
+
+
+class TestMetrics:
+    """Tests for exporting the metrics of the workers."""
+
+    def test_not_configured(self):
+        """Test there is nothing to export without the METRICS key."""
+        assert Metrics.from_config(None) is None
+
+    def test_from_config(self):
+        """Test the directory defaults to one named after the process."""
+        metrics = Metrics.from_config(True, "web")
+        assert metrics.directory.endswith("prodserver-metrics-web")
+        assert metrics.interval == 60
+        metrics = Metrics.from_config({"DIR": "/run/metrics", "INTERVAL": "5"})
+        assert metrics.directory == "/run/metrics"
+        assert metrics.interval == 5
+
+    @pytest.mark.parametrize("config", ["yes", {"INTERVAL": "often"}, {"INTERVAL": 0}])
+    def test_invalid(self, config):
+        """Test invalid METRICS keys are configuration errors."""
+        with pytest.raises(ImproperlyConfigured, match="METRICS"):
+            Metrics.from_config(config)
+
+    def test_worker_lifecycle(self, metrics, tmp_path):
+        """Test workers write their snapshot until they exit."""
+        metrics.start_worker()
+        try:
+            snapshot = json.loads((tmp_path / f"{os.getpid()}.json").read_text())
+            assert snapshot["server_name"] == "web"
+            assert set(snapshot["gc"]) == {"0", "1", "2"}
+            assert [s["pid"] for s in metrics.snapshots()] == [os.getpid()]
+        finally:
+            metrics.stop_worker()
+        assert metrics.snapshots() == []
+
+    def test_dead_workers_are_dropped(self, metrics, tmp_path):
+        """Test the snapshots of workers which died are removed."""
+        stale = tmp_path / f"{_dead_pid()}.json"
+        stale.write_text("{}")
+        (tmp_path / "notes.txt").write_text("")
+        assert metrics.snapshots() == []
+        assert not stale.exists()
+
+    def test_missing_directory(self, tmp_path):
+        """Test no worker has written metrics yet."""
+        assert Metrics(str(tmp_path / "missing")).snapshots() == []
+
+    def test_render(self, metrics):
+        """Test the snapshots are rendered in the Prometheus text format."""
+        metrics.write_snapshot()
+        gc_tuning.pauses.callback("start", {"generation": 0})
+        gc_tuning.pauses.callback("stop", {"generation": 0, "collected": 3})
+        metrics.write_snapshot()
+        text = metrics.render()
+        labels = f'server="web",pid="{os.getpid()}"'
+        assert "# TYPE prodserver_gc_pause_seconds histogram" in text
+        assert text.count("# TYPE prodserver_gc_pause_seconds ") == 1
+        assert (
+            f'prodserver_gc_pause_seconds_bucket{{{labels},generation="0",le="+Inf"}}'
+            in text
+        )
+        assert f"prodserver_allocated_blocks{{{labels}}}" in text
+        assert "# TYPE prodserver_requests_in_flight gauge" in text
+        assert text.endswith("\n")
+        metrics.stop_worker()
+
+    def test_served_on_the_readiness_port(self, tmp_path):
+        """Test the readiness side-port serves the metrics of the workers."""
+        backend = BaseServerBackend(METRICS={"DIR": str(tmp_path)})
+        status, body = backend.readiness.http_response("/metrics")
+        assert status == 200
+        assert body == b"\n"
+        assert BaseServerBackend().readiness.http_response("/metrics")[0] == 503
+
+    def test_worker_hooks(self):
+        """Test workers export their metrics once they record their pauses."""
+        hooks = Hooks.for_process({"METRICS": True})
+        assert hooks.hooks["worker_ready"][1].__name__ == "start_worker"
+        assert hooks.hooks["worker_exit"][0].__name__ == "stop_worker"
@@ -0,0 +1,122 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from django_prodserver import precompress as precompress_module
+from django_prodserver.precompress import (
+    MANIFEST_NAME,
+    PrecompressResult,
+    precompress,
+    should_compress,
+)
+
+
+@pytest.fixture
+def static_root(tmp_path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "site.css").write_text("body { color: red; }\n" * 100)
+    (tmp_path / "app.js").write_text("console.log('hello');\n" * 100)
+    (tmp_path / "tiny.txt").write_text("small")
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG" * 200)
+    return tmp_path
+
+
+@pytest.fixture(params=[["gzip"], ["br", "gzip"]], ids=["gzip", "brotli"])
+def wanted(request, monkeypatch):
+    if "br" in request.param:
+        pytest.importorskip("brotli")
+    else:
+        monkeypatch.setattr(precompress_module, "brotli", None)
+    return request.param
+
+
+class TestShouldCompress:
+    """Tests for picking the files worth compressing."""
+
+    def test_text_file(self, static_root):
+        """Test text assets are compressed."""
+        assert should_compress(str(static_root / "app.js")) is True
+
+    def test_small_file(self, static_root):
+        """Test files below the size threshold are skipped."""
+        assert should_compress(str(static_root / "tiny.txt")) is False
+
+    def test_compressed_format(self, static_root):
+        """Test already compressed formats are skipped."""
+        assert should_compress(str(static_root / "logo.png")) is False
+
+    def test_manifest(self, static_root):
+        """Test the manifest itself is never compressed."""
+        (static_root / MANIFEST_NAME).write_text("{}" * 500)
+        assert should_compress(str(static_root / MANIFEST_NAME)) is False
+
+
+class TestPrecompress:
+    """Tests for the precompress pipeline."""
+
+    def test_writes_siblings(self, static_root, wanted):
+        """Test every compressible file gets a sibling per encoding."""
+        result = precompress(str(static_root), workers=1)
+        assert sorted(result.compressed) == ["app.js", "css/site.css"]
+        assert result.ignored == 2
+        for name in ("app.js", "css/site.css"):
+            original = (static_root / name).read_bytes()
+            assert gzip.decompress((static_root / f"{name}.gz").read_bytes()) == (
+                original
+            )
+            assert (static_root / f"{name}.br").exists() == ("br" in wanted)
+        assert not (static_root / "logo.png.gz").exists()
+
+    def test_process_pool(self, static_root, wanted):
+        """Test files are compressed in a process pool."""
+        result = precompress(str(static_root), workers=2)
+        assert sorted(result.compressed) == ["app.js", "css/site.css"]
+        assert (static_root / "app.js.gz").exists()
+
+    def test_unchanged_files_are_skipped(self, static_root, wanted):
+        """Test a second run only recompresses changed files."""
+        precompress(str(static_root), workers=1)
+        (static_root / "app.js").write_text("let changed = true;\n" * 100)
+        result = precompress(str(static_root), workers=1)
+        assert result.compressed == ["app.js"]
+        assert result.unchanged == 1
+        assert gzip.decompress((static_root / "app.js.gz").read_bytes()) == (
+            b"let changed = true;\n" * 100
+        )
+
+    def test_missing_sibling_is_rewritten(self, static_root, wanted):
+        """Test a deleted sibling is recreated even if the source is unchanged."""
+        precompress(str(static_root), workers=1)
+        (static_root / "app.js.gz").unlink()
+        result = precompress(str(static_root), workers=1)
+        assert result.compressed == ["app.js"]
+        assert (static_root / "app.js.gz").exists()
+
+    def test_incompressible_file(self, static_root, wanted):
+        """Test files that barely shrink get no sibling and stay unchanged."""
+        (static_root / "random.bin").write_bytes(os.urandom(1024))
+        precompress(str(static_root), workers=1)
+        assert not (static_root / "random.bin.gz").exists()
+        result = precompress(str(static_root), workers=1)
+        assert "random.bin" not in result.compressed
+
+    def test_manifest_content(self, static_root, wanted):
+        """Test the manifest records hashes and the variants written."""
+        precompress(str(static_root), workers=1)
+        manifest = json.loads((static_root / MANIFEST_NAME).read_text())
+        assert set(manifest) == {"app.js", "css/site.css"}
+        assert manifest["app.js"]["variants"] == wanted
+        assert len(manifest["app.js"]["sha256"]) == 64
+
+    def test_corrupt_manifest(self, static_root, wanted):
+        """Test an unreadable manifest triggers a full run."""
+        (static_root / MANIFEST_NAME).write_text("not json")
+        result = precompress(str(static_root), workers=1)
+        assert len(result.compressed) == 2
+
+    def test_result_summary(self):
+        """Test the summary line printed by the command."""
+        result = PrecompressResult(compressed=["a.js"], unchanged=2, ignored=3)
+        assert str(result) == "1 file(s) compressed, 2 unchanged, 3 ignored"
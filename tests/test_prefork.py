@@ -0,0 +1,143 @@
+import os
+import sys
+import time
+
+import pytest
+
+from django_prodserver.prefork import PreforkSupervisor
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+
+
+def _sleep_forever(worker_id):
+    time.sleep(60)
+
+
+def _exit_immediately(worker_id):
+    return
+
+
+def _wait_for_exit(pid, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        waited, status = os.waitpid(pid, os.WNOHANG)
+        if waited:
+            return os.waitstatus_to_exitcode(status)
+        time.sleep(0.01)
+    raise AssertionError(f"pid {pid} did not exit")
+
+
+class TestPreforkSupervisor:
+    """Tests for PreforkSupervisor."""
+
+    def test_requires_a_process(self):
+        """Test at least one process is required."""
+        with pytest.raises(ValueError, match="at least one process"):
+            PreforkSupervisor(_sleep_forever, 0)
+
+    def test_spawn_and_stop(self):
+        """Test workers are forked and stopped."""
+        supervisor = PreforkSupervisor(_sleep_forever, 2, graceful_timeout=5)
+        pids = [supervisor.spawn(worker_id) for worker_id in range(2)]
+        assert supervisor.workers == {pids[0]: 0, pids[1]: 1}
+
+        supervisor.stop()
+
+        assert supervisor.workers == {}
+        for pid in pids:
+            with pytest.raises(ChildProcessError):
+                os.waitpid(pid, os.WNOHANG)
+
+    def test_target_exit_code(self):
+        """Test a worker returning from its target exits cleanly."""
+        supervisor = PreforkSupervisor(_exit_immediately, 1)
+        pid = supervisor.spawn(0)
+        assert _wait_for_exit(pid) == 0
+
+    def test_reap_respawns_exited_workers(self):
+        """Test workers that exit are replaced under the same worker id."""
+        supervisor = PreforkSupervisor(_sleep_forever, 1, graceful_timeout=5)
+        pid = supervisor.spawn(0)
+        os.kill(pid, 9)
+        # wait for the worker to die without reaping it
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            supervisor._spawned_at[0] = 0
+            supervisor.reap(respawn=True)
+            if pid not in supervisor.workers:
+                break
+            time.sleep(0.01)
+        try:
+            assert list(supervisor.workers.values()) == [0]
+            assert pid not in supervisor.workers
+        finally:
+            supervisor.stop()
+
+    def test_graceful_restart_replaces_every_worker(self):
+        """Test a graceful restart swaps each worker for a new one."""
+        supervisor = PreforkSupervisor(_sleep_forever, 2, graceful_timeout=5)
+        old_pids = {supervisor.spawn(worker_id) for worker_id in range(2)}
+        try:
+            supervisor.graceful_restart()
+            assert sorted(supervisor.workers.values()) == [0, 1]
+            assert not old_pids & set(supervisor.workers)
+        finally:
+            supervisor.stop()
+
+
+def _parent_pid(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        return int(f.read().rsplit(")", 1)[1].split()[1])
+
+
+STATE = {"generation": "pristine"}
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="requires Linux")
+class TestZygote:
+    """Tests for workers forked by the zygote."""
+
+    def test_workers_are_forked_from_the_zygote(self, tmp_path):
+        """Test workers start from the zygote's state and are our children."""
+
+        def record_state(worker_id):
+            # written aside then renamed, so the file is never seen empty
+            staging = tmp_path.parent / f"{tmp_path.name}-{worker_id}"
+            staging.write_text(STATE["generation"])
+            os.replace(staging, tmp_path / str(worker_id))
+            time.sleep(60)
+
+        supervisor = PreforkSupervisor(record_state, 2, graceful_timeout=5, zygote=True)
+        assert supervisor.start_zygote()
+        STATE["generation"] = "drifted"
+        try:
+            pids = [supervisor.spawn(worker_id) for worker_id in range(2)]
+            for pid in pids:
+                assert _parent_pid(pid) == os.getpid()
+            deadline = time.monotonic() + 5
+            while len(list(tmp_path.iterdir())) < 2:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+            assert (tmp_path / "0").read_text() == "pristine"
+            assert (tmp_path / "1").read_text() == "pristine"
+        finally:
+            STATE["generation"] = "pristine"
+            zygote_pid = supervisor.zygote.pid
+            supervisor.stop()
+        assert supervisor.workers == {}
+        assert supervisor.zygote is None
+        for pid in [*pids, zygote_pid]:
+            with pytest.raises(ChildProcessError):
+                os.waitpid(pid, os.WNOHANG)
+
+    def test_falls_back_when_the_zygote_dies(self):
+        """Test workers are forked directly once the zygote is gone."""
+        supervisor = PreforkSupervisor(_sleep_forever, 1, graceful_timeout=5)
+        supervisor.start_zygote()
+        os.kill(supervisor.zygote.pid, 9)
+        try:
+            pid = supervisor.spawn(0)
+            assert supervisor.zygote is None
+            assert supervisor.workers == {pid: 0}
+        finally:
+            supervisor.stop()
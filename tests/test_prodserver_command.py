@@ -1,4 +1,8 @@
+import json
+import os
+import tracemalloc
 from io import StringIO
+from tempfile import TemporaryDirectory
 from unittest.mock import MagicMock, Mock, patch
 
 import pytest
@@ -11,6 +15,7 @@ from django_prodserver.management.commands.prodserver import Command
 from django_prodserver.management.commands.prodserver import (
     Command as ProdServerCommand,
 )
+from django_prodserver.startup import StartupProfileFailure
 
 
 class TestProdserverCommand(TestCase):
@@ -477,3 +482,298 @@ class TestProdserverCommand(TestCase):
         assert "Configure your servers before running this command" in str(
             exc_info.value
         )
+
+
+class TestProdserverWarmup(TestCase):
+    """Tests for the warmup step run before a server starts."""
+
+    @override_settings(
+        PRODUCTION_PROCESSES={
+            "web": {"BACKEND": "django_prodserver.backends.gunicorn.GunicornServer"}
+        }
+    )
+    @patch("django_prodserver.management.commands.prodserver.import_string")
+    def test_warmup_runs_before_start(self, mock_import_string):
+        """Test the backend is warmed up before it binds its port."""
+        manager = Mock()
+        manager.prep_server_args.return_value = []
+        mock_import_string.return_value = Mock(return_value=manager)
+
+        command = Command(stdout=StringIO())
+        command.start_server("web")
+
+        called = [name for name, _, _ in manager.mock_calls]
+        assert called.index("warmup") < called.index("start_server")
+
+    @override_settings(
+        PRODUCTION_PROCESSES={
+            "web": {"BACKEND": "django_prodserver.backends.gunicorn.GunicornServer"}
+        }
+    )
+    @patch("django_prodserver.management.commands.prodserver.import_string")
+    def test_warmup_failure_does_not_start(self, mock_import_string):
+        """Test a failing warmup stops the server from starting."""
+        from django_prodserver.utils import WarmupFailure
+
+        backend = Mock()
+        backend.warmup.side_effect = WarmupFailure("responded with a 500")
+        mock_import_string.return_value = Mock(return_value=backend)
+
+        command = Command(stdout=StringIO())
+        with pytest.raises(CommandError, match="Warmup failed for server named web"):
+            command.start_server("web")
+        backend.start_server.assert_not_called()
+
+
+class TestProdserverPrecompress(TestCase):
+    """Tests for the --precompress option."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.command = Command()
+        self.command.stdout = StringIO()
+        self.command.stderr = StringIO()
+
+    @override_settings(STATIC_ROOT="/srv/static")
+    @patch("django_prodserver.management.commands.prodserver.precompress")
+    def test_precompress_option(self, mock_precompress):
+        """Test --precompress compresses STATIC_ROOT instead of starting a server."""
+        mock_precompress.return_value = "2 file(s) compressed"
+        with patch.object(self.command, "start_server") as mock_start:
+            self.command.run_from_argv(["manage.py", "prodserver", "--precompress"])
+        mock_precompress.assert_called_once_with("/srv/static")
+        mock_start.assert_not_called()
+        assert "2 file(s) compressed" in self.command.stdout.getvalue()
+
+    @override_settings(STATIC_ROOT=None)
+    @patch("sys.exit")
+    def test_precompress_without_static_root(self, mock_exit):
+        """Test --precompress reports a missing STATIC_ROOT."""
+        self.command.run_from_argv(["manage.py", "prodserver", "--precompress"])
+        assert "STATIC_ROOT must be set" in self.command.stderr.getvalue()
+        mock_exit.assert_called_once_with(1)
+
+
+class TestProdserverProfileStartup(TestCase):
+    """Tests for the --profile-startup option."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.command = Command()
+        self.command.stdout = StringIO()
+        self.command.stderr = StringIO()
+
+    @override_settings(
+        PRODUCTION_PROCESSES={
+            "web": {"BACKEND": "django_prodserver.backends.gunicorn.GunicornServer"}
+        }
+    )
+    @patch("django_prodserver.management.commands.prodserver.profile_startup")
+    def test_profile_startup_option(self, mock_profile):
+        """Test --profile-startup prints the report instead of starting a server."""
+        mock_profile.return_value.report.return_value = "Startup profile of web"
+        mock_profile.return_value.to_dict.return_value = {"server_name": "web"}
+        with (
+            patch.object(self.command, "start_server") as mock_start,
+            TemporaryDirectory() as directory,
+        ):
+            output = os.path.join(directory, "profile.json")
+            self.command.run_from_argv(
+                [
+                    "manage.py",
+                    "prodserver",
+                    "web",
+                    "--profile-startup",
+                    f"--profile-output={output}",
+                ]
+            )
+            with open(output) as f:
+                assert json.load(f) == {"server_name": "web"}
+        mock_profile.assert_called_once_with("web")
+        mock_start.assert_not_called()
+        assert "Startup profile of web" in self.command.stdout.getvalue()
+
+    @override_settings(
+        PRODUCTION_PROCESSES={
+            "web": {"BACKEND": "django_prodserver.backends.gunicorn.GunicornServer"}
+        }
+    )
+    @patch("sys.exit")
+    @patch(
+        "django_prodserver.management.commands.prodserver.profile_startup",
+        side_effect=StartupProfileFailure("KeyError: 'web'"),
+    )
+    def test_profile_startup_failure(self, mock_profile, mock_exit):
+        """Test a process failing to boot is reported."""
+        self.command.run_from_argv(["manage.py", "prodserver", "--profile-startup"])
+        assert "KeyError: 'web'" in self.command.stderr.getvalue()
+        mock_exit.assert_called_once_with(1)
+
+
+class TestProdserverProfileReport(TestCase):
+    """Tests for the --profile-report option."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.command = Command()
+        self.command.stdout = StringIO()
+        self.command.stderr = StringIO()
+
+    def test_profile_report_option(self):
+        """Test --profile-report merges the continuous profiles of the workers."""
+        with TemporaryDirectory() as directory:
+            os.makedirs(os.path.join(directory, "continuous"))
+            path = os.path.join(directory, "continuous", "20260101T000000-1.collapsed")
+            with open(path, "w") as f:
+                f.write("blog:detail;main;render 3\n")
+            output = os.path.join(directory, "merged.collapsed")
+            processes = {
+                "web": {
+                    "BACKEND": "django_prodserver.backends.gunicorn.GunicornServer",
+                    "SAMPLING": {"CONTINUOUS": 10, "DIR": directory},
+                }
+            }
+            with (
+                override_settings(PRODUCTION_PROCESSES=processes),
+                patch.object(self.command, "start_server") as mock_start,
+            ):
+                self.command.run_from_argv(
+                    [
+                        "manage.py",
+                        "prodserver",
+                        "web",
+                        "--profile-report",
+                        f"--profile-output={output}",
+                    ]
+                )
+            with open(output) as f:
+                assert f.read() == "blog:detail;main;render 3\n"
+        mock_start.assert_not_called()
+        assert "100.00%  blog:detail" in self.command.stdout.getvalue()
+
+    @override_settings(
+        PRODUCTION_PROCESSES={
+            "web": {"BACKEND": "django_prodserver.backends.gunicorn.GunicornServer"}
+        }
+    )
+    @patch("sys.exit")
+    def test_profile_report_without_sampling(self, mock_exit):
+        """Test the report requires the SAMPLING key."""
+        self.command.run_from_argv(["manage.py", "prodserver", "--profile-report"])
+        assert "SAMPLING is not configured" in self.command.stderr.getvalue()
+        mock_exit.assert_called_once_with(1)
+
+
+class TestProdserverMemdiff(TestCase):
+    """Tests for the --memdiff option."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.command = Command()
+        self.command.stdout = StringIO()
+        self.command.stderr = StringIO()
+
+    def test_memdiff_option(self):
+        """Test --memdiff reports the sites that grew between two snapshots."""
+        tracemalloc.start()
+        try:
+            with TemporaryDirectory() as directory:
+                old = os.path.join(directory, "1-old.tracemalloc")
+                new = os.path.join(directory, "2-new.tracemalloc")
+                tracemalloc.take_snapshot().dump(old)
+                allocated = [bytearray(1024) for _ in range(50)]
+                tracemalloc.take_snapshot().dump(new)
+                with patch.object(self.command, "start_server") as mock_start:
+                    self.command.run_from_argv(
+                        ["manage.py", "prodserver", "--memdiff", old, new]
+                    )
+        finally:
+            tracemalloc.stop()
+        assert len(allocated) == 50
+        mock_start.assert_not_called()
+        output = self.command.stdout.getvalue()
+        assert "Allocations changed by" in output
+        assert "test_prodserver_command.py" in output
+
+    @patch("sys.exit")
+    def test_memdiff_missing_snapshot(self, mock_exit):
+        """Test snapshots which cannot be loaded are reported."""
+        self.command.run_from_argv(
+            ["manage.py", "prodserver", "--memdiff", "/missing/a", "/missing/b"]
+        )
+        assert "Cannot load the memory snapshots" in self.command.stderr.getvalue()
+        mock_exit.assert_called_once_with(1)
+
+    def test_memdiff_needs_two_snapshots(self):
+        """Test anything but an old and a new snapshot is refused."""
+        with pytest.raises(CommandError, match="OLD and NEW"):
+            self.command.memdiff(["/tmp/only.tracemalloc"])  # noqa: S108
+
+
+class TestProdserverPrepare(TestCase):
+    """Tests for the --prepare option."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.command = Command()
+        self.command.stdout = StringIO()
+        self.command.stderr = StringIO()
+
+    @override_settings(PRODUCTION_BYTECODE_CACHE="/srv/pycache")
+    @patch("django_prodserver.management.commands.prodserver.compile_bytecode")
+    def test_prepare_option(self, mock_compile):
+        """Test --prepare compiles bytecode instead of starting a server."""
+        mock_compile.return_value = "12 module(s) compiled from 2 path(s)"
+        with patch.object(self.command, "start_server") as mock_start:
+            self.command.run_from_argv(["manage.py", "prodserver", "--prepare"])
+        mock_compile.assert_called_once_with("/srv/pycache")
+        mock_start.assert_not_called()
+        assert "12 module(s) compiled" in self.command.stdout.getvalue()
+
+    @patch("sys.exit")
+    def test_prepare_without_cache_setting(self, mock_exit):
+        """Test --prepare reports a missing PRODUCTION_BYTECODE_CACHE."""
+        self.command.run_from_argv(["manage.py", "prodserver", "--prepare"])
+        assert "PRODUCTION_BYTECODE_CACHE must be set" in self.command.stderr.getvalue()
+        mock_exit.assert_called_once_with(1)
+
+    @override_settings(
+        PRODUCTION_BYTECODE_CACHE="/srv/pycache",
+        PRODUCTION_PROCESSES={
+            "web": {"BACKEND": "django_prodserver.backends.gunicorn.GunicornServer"}
+        },
+    )
+    @patch("django_prodserver.management.commands.prodserver.import_string")
+    @patch("django_prodserver.management.commands.prodserver.use_bytecode_cache")
+    def test_start_server_uses_bytecode_cache(self, mock_use, mock_import_string):
+        """Test the server is pointed at the bytecode cache."""
+        self.command.start_server("web")
+        mock_use.assert_called_once_with("/srv/pycache")
+
+
+@override_settings(
+    PRODUCTION_PROCESSES={
+        "web": {"BACKEND": "django_prodserver.backends.gunicorn.GunicornServer"}
+    }
+)
+@patch("django_prodserver.management.commands.prodserver.import_string")
+@patch("django_prodserver.management.commands.prodserver.run_cached")
+class TestProdserverSystemChecks(TestCase):
+    """Tests for the system checks run before starting a server."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.command = Command()
+        self.command.stdout = StringIO()
+        self.command.stderr = StringIO()
+
+    def test_checks_run_before_start(self, mock_run_cached, mock_import_string):
+        """Test the cached checks run, forced with --force-checks."""
+        self.command.run_from_argv(["manage.py", "prodserver", "--force-checks"])
+        mock_run_cached.assert_called_once_with(self.command.check, force=True)
+
+    def test_skip_checks(self, mock_run_cached, mock_import_string):
+        """Test --skip-checks starts the server without checking."""
+        self.command.run_from_argv(["manage.py", "prodserver", "--skip-checks"])
+        mock_run_cached.assert_not_called()
+        mock_import_string.return_value.assert_called_once()
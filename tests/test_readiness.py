@@ -0,0 +1,67 @@
+import socket
+import urllib.error
+import urllib.request
+
+import pytest
+
+from django_prodserver.readiness import ReadinessProbe
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestReadinessProbe:
+    """Tests for the ReadinessProbe class."""
+
+    def test_from_config_empty(self):
+        """Test an unconfigured probe exposes nothing."""
+        probe = ReadinessProbe.from_config(None)
+        assert probe.file is None
+        assert probe.port is None
+
+    def test_from_config(self):
+        """Test building a probe from a READINESS mapping."""
+        probe = ReadinessProbe.from_config(
+            {"FILE": "/tmp/ready", "PORT": "8081", "HOST": "127.0.0.1"}  # noqa: S108
+        )
+        assert probe.file == "/tmp/ready"  # noqa: S108
+        assert probe.port == 8081
+        assert probe.host == "127.0.0.1"
+
+    def test_file_lifecycle(self, tmp_path):
+        """Test the readiness file follows the probe state."""
+        ready_file = tmp_path / "ready"
+        probe = ReadinessProbe(file=str(ready_file))
+        probe.start()
+        assert not ready_file.exists()
+        probe.mark_ready()
+        assert ready_file.exists()
+        probe.mark_not_ready()
+        assert not ready_file.exists()
+
+    def test_http_response(self):
+        """Test the side-port answers 503 until ready."""
+        probe = ReadinessProbe()
+        assert probe.http_response("/")[0] == 503
+        probe.mark_ready()
+        assert probe.http_response("/") == (200, b"ready\n")
+
+    def test_http_side_port(self):
+        """Test the HTTP side-port serves the probe state."""
+        port = _free_port()
+        probe = ReadinessProbe(port=port, host="127.0.0.1")
+        probe.start()
+        try:
+            url = f"http://127.0.0.1:{port}/"
+            with pytest.raises(urllib.error.HTTPError) as exc_info:
+                urllib.request.urlopen(url, timeout=5)
+            assert exc_info.value.code == 503
+            exc_info.value.close()
+            probe.mark_ready()
+            with urllib.request.urlopen(url, timeout=5) as response:
+                assert response.status == 200
+        finally:
+            probe.stop()
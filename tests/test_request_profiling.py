@@ -0,0 +1,179 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+
+from django_prodserver.backends.base import BaseServerBackend
+from django_prodserver.request_profiling import (
+    ProfiledWSGI,
+    RequestProfile,
+    RequestProfiler,
+    function_name,
+)
+from django_prodserver.wrappers import wrap_wsgi_application
+
+
+def _slow_app(environ, start_response):
+    sorted(range(100000), key=lambda value: -value)
+    return [b"ok"]
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    """Request profiler writing to a temporary directory, never picking at random."""
+    return RequestProfiler(str(tmp_path), rate=0, keep=2)
+
+
+class TestRequestProfiler:
+    """Tests for the REQUEST_PROFILING key of a process."""
+
+    def test_not_configured(self):
+        """Test there is no profiler without the REQUEST_PROFILING key."""
+        assert RequestProfiler.from_config(None) is None
+
+    def test_from_config(self):
+        """Test the defaults and the configured values."""
+        profiler = RequestProfiler.from_config(True, "web")
+        assert profiler.rate == 0.01
+        assert profiler.directory.endswith("prodserver-requests-web")
+        profiler = RequestProfiler.from_config(
+            {"RATE": "0", "PATHS": "^/api/", "HEADER": "X-Profile", "TOP": "5"}
+        )
+        assert profiler.rate == 0
+        assert profiler.header == "HTTP_X_PROFILE"
+        assert profiler.top == 5
+        assert [pattern.pattern for pattern in profiler.paths] == ["^/api/"]
+
+    @pytest.mark.parametrize("config", [{"PATHS": ["^/api/"]}, {"HEADER": "X-Profile"}])
+    def test_allowlist_disables_random_sampling(self, config):
+        """Test RATE defaults to 0 when PATHS or HEADER pick the requests."""
+        assert RequestProfiler.from_config(config).rate == 0
+        assert RequestProfiler.from_config({**config, "RATE": 0.1}).rate == 0.1
+
+    @pytest.mark.parametrize(
+        "config", ["yes", {"RATE": 2}, {"KEEP": 0}, {"TOP": "many"}, {"PATHS": ["("]}]
+    )
+    def test_invalid(self, config):
+        """Test invalid REQUEST_PROFILING keys are configuration errors."""
+        with pytest.raises(ImproperlyConfigured, match="REQUEST_PROFILING"):
+            RequestProfiler.from_config(config)
+
+    def test_should_profile(self, tmp_path):
+        """Test requests are picked by header, token, path or at random."""
+        profiler = RequestProfiler(
+            str(tmp_path),
+            rate=0,
+            paths=["^/api/"],
+            header="X-Profile",
+            token="s3",  # noqa: S106
+        )
+        assert profiler.should_profile({"PATH_INFO": "/api/users/"})
+        assert profiler.should_profile({"PATH_INFO": "/", "HTTP_X_PROFILE": "s3"})
+        assert not profiler.should_profile({"PATH_INFO": "/", "HTTP_X_PROFILE": "1"})
+        assert not profiler.should_profile({"PATH_INFO": "/", "HTTP_X_PROFILE": "é"})
+        assert not profiler.should_profile({"PATH_INFO": "/"})
+        assert RequestProfiler(str(tmp_path), rate=1).should_profile({})
+
+    def test_function_name(self):
+        """Test built-in functions have no location."""
+        assert function_name("~", 0, "<built-in method sorted>") == (
+            "<built-in method sorted>"
+        )
+        assert function_name("app.py", 3, "view") == "view (app.py:3)"
+
+    def test_render(self, profiler):
+        """Test the profiles of the live workers are reported by view."""
+        for seconds in (0.1, 0.3):
+            profiler.record(
+                RequestProfile(
+                    view="blog:detail",
+                    method="GET",
+                    path="/blog/1/",
+                    seconds=seconds,
+                    functions=[{"function": "render", "seconds": seconds}],
+                )
+            )
+        text = profiler.render()
+        assert text.startswith("Request profiles: 2 from 1 worker(s)")
+        assert "blog:detail: 2 request(s), 200.0ms average, slowest 300.0ms" in text
+        assert "    400.0ms  render" in text
+
+    def test_served_on_the_readiness_port(self, tmp_path):
+        """Test the readiness side-port serves the request profiles."""
+        backend = BaseServerBackend(
+            REQUEST_PROFILING={"DIR": str(tmp_path), "PAGE": True}
+        )
+        status, body = backend.readiness.http_response("/profiles")
+        assert status == 200
+        assert body.startswith(b"Request profiles: 0")
+
+    def test_page_is_opt_in(self, tmp_path):
+        """Test the profiles are not served unless PAGE is set."""
+        backend = BaseServerBackend(REQUEST_PROFILING={"DIR": str(tmp_path)})
+        assert "/profiles" not in backend.readiness.pages
+
+
+class TestProfiledWSGI:
+    """Tests for profiling the requests of a WSGI application."""
+
+    def test_profiles_picked_requests(self, profiler):
+        """Test picked requests are profiled and kept up to KEEP."""
+        application = ProfiledWSGI(_slow_app, profiler)
+        environ = {"PATH_INFO": "/admin/", "REQUEST_METHOD": "GET"}
+        with patch.object(profiler, "should_profile", return_value=True):
+            for _ in range(3):
+                assert application(environ, None) == [b"ok"]
+        assert len(profiler.profiles) == 2
+        profile = profiler.profiles[-1]
+        assert (profile.view, profile.method, profile.path) == (
+            "admin:index",
+            "GET",
+            "/admin/",
+        )
+        assert profile.seconds > 0
+        assert len(profile.functions) <= profiler.top
+        assert any("_slow_app" in f["function"] for f in profile.functions)
+        assert os.path.exists(os.path.join(profiler.directory, f"{os.getpid()}.json"))
+
+    def test_other_requests_are_not_profiled(self, profiler):
+        """Test requests which are not picked run as usual."""
+        assert ProfiledWSGI(_slow_app, profiler)({"PATH_INFO": "/"}, None) == [b"ok"]
+        assert not profiler.profiles
+
+    def test_one_request_at_a_time(self, profiler):
+        """Test requests arriving while one is profiled are not profiled."""
+        application = ProfiledWSGI(_slow_app, profiler)
+        application._busy.acquire()
+        try:
+            with patch.object(profiler, "should_profile", return_value=True):
+                application({"PATH_INFO": "/"}, None)
+        finally:
+            application._busy.release()
+        assert not profiler.profiles
+
+    @pytest.mark.parametrize("process_wide", [True, False])
+    def test_threaded_workers(self, profiler, process_wide):
+        """Test threaded workers only profile where cProfile sees one thread."""
+        application = ProfiledWSGI(_slow_app, profiler)
+        environ = {"PATH_INFO": "/", "wsgi.multithread": True}
+        with patch("django_prodserver.request_profiling.PROCESS_WIDE", process_wide):
+            with patch.object(profiler, "should_profile", return_value=True):
+                assert application(environ, None) == [b"ok"]
+        assert len(profiler.profiles) == (0 if process_wide else 1)
+
+    @patch.dict("os.environ", {"PRODSERVER_PROCESS": "web"})
+    @override_settings(
+        PRODUCTION_PROCESSES={
+            "web": {
+                "BACKEND": "django_prodserver.backends.gunicorn.GunicornServer",
+                "REQUEST_PROFILING": {"RATE": 0.5},
+            }
+        }
+    )
+    def test_wrapped(self):
+        """Test the application wrapper profiles requests."""
+        application = wrap_wsgi_application(print)
+        assert isinstance(application, ProfiledWSGI)
+        assert application.profiler.directory.endswith("prodserver-requests-web")
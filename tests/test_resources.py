@@ -0,0 +1,90 @@
+from unittest.mock import patch
+
+import pytest
+
+from django_prodserver import resources
+from django_prodserver.resources import available_cpus, memory_limit, parse_size
+
+
+@pytest.fixture
+def cgroup_root(tmp_path):
+    with patch.object(resources, "CGROUP_ROOT", str(tmp_path)):
+        yield tmp_path
+
+
+class TestAvailableCpus:
+    """Tests for available_cpus."""
+
+    @patch("os.sched_getaffinity", return_value=set(range(8)), create=True)
+    def test_no_cgroup_limit(self, mock_affinity, cgroup_root):
+        """Test the affinity mask is used without a cgroup quota."""
+        assert available_cpus() == 8
+
+    @patch("os.sched_getaffinity", return_value=set(range(8)), create=True)
+    def test_cgroup_v2_quota(self, mock_affinity, cgroup_root):
+        """Test a cgroup v2 quota is rounded up to whole cores."""
+        (cgroup_root / "cpu.max").write_text("150000 100000\n")
+        assert available_cpus() == 2
+
+    @patch("os.sched_getaffinity", return_value=set(range(8)), create=True)
+    def test_cgroup_v2_unlimited(self, mock_affinity, cgroup_root):
+        """Test an unlimited cgroup v2 quota is ignored."""
+        (cgroup_root / "cpu.max").write_text("max 100000\n")
+        assert available_cpus() == 8
+
+    @patch("os.sched_getaffinity", return_value=set(range(8)), create=True)
+    def test_cgroup_v1_quota(self, mock_affinity, cgroup_root):
+        """Test a cgroup v1 CFS quota."""
+        (cgroup_root / "cpu").mkdir()
+        (cgroup_root / "cpu" / "cpu.cfs_quota_us").write_text("300000")
+        (cgroup_root / "cpu" / "cpu.cfs_period_us").write_text("100000")
+        assert available_cpus() == 3
+
+    @patch("os.sched_getaffinity", return_value={0, 1}, create=True)
+    def test_affinity_lower_than_quota(self, mock_affinity, cgroup_root):
+        """Test the affinity mask wins when it is lower than the quota."""
+        (cgroup_root / "cpu.max").write_text("400000 100000\n")
+        assert available_cpus() == 2
+
+
+class TestMemoryLimit:
+    """Tests for memory_limit."""
+
+    def test_cgroup_v2_limit(self, cgroup_root):
+        """Test the cgroup v2 memory limit is used."""
+        (cgroup_root / "memory.max").write_text("536870912\n")
+        assert memory_limit() == 536870912
+
+    def test_cgroup_v1_limit(self, cgroup_root):
+        """Test the cgroup v1 memory limit is used."""
+        (cgroup_root / "memory").mkdir()
+        (cgroup_root / "memory" / "memory.limit_in_bytes").write_text("1073741824")
+        assert memory_limit() == 1073741824
+
+    @patch("os.sysconf", side_effect=[4096, 1024])
+    def test_falls_back_to_physical_memory(self, mock_sysconf, cgroup_root):
+        """Test unlimited cgroups fall back to the physical memory."""
+        (cgroup_root / "memory.max").write_text("max\n")
+        assert memory_limit() == 4096 * 1024
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (1024, 1024),
+        ("1024", 1024),
+        ("256KB", 262144),
+        ("1.5M", 1572864),
+        ("2 GiB", 2147483648),
+    ],
+)
+def test_parse_size(value, expected):
+    """Test human readable sizes are converted to bytes."""
+    assert parse_size(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "lots", "12 parsecs"])
+def test_parse_size_invalid(value):
+    """Test invalid sizes raise ValueError."""
+    with pytest.raises(ValueError, match="Invalid size"):
+        parse_size(value)
@@ -0,0 +1,270 @@
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+
+from django_prodserver.hooks import Hooks
+from django_prodserver.sampling import (
+    NO_REQUEST,
+    EndpointsWSGI,
+    ProfileReport,
+    SamplingProfiler,
+    StackSampler,
+    collapse,
+    endpoint_name,
+    endpoints,
+    frame_name,
+    read_collapsed,
+)
+from django_prodserver.wrappers import wrap_wsgi_application
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(signal, "SIGUSR2"), reason="requires SIGUSR2"
+)
+
+
+def _busy(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestCollapse:
+    """Tests for naming the frames of a stack."""
+
+    def test_collapse(self):
+        """Test the stack is listed outermost first."""
+        frame = sys._getframe()
+        stack = collapse(frame).split(";")
+        assert stack[-1] == frame_name(frame)
+        assert "test_collapse" in stack[-1]
+        assert stack[-1].endswith(f"{__file__}:{frame.f_code.co_firstlineno})")
+        assert len(stack) > 1
+
+
+class TestStackSampler:
+    """Tests for sampling the stacks of the threads."""
+
+    def test_samples_other_threads(self):
+        """Test the stacks of the other threads are counted."""
+        stop = threading.Event()
+        thread = threading.Thread(target=_busy, args=(stop,))
+        thread.start()
+        try:
+            sampler = StackSampler(0.001)
+            sampler.run(0.05, threading.Event())
+        finally:
+            stop.set()
+            thread.join()
+        assert sampler.samples > 1
+        assert any("_busy" in stack for stack in sampler.stacks)
+        assert not any("StackSampler.sample" in s for s in sampler.stacks)
+
+    def test_labels(self):
+        """Test stacks start with the label of their thread."""
+        stop = threading.Event()
+        threads = [threading.Thread(target=_busy, args=(stop,)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        try:
+            sampler = StackSampler(0.001, {threads[0].ident: "blog:detail"})
+            sampler.sample()
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        roots = {stack.split(";")[0] for stack in sampler.stacks}
+        assert "blog:detail" in roots
+        assert NO_REQUEST in roots
+
+    def test_write(self, tmp_path):
+        """Test the stacks are written in the collapsed format."""
+        sampler = StackSampler(0.01)
+        sampler.stacks.update({"main;handler": 3, "main;idle": 1})
+        sampler.write(str(tmp_path / "profiles" / "1.collapsed"))
+        assert (tmp_path / "profiles" / "1.collapsed").read_text() == (
+            "main;handler 3\nmain;idle 1\n"
+        )
+
+
+class TestSamplingProfiler:
+    """Tests for the SAMPLING key of a process."""
+
+    def test_not_configured(self):
+        """Test there is no profiler without the SAMPLING key."""
+        assert SamplingProfiler.from_config(None) is None
+
+    def test_from_config(self):
+        """Test the defaults and the configured values."""
+        profiler = SamplingProfiler.from_config(True, "web")
+        assert profiler.signum == signal.SIGUSR2
+        assert profiler.directory.endswith("prodserver-profiles-web")
+        assert (profiler.duration, profiler.interval) == (30, 0.01)
+        assert profiler.continuous is None
+        profiler = SamplingProfiler.from_config(
+            {"SIGNAL": "SIGUSR1", "DURATION": "5", "DIR": "/run/profiles"}
+        )
+        assert profiler.signum == signal.SIGUSR1
+        assert profiler.duration == 5
+        assert profiler.directory == "/run/profiles"
+        profiler = SamplingProfiler.from_config({"CONTINUOUS": True, "DIR": "/p"})
+        assert profiler.continuous == 10
+        assert (profiler.rotate, profiler.retention) == (3600, 7)
+        assert profiler.continuous_directory == os.path.join("/p", "continuous")
+
+    @pytest.mark.parametrize(
+        "config",
+        [
+            "yes",
+            {"SIGNAL": "SIGNOPE"},
+            {"DURATION": "long"},
+            {"INTERVAL": 0},
+            {"CONTINUOUS": "often"},
+            {"CONTINUOUS": 10, "ROTATE": 0},
+        ],
+    )
+    def test_invalid(self, config):
+        """Test invalid SAMPLING keys are configuration errors."""
+        with pytest.raises(ImproperlyConfigured, match="SAMPLING"):
+            SamplingProfiler.from_config(config)
+
+    def test_profile_on_signal(self, tmp_path):
+        """Test the signal makes the worker write its sampled stacks."""
+        profiler = SamplingProfiler(str(tmp_path), signal.SIGUSR2, 0.05, 0.001)
+        previous = signal.getsignal(signal.SIGUSR2)
+        profiler.install()
+        try:
+            os.kill(os.getpid(), signal.SIGUSR2)
+            deadline = time.monotonic() + 5
+            while not list(tmp_path.glob("*.collapsed")):
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+        finally:
+            profiler.uninstall()
+        assert signal.getsignal(signal.SIGUSR2) == previous
+        assert not profiler._trigger._thread.is_alive()
+        (path,) = tmp_path.glob("*.collapsed")
+        assert path.name.startswith(f"{os.getpid()}-")
+        assert "test_profile_on_signal" in path.read_text()
+
+    def test_not_in_main_thread(self, tmp_path):
+        """Test signal handlers are only installed from the main thread."""
+        profiler = SamplingProfiler(str(tmp_path), signal.SIGUSR2)
+        thread = threading.Thread(target=profiler.install)
+        thread.start()
+        thread.join()
+        assert profiler._trigger._thread is None
+        profiler.uninstall()
+
+    def test_worker_hooks(self):
+        """Test workers install the profiler and remove it on exit."""
+        hooks = Hooks.for_process({"SAMPLING": True})
+        assert hooks.hooks["worker_ready"][1].__name__ == "install"
+        assert hooks.hooks["worker_exit"][0].__name__ == "uninstall"
+
+
+class TestContinuousProfiling:
+    """Tests for sampling workers all the time."""
+
+    def test_endpoint_name(self):
+        """Test requests are named after the view they resolve to."""
+        assert endpoint_name("/admin/") == "admin:index"
+        assert endpoint_name("/missing/") == "(not found)"
+
+    def test_wsgi(self):
+        """Test the thread serving a request is labelled with its view."""
+        seen = []
+
+        def app(environ, start_response):
+            seen.append(endpoints.by_thread.get(threading.get_ident()))
+            return [b""]
+
+        EndpointsWSGI(app)({"PATH_INFO": "/admin/"}, None)
+        assert seen == ["admin:index"]
+        assert threading.get_ident() not in endpoints.by_thread
+
+    @patch.dict("os.environ", {"PRODSERVER_PROCESS": "web"})
+    @override_settings(
+        PRODUCTION_PROCESSES={
+            "web": {
+                "BACKEND": "django_prodserver.backends.gunicorn.GunicornServer",
+                "SAMPLING": {"CONTINUOUS": 10},
+            }
+        }
+    )
+    def test_wrapped_when_continuous(self):
+        """Test the application wrapper labels requests for the profiler."""
+        assert isinstance(wrap_wsgi_application(print), EndpointsWSGI)
+
+    def test_writes_windows(self, tmp_path):
+        """Test workers write the stacks of the current window on exit."""
+        profiler = SamplingProfiler(str(tmp_path), signal.SIGUSR2, continuous=200)
+        thread = threading.current_thread()
+        endpoints.enter("blog:detail")
+        try:
+            profiler.install()
+            try:
+                time.sleep(0.1)
+            finally:
+                profiler.uninstall()
+        finally:
+            endpoints.exit()
+        assert not profiler._continuous_thread.is_alive()
+        (path,) = (tmp_path / "continuous").iterdir()
+        assert path.name.endswith(f"-{os.getpid()}.collapsed")
+        stacks = read_collapsed(str(path))
+        assert any(
+            stack.startswith("blog:detail;") and "test_writes_windows" in stack
+            for stack in stacks
+        )
+        assert thread.ident not in endpoints.by_thread
+
+    def test_remove_expired(self, tmp_path):
+        """Test profiles older than the retention are removed."""
+        profiler = SamplingProfiler(str(tmp_path), signal.SIGUSR2, retention=1)
+        os.makedirs(profiler.continuous_directory)
+        old = tmp_path / "continuous" / "20200101T000000-1.collapsed"
+        new = tmp_path / "continuous" / "20200101T000000-2.collapsed"
+        old.write_text("")
+        new.write_text("")
+        os.utime(old, (time.time() - 2 * 86400,) * 2)
+        profiler.remove_expired()
+        assert not old.exists()
+        assert new.exists()
+
+
+class TestProfileReport:
+    """Tests for merging the continuous profiles."""
+
+    def test_merge(self, tmp_path):
+        """Test the profiles of every worker and window are merged."""
+        (tmp_path / "20260101T000000-1.collapsed").write_text(
+            "blog:detail;main;render 3\n(no request);main;select 5\n"
+        )
+        (tmp_path / "20260101T010000-2.collapsed").write_text(
+            "blog:detail;main;render 1\nblog:list;main;query 1\n"
+        )
+        report = ProfileReport.from_directory(str(tmp_path))
+        assert report.files == 2
+        assert report.samples == 10
+        assert report.endpoints() == Counter(
+            {"blog:detail": 4, "(no request)": 5, "blog:list": 1}
+        )
+        assert report.functions("blog:detail") == Counter({"render": 4})
+        text = report.report()
+        assert "10 samples from 2 files" in text
+        assert " 40.00%  render" in text
+        assert "select" not in text.split("Functions")[1]
+        report.write(str(tmp_path / "merged"))
+        assert read_collapsed(str(tmp_path / "merged")) == report.stacks
+
+    def test_empty(self, tmp_path):
+        """Test there is nothing to report before workers wrote profiles."""
+        report = ProfileReport.from_directory(str(tmp_path / "missing"))
+        assert report.files == 0
@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from django_prodserver.cron import CronSchedule
+from django_prodserver.scheduler import Job, JobScheduler
+
+
+def _job(name="job", schedule="* * * * *", **kwargs):
+    return Job(name, CronSchedule(schedule), [name], **kwargs)
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class TestJob:
+    """Tests for building jobs from JOBS entries."""
+
+    def test_from_config(self):
+        """Test string commands are split like a shell would."""
+        job = Job.from_config(
+            "digest",
+            {
+                "SCHEDULE": "*/15 * * * *",
+                "COMMAND": "send_digest --subject 'Daily news'",
+                "JITTER": "30",
+                "MAX_INSTANCES": 2,
+            },
+        )
+        assert job.argv == ["send_digest", "--subject", "Daily news"]
+        assert job.jitter == 30.0
+        assert job.max_instances == 2
+
+    def test_command_list(self):
+        """Test commands may be given as a list of arguments."""
+        job = Job.from_config("a", {"SCHEDULE": "@daily", "COMMAND": ["check", 1]})
+        assert job.argv == ["check", "1"]
+        assert job.max_instances == 1
+
+    @pytest.mark.parametrize(
+        "config",
+        [
+            {"COMMAND": "check"},
+            {"SCHEDULE": "@daily"},
+            {"SCHEDULE": "@daily", "COMMAND": "check", "JITTER": "soon"},
+            {"SCHEDULE": "@daily", "COMMAND": "check", "MAX_INSTANCES": 0},
+        ],
+    )
+    def test_invalid(self, config):
+        """Test incomplete or invalid jobs are configuration errors."""
+        with pytest.raises(ImproperlyConfigured):
+            Job.from_config("job", config)
+
+
+class TestJobScheduler:
+    """Tests for the heap based job scheduler."""
+
+    def test_run_pending_in_order(self):
+        """Test due jobs start and are scheduled again, returning the next delay."""
+        ran = []
+        scheduler = JobScheduler([], ran.append, executor="thread")
+        scheduler.launch = lambda job: ran.append(job.name) or True
+        start = datetime(2024, 1, 1, 10, 0)
+        scheduler.schedule(_job("hourly", "0 * * * *"), start)
+        scheduler.schedule(_job("minutely"), start)
+
+        delay = scheduler.run_pending(datetime(2024, 1, 1, 10, 1).timestamp())
+        assert ran == ["minutely"]
+        assert delay == 60
+        scheduler.run_pending(datetime(2024, 1, 1, 11, 0).timestamp())
+        assert sorted(ran) == ["hourly", "minutely", "minutely"]
+
+    def test_missed_runs_are_skipped(self):
+        """Test a job overdue by several runs only runs once."""
+        ran = []
+        scheduler = JobScheduler([], ran.append, executor="thread")
+        scheduler.launch = lambda job: ran.append(job.name) or True
+        scheduler.schedule(_job(), datetime(2024, 1, 1, 10, 0))
+        now = datetime(2024, 1, 1, 12, 0, 30).timestamp()
+        delay = scheduler.run_pending(now)
+        assert ran == ["job"]
+        assert delay == 30
+
+    def test_jitter(self):
+        """Test jitter delays the run by up to the configured seconds."""
+        scheduler = JobScheduler([], print, executor="thread")
+        scheduler.schedule(_job(jitter=30), datetime(2024, 1, 1, 10, 0))
+        due = scheduler.queue[0][0]
+        cron_time = datetime(2024, 1, 1, 10, 1).timestamp()
+        assert cron_time <= due <= cron_time + 30
+
+    def test_overlap_protection(self):
+        """Test a job already running max_instances times is skipped."""
+        release = threading.Event()
+        scheduler = JobScheduler([], lambda job: release.wait(5), executor="thread")
+        job = _job(max_instances=2)
+        try:
+            assert scheduler.launch(job)
+            assert scheduler.launch(job)
+            assert not scheduler.launch(job)
+            assert scheduler.running["job"] == 2
+        finally:
+            release.set()
+            scheduler.stop()
+        assert scheduler.running["job"] == 0
+
+    def test_thread_failures_are_contained(self):
+        """Test a failing job releases its slot."""
+        scheduler = JobScheduler([], lambda job: 1 / 0, executor="thread")
+        scheduler.launch(_job())
+        _wait_for(lambda: scheduler.running["job"] == 0)
+        scheduler.stop()
+
+    def test_unknown_executor(self):
+        """Test only the fork and thread executors exist."""
+        with pytest.raises(ValueError, match="executor"):
+            JobScheduler([], print, executor="process")
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+    def test_fork_executor(self, tmp_path):
+        """Test runs happen in children and are collected once finished."""
+        marker = tmp_path / "ran"
+
+        def run_job(job):
+            marker.write_text(str(os.getpid()))
+
+        scheduler = JobScheduler([], run_job)
+        job = _job()
+        assert scheduler.launch(job)
+        assert not scheduler.launch(job)
+        scheduler.stop()
+        assert marker.read_text() != str(os.getpid())
+        assert scheduler.children == {}
+        assert scheduler.running["job"] == 0
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+    def test_stop_kills_after_timeout(self):
+        """Test children outliving the graceful timeout are killed."""
+        scheduler = JobScheduler([], lambda job: time.sleep(30), graceful_timeout=0.1)
+        scheduler.launch(_job())
+        start = time.monotonic()
+        scheduler.stop()
+        assert time.monotonic() - start < 5
+        assert scheduler.children == {}
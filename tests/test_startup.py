@@ -0,0 +1,110 @@
+import json
+import os
+from collections import defaultdict
+from subprocess import CompletedProcess
+from unittest.mock import patch
+
+import pytest
+from django.apps import AppConfig
+from django.test import override_settings
+
+from django_prodserver.startup import (
+    ImportTiming,
+    StartupProfile,
+    StartupProfileFailure,
+    parse_importtime,
+    profile_startup,
+    record_startup,
+    timed_app_configs,
+)
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _json
+import time:      1500 |       1620 |   json
+Some log line
+import time:     30000 |      31620 | shop.models
+"""
+
+
+def test_parse_importtime():
+    """Test the importtime lines are parsed, the rest is ignored."""
+    timings = parse_importtime(IMPORTTIME)
+    assert timings[1] == ImportTiming("json", 0.0015, 0.00162)
+    assert [timing.module for timing in timings] == ["_json", "json", "shop.models"]
+
+
+def test_report_ranks_slowest_first():
+    """Test each section of the report is sorted, slowest first."""
+    profile = StartupProfile(
+        "web",
+        2.5,
+        phases={"django.setup()": 0.5, "warmup": 1.5},
+        apps={"shop": 0.25, "auth": 0.05},
+        imports=parse_importtime(IMPORTTIME),
+    )
+    report = profile.report(limit=2)
+    assert report.index("warmup") < report.index("django.setup()")
+    assert report.index("shop.models") < report.index("json")
+    assert "_json" not in report
+    assert profile.to_dict()["imports"][0]["module"] == "_json"
+
+
+def test_timed_app_configs():
+    """Test creating an app config times its import, models and ready."""
+    timings = defaultdict(float)
+    with timed_app_configs(timings):
+        app_config = AppConfig.create("tests.testapp")
+        app_config.ready()
+    assert list(timings) == ["testapp"]
+    # restored afterwards
+    assert AppConfig.__dict__["create"].__func__.__name__ == "create"
+
+
+@patch("django_prodserver.startup.subprocess.run")
+def test_profile_startup(mock_run):
+    """Test the child's recorded phases are combined with its importtime."""
+
+    def run(command, **kwargs):
+        assert command[1:3] == ["-X", "importtime"]
+        with open(command[-1], "w") as f:
+            json.dump({"phases": {"warmup": 1.0}, "apps": {"shop": 0.5}}, f)
+        return CompletedProcess(command, 0, stderr=IMPORTTIME)
+
+    mock_run.side_effect = run
+    profile = profile_startup("web")
+    assert profile.server_name == "web"
+    assert profile.phases == {"warmup": 1.0}
+    assert len(profile.imports) == 3
+
+
+@patch("django_prodserver.startup.subprocess.run")
+def test_profile_startup_failure(mock_run):
+    """Test the child's errors are reported without the importtime noise."""
+    mock_run.return_value = CompletedProcess(
+        [], 1, stderr=IMPORTTIME + "KeyError: 'web'\n"
+    )
+    with pytest.raises(StartupProfileFailure) as exc_info:
+        profile_startup("web")
+    assert str(exc_info.value) == "Some log line\nKeyError: 'web'"
+
+
+@patch("django.utils.module_loading.import_string")
+def test_record_startup_leaves_readiness_and_hooks_alone(mock_import_string):
+    """Test the backend is booted without the probe and hooks of the live server."""
+    processes = {
+        "web": {
+            "BACKEND": "django_prodserver.backends.gunicorn.GunicornServer",
+            "ARGS": {"bind": "0.0.0.0:8111"},
+            "READINESS": {"FILE": "/run/web.ready", "PORT": 8081},
+            "HOOKS": {"pre_start": "myproject.hooks.announce"},
+        }
+    }
+    with override_settings(PRODUCTION_PROCESSES=processes), patch.dict(os.environ):
+        recorded = record_startup("web")
+    mock_import_string.return_value.assert_called_once_with(
+        BACKEND="django_prodserver.backends.gunicorn.GunicornServer",
+        ARGS={"bind": "0.0.0.0:8111"},
+    )
+    mock_import_string.return_value.return_value.warmup.assert_called_once_with()
+    assert {"django.setup()", "warmup", "backend boot"} <= set(recorded["phases"])
@@ -0,0 +1,229 @@
+import asyncio
+import os
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+
+from django_prodserver.precompress import MANIFEST_NAME
+from django_prodserver.static import (
+    IMMUTABLE_MAX_AGE,
+    StaticFilesASGI,
+    StaticFilesIndex,
+    StaticFilesWSGI,
+)
+
+
+@pytest.fixture
+def static_root(tmp_path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "site.css").write_text("body { color: red; }" * 10)
+    (tmp_path / "css" / "site.css.gz").write_bytes(b"gzipped")
+    (tmp_path / "css" / "site.css.br").write_bytes(b"br")
+    (tmp_path / "app.0123456789ab.js").write_text("console.log('hi');")
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG")
+    return tmp_path
+
+
+@pytest.fixture
+def index(static_root):
+    index = StaticFilesIndex(str(static_root), "/static/", max_age=120)
+    index.build()
+    return index
+
+
+def fallback_app(environ, start_response):
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [b"django"]
+
+
+async def fallback_asgi(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"django"})
+
+
+def call_wsgi(app, path, method="GET", **headers):
+    environ = {"REQUEST_METHOD": method, "PATH_INFO": path, **headers}
+    response = {}
+
+    def start_response(status, response_headers):
+        response["status"] = status
+        response["headers"] = dict(response_headers)
+
+    iterable = app(environ, start_response)
+    body = b"".join(iterable)
+    if hasattr(iterable, "close"):
+        iterable.close()
+    return response["status"], response["headers"], body
+
+
+def call_asgi(app, path, method="GET", headers=(), extensions=None):
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": [(k.encode(), v.encode()) for k, v in headers],
+        "extensions": extensions or {},
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+
+class TestStaticFilesIndex:
+    """Tests for StaticFilesIndex."""
+
+    def test_build_indexes_every_file(self, index):
+        """Test files are keyed by their URL."""
+        assert "/static/css/site.css" in index.files
+        assert "/static/app.0123456789ab.js" in index.files
+        assert "/static/logo.png" in index.files
+
+    def test_precompress_manifest_not_served(self, static_root):
+        """Test the precompress manifest is not exposed as a static file."""
+        (static_root / MANIFEST_NAME).write_text("{}")
+        index = StaticFilesIndex(str(static_root), "/static/")
+        index.build()
+        assert f"/static/{MANIFEST_NAME}" not in index.files
+
+    def test_lookup_outside_prefix(self, index):
+        """Test paths outside STATIC_URL are never matched."""
+        assert index.lookup("/media/logo.png") is None
+        assert index.lookup("/static/missing.png") is None
+
+    def test_precompressed_variants(self, index):
+        """Test pre-compressed siblings are attached in preference order."""
+        static_file = index.lookup("/static/css/site.css")
+        assert [v.encoding for v in static_file.variants] == ["br", "gzip"]
+        assert dict(static_file.headers)["Vary"] == "Accept-Encoding"
+        assert static_file.select("gzip, deflate").encoding == "gzip"
+        assert static_file.select("gzip, br").encoding == "br"
+        assert static_file.select("") is static_file.identity
+
+    def test_cache_control(self, index):
+        """Test hashed names are cached forever, others for MAX_AGE."""
+        hashed = dict(index.lookup("/static/app.0123456789ab.js").headers)
+        plain = dict(index.lookup("/static/logo.png").headers)
+        assert hashed["Cache-Control"] == (
+            f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+        )
+        assert plain["Cache-Control"] == "public, max-age=120"
+        assert plain["Content-Type"] == "image/png"
+
+    def test_from_config_uses_settings(self, static_root):
+        """Test the index defaults to STATIC_ROOT and STATIC_URL."""
+        with override_settings(STATIC_ROOT=str(static_root), STATIC_URL="/assets/"):
+            index = StaticFilesIndex.from_config(True)
+        assert index.lookup("/assets/logo.png") is not None
+
+    def test_from_config_requires_static_root(self):
+        """Test a missing STATIC_ROOT is reported."""
+        with override_settings(STATIC_ROOT=None):
+            with pytest.raises(ImproperlyConfigured, match="STATIC_ROOT"):
+                StaticFilesIndex.from_config(True)
+
+
+class TestStaticFilesWSGI:
+    """Tests for the WSGI static middleware."""
+
+    def test_serves_static_file(self, index, static_root):
+        """Test static files bypass the application."""
+        app = StaticFilesWSGI(fallback_app, index)
+        status, headers, body = call_wsgi(app, "/static/logo.png")
+        assert status == "200 OK"
+        assert body == b"\x89PNG"
+        assert headers["Content-Length"] == "4"
+        assert "ETag" in headers
+
+    def test_uses_file_wrapper(self, index):
+        """Test the server's wsgi.file_wrapper is used for the body."""
+        wrapped = []
+
+        def file_wrapper(fh, block_size):
+            wrapped.append(fh.name)
+            with fh:
+                return [fh.read()]
+
+        app = StaticFilesWSGI(fallback_app, index)
+        call_wsgi(app, "/static/logo.png", **{"wsgi.file_wrapper": file_wrapper})
+        assert wrapped == [os.path.join(index.root, "logo.png")]
+
+    def test_serves_compressed_variant(self, index):
+        """Test the compressed variant is picked from Accept-Encoding."""
+        app = StaticFilesWSGI(fallback_app, index)
+        _, headers, body = call_wsgi(
+            app, "/static/css/site.css", HTTP_ACCEPT_ENCODING="gzip"
+        )
+        assert body == b"gzipped"
+        assert headers["Content-Encoding"] == "gzip"
+
+    def test_not_modified(self, index):
+        """Test a matching If-None-Match returns 304 without a body."""
+        app = StaticFilesWSGI(fallback_app, index)
+        _, headers, _ = call_wsgi(app, "/static/logo.png")
+        status, _, body = call_wsgi(
+            app, "/static/logo.png", HTTP_IF_NONE_MATCH=headers["ETag"]
+        )
+        assert status == "304 Not Modified"
+        assert body == b""
+
+    def test_head(self, index):
+        """Test HEAD requests get headers only."""
+        app = StaticFilesWSGI(fallback_app, index)
+        status, headers, body = call_wsgi(app, "/static/logo.png", method="HEAD")
+        assert status == "200 OK"
+        assert headers["Content-Length"] == "4"
+        assert body == b""
+
+    def test_falls_through(self, index):
+        """Test other requests reach the application."""
+        app = StaticFilesWSGI(fallback_app, index)
+        assert call_wsgi(app, "/admin/")[2] == b"django"
+        assert call_wsgi(app, "/static/logo.png", method="POST")[2] == b"django"
+
+
+class TestStaticFilesASGI:
+    """Tests for the ASGI static middleware."""
+
+    def test_serves_static_file(self, index):
+        """Test the body is streamed when pathsend is unavailable."""
+        app = StaticFilesASGI(fallback_asgi, index)
+        messages = call_asgi(app, "/static/logo.png")
+        assert messages[0]["status"] == 200
+        assert (b"content-length", b"4") in messages[0]["headers"]
+        assert b"".join(m.get("body", b"") for m in messages[1:]) == b"\x89PNG"
+
+    def test_uses_pathsend(self, index):
+        """Test the zero-copy pathsend extension is used when available."""
+        app = StaticFilesASGI(fallback_asgi, index)
+        messages = call_asgi(
+            app,
+            "/static/css/site.css",
+            headers=[("accept-encoding", "br")],
+            extensions={"http.response.pathsend": {}},
+        )
+        assert messages[1] == {
+            "type": "http.response.pathsend",
+            "path": os.path.join(index.root, "css", "site.css.br"),
+        }
+
+    def test_not_modified(self, index):
+        """Test conditional requests are answered with 304."""
+        app = StaticFilesASGI(fallback_asgi, index)
+        etag = index.lookup("/static/logo.png").identity.etag
+        messages = call_asgi(app, "/static/logo.png", headers=[("if-none-match", etag)])
+        assert messages[0]["status"] == 304
+        assert messages[1]["body"] == b""
+
+    def test_falls_through(self, index):
+        """Test other requests reach the application."""
+        app = StaticFilesASGI(fallback_asgi, index)
+        messages = call_asgi(app, "/admin/")
+        assert messages[1]["body"] == b"django"
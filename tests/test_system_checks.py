@@ -0,0 +1,115 @@
+import os
+from unittest.mock import Mock, patch
+
+import pytest
+from django.core.management.base import SystemCheckError
+from django.test import override_settings
+
+from django_prodserver.system_checks import (
+    _installed_versions,
+    _source_files,
+    checks_cache_dir,
+    checks_fingerprint,
+    checks_passed,
+    record_checks_passed,
+    run_cached,
+)
+
+
+@pytest.fixture(autouse=True)
+def checks_cache(tmp_path):
+    with override_settings(PRODUCTION_CHECKS_CACHE=str(tmp_path)):
+        yield tmp_path
+
+
+class TestChecksFingerprint:
+    """Tests for fingerprinting what the system checks depend on."""
+
+    def test_stable(self):
+        """Test the fingerprint is the same for the same code and settings."""
+        assert checks_fingerprint() == checks_fingerprint()
+
+    def test_settings_change_it(self):
+        """Test changing a setting changes the fingerprint."""
+        before = checks_fingerprint()
+        with override_settings(ALLOWED_HOSTS=["example.com"]):
+            assert checks_fingerprint() != before
+
+    def test_object_addresses_are_ignored(self):
+        """Test values whose repr contains a memory address are stable."""
+        with override_settings(SOME_CALLABLE=lambda: None):
+            before = checks_fingerprint()
+        with override_settings(SOME_CALLABLE=lambda: None):
+            assert checks_fingerprint() == before
+
+    def test_installed_apps_by_version(self):
+        """Test apps in site-packages are fingerprinted by distribution version."""
+        installed = _installed_versions()
+        assert installed["django.contrib.auth"].startswith("Django==")
+        assert "django_prodserver" not in installed
+        files = list(_source_files(installed))
+        assert not any(f"{os.sep}contrib{os.sep}" in path for path in files)
+        assert any(path.endswith("system_checks.py") for path in files)
+
+    def test_distribution_upgrade_changes_it(self):
+        """Test upgrading an installed app changes the fingerprint."""
+        before = checks_fingerprint()
+        with patch("importlib.metadata.version", return_value="999.0"):
+            assert checks_fingerprint() != before
+
+
+class TestRunCached:
+    """Tests for skipping checks which passed before."""
+
+    def test_skipped_once_passed(self):
+        """Test checks run once, then only when forced."""
+        check = Mock()
+        assert run_cached(check)
+        assert not run_cached(check)
+        assert run_cached(check, force=True)
+        assert check.call_count == 2
+
+    def test_failure_is_not_cached(self):
+        """Test failing checks run again on the next boot."""
+        check = Mock(side_effect=SystemCheckError("broken"))
+        with pytest.raises(SystemCheckError):
+            run_cached(check)
+        assert not checks_passed(checks_fingerprint())
+
+    def test_read_only_cache(self, checks_cache):
+        """Test an unwritable cache directory only disables caching."""
+        not_a_directory = checks_cache / "file"
+        not_a_directory.write_text("")
+        with override_settings(PRODUCTION_CHECKS_CACHE=str(not_a_directory)):
+            record_checks_passed("abc")
+            assert not checks_passed("abc")
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+class TestChecksCacheDir:
+    """Tests for the default, per-user cache directory."""
+
+    @pytest.fixture(autouse=True)
+    def tempdir(self, tmp_path):
+        with (
+            override_settings(PRODUCTION_CHECKS_CACHE=None),
+            patch("tempfile.gettempdir", return_value=str(tmp_path)),
+        ):
+            yield tmp_path
+
+    def test_private(self, tempdir):
+        """Test the directory is created accessible to the user only."""
+        path = checks_cache_dir()
+        assert path == str(tempdir / f"prodserver-checks-{os.getuid()}")
+        assert os.stat(path).st_mode & 0o777 == 0o700
+
+    def test_writable_by_others(self, tempdir):
+        """Test a directory others can write to is not trusted."""
+        path = tempdir / f"prodserver-checks-{os.getuid()}"
+        path.mkdir()
+        path.chmod(0o777)
+        (path / "prodserver-checks-abc").write_text("")
+        assert checks_cache_dir() is None
+        assert not checks_passed("abc")
+        record_checks_passed("def")
+        assert not (path / "prodserver-checks-def").exists()
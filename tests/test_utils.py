@@ -1,10 +1,12 @@
 from unittest.mock import Mock, patch
 
 import pytest
+from django.test import override_settings
 
 from django_prodserver.utils import (
     WarmupFailure,
     asgi_app_name,
+    current_process_config,
     wsgi_app_name,
     wsgi_healthcheck,
 )
@@ -293,3 +295,29 @@ class TestWsgiHealthcheck:
         mock_factory_instance.get.assert_called_once_with(
             "/test/", HTTP_HOST="testserver"
         )
+
+
+class TestAppWrapper:
+    """Tests for selecting the prodserver application wrapper."""
+
+    @patch.dict("os.environ", {"PRODSERVER_PROCESS": "web"})
+    @override_settings(
+        PRODUCTION_PROCESSES={"web": {"BACKEND": "x.Backend", "STATIC": True}}
+    )
+    def test_wrapper_used_when_enabled(self):
+        """Test backends serve the wrapper when a wrapped feature is enabled."""
+        assert current_process_config()["STATIC"] is True
+        assert wsgi_app_name() == "django_prodserver.wsgi:application"
+        assert asgi_app_name() == "django_prodserver.asgi:application"
+
+    @patch.dict("os.environ", {"PRODSERVER_PROCESS": "web"})
+    @override_settings(PRODUCTION_PROCESSES={"web": {"BACKEND": "x.Backend"}})
+    def test_wrapper_not_used_by_default(self):
+        """Test the project's application is served directly by default."""
+        assert wsgi_app_name() == "tests.wsgi:application"
+        assert asgi_app_name() == "tests.asgi:application"
+
+    @patch.dict("os.environ", {}, clear=True)
+    def test_no_current_process(self):
+        """Test there is no process configuration outside prodserver."""
+        assert current_process_config() == {}
@@ -0,0 +1,162 @@
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.template import Library, engines
+from django.test import override_settings
+from django.urls import clear_url_caches, get_resolver
+
+from django_prodserver.utils import WarmupFailure
+from django_prodserver.warmup import (
+    LOCALE_MIDDLEWARE,
+    WarmupTiming,
+    compile_templates,
+    discover_warmups,
+    populate_url_resolver,
+    run_warmups,
+)
+
+calls = []
+
+register = Library()
+
+
+@register.tag
+def explode(parser, token):
+    raise RuntimeError("cannot compile")
+
+
+def load_catalogue():
+    calls.append("catalogue")
+
+
+def fake_apps(*app_configs):
+    return patch(
+        "django_prodserver.warmup.apps.get_app_configs", return_value=list(app_configs)
+    )
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    calls.clear()
+    yield
+    calls.clear()
+
+
+class TestDiscoverWarmups:
+    """Tests for collecting the prodserver_warmup steps of installed apps."""
+
+    def test_callables_and_paths(self):
+        """Test a single callable, dotted paths and lists are accepted."""
+        method = Mock(__qualname__="ShopConfig.warm")
+        with fake_apps(
+            SimpleNamespace(label="shop", prodserver_warmup=method),
+            SimpleNamespace(label="auth"),
+            SimpleNamespace(
+                label="blog", prodserver_warmup=["tests.test_warmup.load_catalogue"]
+            ),
+        ):
+            warmups = list(discover_warmups())
+        assert warmups == [
+            ("shop:ShopConfig.warm", method),
+            ("blog:load_catalogue", load_catalogue),
+        ]
+
+    def test_import_error(self):
+        """Test a dotted path which cannot be imported names the app."""
+        with fake_apps(
+            SimpleNamespace(label="shop", prodserver_warmup="shop.missing.warm")
+        ):
+            with pytest.raises(ImproperlyConfigured, match="of shop"):
+                list(discover_warmups())
+
+
+class TestRunWarmups:
+    """Tests for running and timing the warmup steps."""
+
+    def test_timings(self):
+        """Test every step runs once and is timed."""
+        with fake_apps(
+            SimpleNamespace(
+                label="shop", prodserver_warmup="tests.test_warmup.load_catalogue"
+            )
+        ):
+            timings = run_warmups()
+        assert calls == ["catalogue"]
+        assert [timing.name for timing in timings] == ["shop:load_catalogue"]
+        assert timings[0].seconds >= 0
+
+    def test_failure(self):
+        """Test a failing step aborts warmup."""
+        failing = Mock(side_effect=RuntimeError("no cache"), __qualname__="warm")
+        with fake_apps(SimpleNamespace(label="shop", prodserver_warmup=failing)):
+            with pytest.raises(WarmupFailure, match="shop:warm raised"):
+                run_warmups()
+
+    def test_str(self):
+        """Test the startup report line."""
+        assert str(WarmupTiming("shop:warm", 0.0125)) == "Warmed up shop:warm in 12.5ms"
+
+
+class TestBuiltinWarmups:
+    """Tests for the warmup steps declared by prodserver itself."""
+
+    def test_declared_by_app_config(self):
+        """Test prodserver registers its steps through its AppConfig."""
+        names = [name for name, _ in discover_warmups()]
+        assert names == [
+            "django_prodserver:compile_templates",
+            "django_prodserver:populate_url_resolver",
+        ]
+
+    def test_compile_templates(self, tmp_path):
+        """Test templates end up in the cached loader, broken ones are skipped."""
+        (tmp_path / "page.html").write_text("{% if %}")
+        (tmp_path / "partials").mkdir()
+        (tmp_path / "partials" / "row.html").write_text("<tr>{{ row }}</tr>")
+        with override_settings(
+            TEMPLATES=[
+                {
+                    "BACKEND": "django.template.backends.django.DjangoTemplates",
+                    "DIRS": [str(tmp_path)],
+                }
+            ]
+        ):
+            compile_templates()
+            loader = engines["django"].engine.template_loaders[0]
+            assert list(loader.get_template_cache) == ["partials/row.html"]
+
+    def test_compile_templates_tag_failure(self, tmp_path, caplog):
+        """Test a custom tag raising at compile time does not fail the warmup."""
+        (tmp_path / "broken.html").write_text("{% load boom %}{% explode %}")
+        (tmp_path / "page.html").write_text("<p>{{ page }}</p>")
+        with override_settings(
+            TEMPLATES=[
+                {
+                    "BACKEND": "django.template.backends.django.DjangoTemplates",
+                    "DIRS": [str(tmp_path)],
+                    "OPTIONS": {"libraries": {"boom": "tests.test_warmup"}},
+                }
+            ]
+        ):
+            compile_templates()
+            loader = engines["django"].engine.template_loaders[0]
+            assert list(loader.get_template_cache) == ["page.html"]
+        assert "Cannot compile template broken.html" in caplog.text
+
+    def test_populate_url_resolver(self):
+        """Test the reverse lookups are built for the default language."""
+        clear_url_caches()
+        populate_url_resolver()
+        assert "en-us" in get_resolver()._reverse_dict
+
+    @override_settings(
+        LANGUAGES=[("en", "English"), ("fr", "French")],
+        MIDDLEWARE=[LOCALE_MIDDLEWARE],
+    )
+    def test_populate_url_resolver_languages(self):
+        """Test every language is populated when URLs depend on it."""
+        clear_url_caches()
+        populate_url_resolver()
+        assert {"en", "fr"} <= set(get_resolver()._reverse_dict)
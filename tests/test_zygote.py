@@ -0,0 +1,173 @@
+import json
+import os
+import socket
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from django_prodserver.zygote import ZygoteServer, main, run_command
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+
+
+def _write_and_exit(argv):
+    os.write(1, " ".join(["ran", *argv]).encode() + b"\n")
+    return 3
+
+
+def _request(argv):
+    return json.dumps({"argv": argv, "cwd": os.getcwd()}).encode() + b"\n"
+
+
+@pytest.fixture
+def client_streams():
+    """Pipes standing in for the client's stdin, stdout and stderr."""
+    stdin_r, stdin_w = os.pipe()
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    yield [stdin_r, out_w, err_w], out_r, err_r
+    for fd in (stdin_r, stdin_w, out_r, out_w, err_r, err_w):
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+
+def _read_all(sock):
+    response = b""
+    while chunk := sock.recv(1024):
+        response += chunk
+    return response
+
+
+class TestZygoteServer:
+    """Tests for the server side of the command zygote."""
+
+    def test_command_runs_in_forked_child(self, tmp_path, client_streams):
+        """Test the child writes to the client's streams and reports its exit code."""
+        fds, out_r, _ = client_streams
+        server = ZygoteServer(str(tmp_path / "zygote.sock"), _write_and_exit)
+        client, conn = socket.socketpair(socket.AF_UNIX)
+        socket.send_fds(client, [_request(["check", "--deploy"])], fds)
+        pid = server.handle(conn)
+        try:
+            assert _read_all(client) == b"exit:3\n"
+            assert os.read(out_r, 1024) == b"ran check --deploy\n"
+        finally:
+            os.waitpid(pid, 0)
+            client.close()
+
+    def test_command_not_allowed(self, tmp_path, client_streams):
+        """Test commands outside the allowed ones are refused without forking."""
+        fds, _, err_r = client_streams
+        server = ZygoteServer(
+            str(tmp_path / "zygote.sock"), _write_and_exit, commands={"check"}
+        )
+        client, conn = socket.socketpair(socket.AF_UNIX)
+        socket.send_fds(client, [_request(["migrate"])], fds)
+        assert server.handle(conn) is None
+        assert _read_all(client) == b"exit:1\n"
+        assert b"'migrate' is not allowed" in os.read(err_r, 1024)
+        client.close()
+
+    def test_request_without_streams(self, tmp_path):
+        """Test a request without the client's streams is dropped."""
+        server = ZygoteServer(str(tmp_path / "zygote.sock"), _write_and_exit)
+        client, conn = socket.socketpair(socket.AF_UNIX)
+        client.sendall(_request(["check"]))
+        assert server.handle(conn) is None
+        assert _read_all(client) == b""
+        client.close()
+
+    @pytest.mark.parametrize(
+        "request_data",
+        [b"[1]\n", b'"x"\n', b'{"argv": 5}\n', b'{"argv": [["check"]]}\n'],
+    )
+    def test_malformed_request(self, tmp_path, client_streams, request_data, caplog):
+        """Test requests which are not an object with a list of strings are dropped."""
+        fds, _, _ = client_streams
+        server = ZygoteServer(
+            str(tmp_path / "zygote.sock"), _write_and_exit, commands={"check"}
+        )
+        client, conn = socket.socketpair(socket.AF_UNIX)
+        socket.send_fds(client, [request_data], fds)
+        assert server.handle(conn) is None
+        assert _read_all(client) == b""
+        assert "Invalid command request" in caplog.text
+        client.close()
+
+    def test_unexpected_error_does_not_stop_the_zygote(self, tmp_path, caplog):
+        """Test any error handling a request is logged instead of raised."""
+        server = ZygoteServer(str(tmp_path / "zygote.sock"), _write_and_exit)
+        client, conn = socket.socketpair(socket.AF_UNIX)
+        with patch(
+            "django_prodserver.zygote.receive_request", side_effect=TypeError("boom")
+        ):
+            assert server.handle(conn) is None
+        assert "Cannot handle command request" in caplog.text
+        client.close()
+
+    def test_silent_client_times_out(self, tmp_path, caplog):
+        """Test a client sending nothing is disconnected instead of blocking."""
+        server = ZygoteServer(
+            str(tmp_path / "zygote.sock"), _write_and_exit, request_timeout=0.05
+        )
+        client, conn = socket.socketpair(socket.AF_UNIX)
+        assert server.handle(conn) is None
+        assert _read_all(client) == b""
+        assert "No command request received" in caplog.text
+        client.close()
+
+    def test_bind(self, tmp_path):
+        """Test a stale socket file is replaced and permissions applied."""
+        path = tmp_path / "zygote.sock"
+        path.write_text("stale")
+        sock = ZygoteServer(str(path), _write_and_exit, mode=0o660).bind()
+        try:
+            assert oct(path.stat().st_mode & 0o777) == "0o660"
+        finally:
+            sock.close()
+
+
+class TestZygoteClient:
+    """Tests for the thin client."""
+
+    def test_run_command(self, tmp_path):
+        """Test the request and streams are sent, the exit code returned."""
+        path = str(tmp_path / "zygote.sock")
+        listener = socket.socket(socket.AF_UNIX)
+        listener.bind(path)
+        listener.listen(1)
+        received = {}
+
+        def serve():
+            conn, _ = listener.accept()
+            data, fds, _, _ = socket.recv_fds(conn, 4096, 3)
+            received.update(json.loads(data), fds=len(fds))
+            for fd in fds:
+                os.close(fd)
+            conn.sendall(b"exit:5\n")
+            conn.close()
+
+        thread = threading.Thread(target=serve)
+        thread.start()
+        with (
+            open(os.devnull, "r+") as devnull,
+            patch.multiple("sys", stdin=devnull, stdout=devnull, stderr=devnull),
+        ):
+            assert run_command(path, ["clearsessions"]) == 5
+        thread.join()
+        listener.close()
+        assert received["argv"] == ["clearsessions"]
+        assert received["fds"] == 3
+
+    def test_unreachable(self, tmp_path, capsys):
+        """Test a missing zygote is reported."""
+        assert main([str(tmp_path / "missing.sock"), "check"]) == 1
+        assert "Cannot reach the command zygote" in capsys.readouterr().err
+
+    def test_usage(self, capsys):
+        """Test the socket and command are required."""
+        assert main(["/run/zygote.sock"]) == 2
+        assert "usage" in capsys.readouterr().err